@@ -0,0 +1,277 @@
+# Micro-benchmark for remove_default_values in default-data-removal.py
+# Builds a synthetic tree of cards in memory, runs the previous (per-key branching) implementation
+# and the compiled matcher on identical copies and checks that the output is byte-identical.
+
+import copy
+import gc
+import json
+import math
+import random
+import time
+from modules.script_loader import load_script
+
+CARD_COUNT = 50000
+CARDS_PER_DECK = 100
+REPEATS = 5
+SEED = 1
+
+ddr = load_script("default-data-removal.py")
+
+
+def reference_remove_default_values(data, defaults, is_nested=False):
+    """The implementation before the default values were compiled (kept for comparison)."""
+    if "CustomDeck" in data and isinstance(data["CustomDeck"], dict):
+        custom_deck = data["CustomDeck"]
+        for deck_id in list(custom_deck.keys()):
+            deck_data = custom_deck[deck_id]
+
+            if isinstance(deck_data, dict):
+                if deck_data.get("BackURL") in ddr.NON_UNIQUE_BACKS.values():
+                    deck_data.pop("UniqueBack", None)
+                elif deck_data.get("NumWidth") == 1 and deck_data.get("NumHeight") == 1:
+                    deck_data["UniqueBack"] = True
+                elif deck_data.get("UniqueBack") is False:
+                    deck_data.pop("UniqueBack", None)
+
+    if data.get("Name") == "Deck" and "HideWhenFaceDown" in data:
+        del data["HideWhenFaceDown"]
+
+    if data.get("Name") in ["Card", "CardCustom"] and "HideWhenFaceDown" in data:
+        card_id_str = str(data.get("CardID", ""))
+        deck_id_prefix = card_id_str[:-2]
+        custom_deck = data.get("CustomDeck", {})
+        deck_settings = custom_deck.get(deck_id_prefix)
+
+        if isinstance(deck_settings, dict):
+            unique_back = deck_settings.get("UniqueBack", False)
+            if unique_back != data["HideWhenFaceDown"]:
+                del data["HideWhenFaceDown"]
+
+    if data.get("Name") == "Custom_Tile" and "CustomImage" in data:
+        image_data = data["CustomImage"]
+        if (
+            "ImageSecondaryURL" in image_data
+            and image_data["ImageURL"] == image_data["ImageSecondaryURL"]
+        ):
+            del image_data["ImageSecondaryURL"]
+
+    if ddr.REMOVE_TAGS_AND_SCRIPTING:
+        for key in [
+            "Tags",
+            "LuaScript",
+            "LuaScript_path",
+            "LuaScriptState",
+            "LuaScriptState_path",
+            "XmlUI",
+            "CustomUIAssets",
+        ]:
+            if key in data:
+                del data[key]
+
+    if "Transform" in data:
+        ddr.clean_transform_data(data["Transform"], is_nested)
+
+    if "AttachedDecals" in data:
+        for decal in data["AttachedDecals"]:
+            if "OwnerSteamID" in decal:
+                del decal["OwnerSteamID"]
+
+            if "Transform" in decal:
+                ddr.clean_transform_data(decal["Transform"], False)
+
+    for key in list(data.keys()):
+        current_value = data.get(key)
+
+        if key in defaults:
+            default_value = defaults[key]
+
+            if (
+                key == "ColorDiffuse"
+                and isinstance(current_value, dict)
+                and all(k in current_value for k in ("r", "g", "b"))
+                and "a" not in current_value
+            ):
+                if data.get("Name") == "Card" or data.get("Name") == "CardCustom":
+                    precision = 1
+                else:
+                    precision = 5
+
+                if (
+                    math.isclose(current_value["r"], default_value["r"], rel_tol=1e-9, abs_tol=10**-precision)
+                    and math.isclose(current_value["g"], default_value["g"], rel_tol=1e-9, abs_tol=10**-precision)
+                    and math.isclose(current_value["b"], default_value["b"], rel_tol=1e-9, abs_tol=10**-precision)
+                ):
+                    del data[key]
+
+            elif key == "CustomMesh" and isinstance(current_value, dict):
+                for mesh_key in list(current_value.keys()):
+                    if mesh_key in default_value and current_value[mesh_key] == default_value[mesh_key]:
+                        del current_value[mesh_key]
+                if not current_value:
+                    del data[key]
+
+            elif current_value == default_value:
+                del data[key]
+
+        elif key == "AttachedDecals":
+            continue
+
+        elif isinstance(current_value, dict):
+            reference_remove_default_values(current_value, defaults, is_nested=True)
+
+        elif isinstance(current_value, list):
+            for item in current_value:
+                if isinstance(item, dict):
+                    reference_remove_default_values(item, defaults, is_nested=True)
+
+
+def make_card(rng, deck_id, index):
+    """Creates a card with a random mix of default and non-default values."""
+    card = {
+        "GUID": f"{rng.randrange(16**6):06x}",
+        "Name": rng.choice(["Card", "Card", "CardCustom"]),
+        "Transform": {
+            "posX": rng.choice([0.0, 0.0004, rng.uniform(-50, 50)]),
+            "posY": rng.uniform(0, 3),
+            "posZ": rng.uniform(-50, 50),
+            "rotX": rng.choice([0.0, 359.98, rng.uniform(0, 360)]),
+            "rotY": rng.choice([180.0, 179.97, 270.02]),
+            "rotZ": rng.choice([0.0, 0.01, 180.0]),
+            "scaleX": 1.0,
+            "scaleY": 1.0,
+            "scaleZ": 1.0,
+        },
+        "Nickname": f"Card {index}",
+        "Description": rng.choice(["", "Item. Tool."]),
+        "GMNotes": rng.choice(["", '{"id": "01001"}']),
+        "AltLookAngle": {"x": 0.0, "y": 0.0, "z": 0.0},
+        "ColorDiffuse": rng.choice(
+            [
+                {"r": 0.713235259, "g": 0.713235259, "b": 0.713235259},
+                {"r": 0.7, "g": 0.71, "b": 0.75},
+                {"r": 1.0, "g": 0.0, "b": 0.0},
+                {"r": 0.71324, "g": 0.71324, "b": 0.71324, "a": 1.0},
+            ]
+        ),
+        "LayoutGroupSortIndex": 0,
+        "Value": 0,
+        "Locked": rng.random() < 0.1,
+        "Grid": True,
+        "Snap": True,
+        "IgnoreFoW": False,
+        "MeasureMovement": False,
+        "DragSelectable": True,
+        "Autoraise": True,
+        "Sticky": True,
+        "Tooltip": True,
+        "GridProjection": False,
+        "HideWhenFaceDown": rng.random() < 0.7,
+        "Hands": True,
+        "CardID": deck_id * 100 + index % 70,
+        "SidewaysCard": False,
+        "CustomDeck": {
+            str(deck_id): {
+                "FaceURL": f"https://example.com/{deck_id}/face.jpg",
+                "BackURL": rng.choice(
+                    [ddr.NON_UNIQUE_BACKS["Player"], f"https://example.com/{deck_id}/back.jpg"]
+                ),
+                "NumWidth": rng.choice([1, 10]),
+                "NumHeight": rng.choice([1, 7]),
+                "BackIsHidden": True,
+                "UniqueBack": rng.choice([True, False]),
+                "Type": 0,
+            }
+        },
+        "LuaScript": "",
+        "LuaScriptState": "",
+        "XmlUI": "",
+        "Tags": rng.choice([[], ["PlayerCard"]]),
+    }
+    if rng.random() < 0.05:
+        card["AttachedDecals"] = [
+            {"OwnerSteamID": "123", "Transform": {"posX": 0.0, "rotY": 359.0}, "ColorDiffuse": card["ColorDiffuse"]}
+        ]
+    if rng.random() < 0.05:
+        # Alternate state (nested, so its position is removed)
+        card["States"] = {"2": copy.deepcopy(card)}
+    if rng.random() < 0.05:
+        card["CustomMesh"] = {"MeshURL": "m", "NormalURL": "", "ColliderURL": "", "Convex": True, "CastShadows": True}
+    return card
+
+
+def make_tree(card_count, cards_per_deck, seed):
+    rng = random.Random(seed)
+    decks = []
+    for deck_index in range((card_count + cards_per_deck - 1) // cards_per_deck):
+        deck_id = 1000 + deck_index
+        count = min(cards_per_deck, card_count - deck_index * cards_per_deck)
+        decks.append(
+            {
+                "GUID": f"{rng.randrange(16**6):06x}",
+                "Name": "Deck",
+                "Transform": {"posX": 1.5, "posY": 1.0, "posZ": 0.0, "rotY": 180.0},
+                "HideWhenFaceDown": True,
+                "Locked": False,
+                "ContainedObjects": [make_card(rng, deck_id, i) for i in range(count)],
+            }
+        )
+        image_url = f"https://example.com/{deck_id}/tile.jpg"
+        decks.append(
+            {
+                "GUID": f"{rng.randrange(16**6):06x}",
+                "Name": "Custom_Tile",
+                "Transform": {"posX": 0.0, "posY": 1.0, "posZ": 0.0, "rotY": 90.0},
+                "CustomImage": {
+                    "ImageURL": image_url,
+                    "ImageSecondaryURL": rng.choice([image_url, ""]),
+                    "CustomTile": {"Type": 0, "Thickness": 0.2},
+                },
+                "ColorDiffuse": {"r": 0.71324, "g": 0.71324, "b": 0.71324},
+                "Tooltip": True,
+            }
+        )
+    return {"SaveName": "", "ObjectStates": decks}
+
+
+def run(function, tree):
+    """Returns (seconds, cleaned tree) of one run. The garbage collector is paused while timing."""
+    data = copy.deepcopy(tree)
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        function(data, ddr.DEFAULT_VALUES, is_nested=False)
+        return time.perf_counter() - start, data
+    finally:
+        gc.enable()
+
+
+def main():
+    print(f"Building synthetic tree with {CARD_COUNT} cards...")
+    tree = make_tree(CARD_COUNT, CARDS_PER_DECK, SEED)
+
+    # Alternating runs, so both implementations see the same machine load
+    reference_time = compiled_time = float("inf")
+    for _ in range(REPEATS):
+        elapsed, reference_result = run(reference_remove_default_values, tree)
+        reference_time = min(reference_time, elapsed)
+        elapsed, compiled_result = run(ddr.remove_default_values, tree)
+        compiled_time = min(compiled_time, elapsed)
+
+    reference_bytes = json.dumps(reference_result, indent=2, ensure_ascii=False).encode("utf-8")
+    compiled_bytes = json.dumps(compiled_result, indent=2, ensure_ascii=False).encode("utf-8")
+
+    print("-" * 40)
+    print(f"Reference: {reference_time:.3f} s (best of {REPEATS})")
+    print(f"Compiled:  {compiled_time:.3f} s (best of {REPEATS})")
+    print(f"Speedup:   {reference_time / compiled_time:.2f}x")
+    print(f"Output:    {len(compiled_bytes)} bytes")
+
+    if reference_bytes == compiled_bytes:
+        print("✅ Output is byte-identical.")
+    else:
+        print("❌ Output differs!")
+
+
+if __name__ == "__main__":
+    main()
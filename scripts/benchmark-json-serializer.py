@@ -0,0 +1,115 @@
+# Benchmark for the canonical JSON serializer (dumps_json in modules/json_writer.py)
+# Serializes the largest .json files of a tree with json.dumps(indent=2) and with dumps_json
+# (orjson backend if installed) and checks that the output is byte-identical.
+# Without a tree, large decks are generated from a synthetic tree (cards inlined as ContainedObjects).
+
+import json
+import tempfile
+import time
+from pathlib import Path
+from modules import json_writer
+from modules.synthetic_tree import generate_tree
+
+# Tree to take the files from (None = synthetic decks)
+SEARCH_FOLDER = None
+
+# Number of files to benchmark (the largest ones)
+FILE_COUNT = 20
+REPEATS = 5
+
+# Size of the synthetic decks
+SYNTHETIC_CARDS = 20000
+SYNTHETIC_DECKS = 20
+
+# Floats that orjson and the json module format differently (checked for equality as well)
+EDGE_CASE_FLOATS = [0.0001, 0.00001, 1e-7, -2.5e-12, 1e15, 1e16, -1e16, 1.5e20, 1.2345678901234568e17, 1e300]
+
+
+def find_largest_files(folder, count):
+    files = sorted(Path(folder).rglob("*.json"), key=lambda path: path.stat().st_size, reverse=True)
+    documents = []
+    for path in files[:count]:
+        with open(path, "r", encoding="utf-8") as f:
+            documents.append((path.name, json.load(f)))
+    return documents
+
+
+def build_synthetic_decks():
+    """Loads a synthetic tree and inlines the cards into their decks (like a saved object)."""
+    with tempfile.TemporaryDirectory(prefix="sced-json-benchmark-") as folder:
+        generate_tree(folder, cards=SYNTHETIC_CARDS, decks=SYNTHETIC_DECKS, bags=0)
+        documents = []
+        for deck_path in sorted(Path(folder).glob("*.json")):
+            with open(deck_path, "r", encoding="utf-8") as f:
+                deck = json.load(f)
+
+            deck["ContainedObjects"] = []
+            for stem in deck.pop("ContainedObjects_order"):
+                with open(deck_path.parent / deck_path.stem / f"{stem}.json", "r", encoding="utf-8") as f:
+                    deck["ContainedObjects"].append(json.load(f))
+            documents.append((deck_path.name, deck))
+    return documents
+
+
+def best_time(function, data):
+    best = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        function(data)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    if SEARCH_FOLDER:
+        print(f"Loading the {FILE_COUNT} largest files from {SEARCH_FOLDER}...")
+        documents = find_largest_files(SEARCH_FOLDER, FILE_COUNT)
+    else:
+        print(f"Building {SYNTHETIC_DECKS} synthetic decks with {SYNTHETIC_CARDS} cards...")
+        documents = build_synthetic_decks()
+
+    # Edge cases as values, in lists and in nested objects
+    documents.append(
+        (
+            "edge-case-floats",
+            {
+                "Values": EDGE_CASE_FLOATS,
+                "Transform": {f"value{index}": value for index, value in enumerate(EDGE_CASE_FLOATS)},
+                "Strings": [str(value) for value in EDGE_CASE_FLOATS],
+            },
+        )
+    )
+
+    backend = "orjson" if json_writer.orjson is not None and json_writer.USE_ORJSON else "json (orjson not installed)"
+    print(f"Backend of dumps_json: {backend}")
+
+    def reference(data):
+        return json.dumps(data, indent=2, ensure_ascii=False) + "\n"
+
+    reference_total = 0.0
+    canonical_total = 0.0
+    total_bytes = 0
+    mismatches = []
+    for name, data in documents:
+        reference_total += best_time(reference, data)
+        canonical_total += best_time(json_writer.dumps_json, data)
+
+        expected = reference(data)
+        total_bytes += len(expected.encode("utf-8"))
+        if json_writer.dumps_json(data) != expected:
+            mismatches.append(name)
+
+    print("-" * 40)
+    print(f"Files:       {len(documents)} ({total_bytes / 1024 / 1024:.1f} MB)")
+    print(f"json.dumps:  {reference_total:.3f} s (best of {REPEATS})")
+    print(f"dumps_json:  {canonical_total:.3f} s (best of {REPEATS})")
+    print(f"Speedup:     {reference_total / canonical_total:.2f}x")
+    if mismatches:
+        print(f"❌ Output differs for {len(mismatches)} files: {', '.join(mismatches[:10])}")
+    else:
+        print("✅ Output is byte-identical.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+# Benchmark suite for the decomposed-tree maintenance scripts.
+# Generates a synthetic decomposed tree, runs every tool against a fresh copy of it (as a separate
+# "python script.py" process, see write_wrapper) and records wall time, files/sec, peak RSS and bytes written.
+# The results are appended to RESULTS_FILE together with the git commit, so runs can be compared.
+
+import io
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from pathlib import Path
+from modules.script_loader import SCRIPT_DIR
+from modules.synthetic_tree import generate_tree
+
+# Size of the synthetic tree
+CARD_COUNT = 20000
+DECK_COUNT = 200
+BAG_COUNT = 20
+GMNOTES_RATIO = 0.8
+DUPLICATE_RATIO = 0.05
+SEED = 1
+
+# Tools to benchmark (see TOOLS below for the available names)
+TOOLS_TO_RUN = ["sort-and-clean-decks", "default-data-removal", "metadata_sorter"]
+
+# Results of all runs are appended to this file
+RESULTS_FILE = Path(__file__).parent / ".cache" / "benchmark-results.json"
+
+
+# Script and config overrides of every tool (Python expressions, TREE is the path of the tree copy)
+TOOLS = {
+    "sort-and-clean-decks": ("sort-and-clean-decks.py", {"ROOT_FOLDER_PATH": "Path(TREE)"}),
+    "default-data-removal": ("default-data-removal.py", {"TARGET_DIRECTORY": "TREE", "DETAILED_PRINTING": "False"}),
+    "metadata_sorter": ("metadata_sorter.py", {"BASE_DIR": "TREE"}),
+    "pipeline-runner": ("pipeline-runner.py", {"TARGET_DIRECTORY": "TREE"}),
+}
+
+MAIN_BLOCK = re.compile(r"^if __name__ == [\"']__main__[\"']:[ \t]*$", re.MULTILINE)
+
+
+def get_peak_rss_kb():
+    """Peak RSS of this process and of its (finished) worker processes in KB."""
+    try:
+        import resource
+
+        # ru_maxrss is in bytes on macOS and in KB on Linux
+        divisor = 1024 if sys.platform == "darwin" else 1
+        own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // divisor
+        children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss // divisor
+        return own, children
+    except ImportError:
+        pass
+
+    try:
+        import psutil
+
+        memory_info = psutil.Process().memory_info()
+        return getattr(memory_info, "peak_wset", memory_info.rss) // 1024, None
+    except ImportError:
+        return None, None
+
+
+def measure(run):
+    """Called by the wrapper of a tool: runs its '__main__' block and prints the measurements as JSON."""
+    output = io.StringIO()
+    start = time.perf_counter()
+    with redirect_stdout(output):
+        run()
+    wall_time = time.perf_counter() - start
+
+    peak_rss_kb, peak_rss_workers_kb = get_peak_rss_kb()
+    print(
+        json.dumps(
+            {
+                "wall_time": wall_time,
+                "peak_rss_kb": peak_rss_kb,
+                "peak_rss_workers_kb": peak_rss_workers_kb,
+                "output_lines": output.getvalue().count("\n"),
+            }
+        )
+    )
+
+
+def write_wrapper(tool_name, tree, folder) -> Path:
+    """
+    Writes a copy of the tool with its config overridden (right before the '__main__' block).
+    The copy runs as a regular script, so its process pool also works with "spawn": the workers
+    import the copy, overrides included. The '__main__' block becomes a function that is timed by measure().
+    """
+    script_name, config = TOOLS[tool_name]
+    source = (SCRIPT_DIR / script_name).read_text(encoding="utf-8")
+    main_blocks = list(MAIN_BLOCK.finditer(source))
+    if len(main_blocks) != 1:
+        raise ValueError(f"{script_name} needs exactly one '__main__' block")
+
+    overrides = [f"TREE = {str(tree)!r}"] + [f"{key} = {value}" for key, value in config.items()]
+    wrapper = (
+        source[: main_blocks[0].start()]
+        + "# --- Benchmark overrides ---\n"
+        + "\n".join(overrides)
+        + "\n\n\ndef _benchmark_main():"
+        + source[main_blocks[0].end() :].rstrip()
+        + '\n\n\nif __name__ == "__main__":\n'
+        + "    from modules.script_loader import load_script\n\n"
+        + '    load_script("benchmark-suite.py").measure(_benchmark_main)\n'
+    )
+
+    wrapper_path = Path(folder) / f"{tool_name}.py"
+    wrapper_path.write_text(wrapper, encoding="utf-8")
+    return wrapper_path
+
+
+def snapshot(tree):
+    """Maps every file in the tree to (mtime_ns, size)."""
+    files = {}
+    for folder, _, file_names in os.walk(tree):
+        for file_name in file_names:
+            path = os.path.join(folder, file_name)
+            stat = os.stat(path)
+            files[path] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+def compare_snapshots(before, after):
+    written = [path for path, signature in after.items() if before.get(path) != signature]
+    return {
+        "files_written": len(written),
+        "bytes_written": sum(after[path][1] for path in written),
+        "files_deleted": len(before.keys() - after.keys()),
+    }
+
+
+def benchmark_tool(tool_name, template_tree, work_folder):
+    tree = Path(work_folder) / tool_name
+    shutil.copytree(template_tree, tree)
+    wrapper_path = write_wrapper(tool_name, tree, work_folder)
+    before = snapshot(tree)
+
+    # The tools import from 'modules' (relative to the scripts folder), the worker processes inherit the path
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SCRIPT_DIR), env.get("PYTHONPATH")]))
+    result = subprocess.run(
+        [sys.executable, str(wrapper_path)],
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        env=env,
+    )
+    if result.returncode != 0:
+        print(f"  ❌ {tool_name} failed:\n{result.stderr}")
+        return None
+
+    measurements = json.loads(result.stdout.strip().splitlines()[-1])
+    measurements.update(compare_snapshots(before, snapshot(tree)))
+    measurements["files_per_second"] = len(before) / measurements["wall_time"]
+
+    shutil.rmtree(tree)
+    return measurements
+
+
+def get_git_commit():
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=SCRIPT_DIR, capture_output=True, text=True, check=True
+        )
+        return result.stdout.strip()
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None
+
+
+def load_results():
+    if RESULTS_FILE.exists():
+        with open(RESULTS_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return []
+
+
+def print_comparison(run, previous_runs):
+    """Prints the results next to the last run with the same tree configuration."""
+    previous = next((p for p in reversed(previous_runs) if p["config"] == run["config"]), None)
+
+    print("\n" + "=" * 78)
+    print(f"{'Tool':<24}{'Time (s)':>10}{'Files/s':>10}{'RSS (MB)':>10}{'Written (MB)':>14}{'vs. last':>10}")
+    print("-" * 78)
+    for tool_name, result in run["results"].items():
+        if result is None:
+            print(f"{tool_name:<24}{'failed':>10}")
+            continue
+
+        change = ""
+        if previous and previous["results"].get(tool_name):
+            change = f"{result['wall_time'] / previous['results'][tool_name]['wall_time'] - 1:+.0%}"
+
+        rss = f"{result['peak_rss_kb'] / 1024:.0f}" if result["peak_rss_kb"] else "-"
+        print(
+            f"{tool_name:<24}{result['wall_time']:>10.2f}{result['files_per_second']:>10.0f}"
+            f"{rss:>10}{result['bytes_written'] / 1024 / 1024:>14.1f}{change:>10}"
+        )
+    print("=" * 78)
+    if previous:
+        print(f"Compared with commit {previous['commit']} ({previous['timestamp']})")
+
+
+def main():
+    config = {
+        "cards": CARD_COUNT,
+        "decks": DECK_COUNT,
+        "bags": BAG_COUNT,
+        "gmnotes_ratio": GMNOTES_RATIO,
+        "duplicate_ratio": DUPLICATE_RATIO,
+        "seed": SEED,
+    }
+
+    with tempfile.TemporaryDirectory(prefix="sced-benchmark-") as work_folder:
+        template_tree = Path(work_folder) / "template"
+        print(f"Generating synthetic tree with {CARD_COUNT} cards...")
+        stats = generate_tree(template_tree, **config)
+        print(f"Generated {stats['files']} files ({stats['bytes'] / 1024 / 1024:.1f} MB).")
+
+        results = {}
+        for tool_name in TOOLS_TO_RUN:
+            print(f"Running {tool_name}...")
+            results[tool_name] = benchmark_tool(tool_name, template_tree, work_folder)
+
+    run = {
+        "commit": get_git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "config": config,
+        "results": results,
+    }
+
+    previous_runs = load_results()
+    print_comparison(run, previous_runs)
+
+    RESULTS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(RESULTS_FILE, "w", encoding="utf-8") as f:
+        json.dump(previous_runs + [run], f, indent=2)
+        f.write("\n")
+    print(f"Results saved to {RESULTS_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+# Builds a columnar catalog of all cards in a decomposed tree (see modules/card_catalog.py).
+# Query it with query-card-catalog.py instead of writing conditional-search.py configs that
+# read every file. Only the files that changed since the last build are parsed again.
+# Parquet / Feather output needs pyarrow, use a .pkl or .csv file otherwise.
+
+import time
+from pathlib import Path
+from modules.card_catalog import build_catalog, save_catalog
+from modules.decomposed_tree import EXCLUDED_DIRS
+
+# --- Configuration ---
+SEARCH_FOLDER = Path(r"C:\git\SCED-downloads\decomposed")
+CATALOG_FILE = Path(__file__).parent / ".cache" / "card-catalog.parquet"
+
+# Folders that are not included
+EXCLUDED_FOLDERS = EXCLUDED_DIRS
+
+
+def main():
+    print(f"Building card catalog for: {SEARCH_FOLDER}")
+    start = time.perf_counter()
+    catalog = build_catalog(SEARCH_FOLDER, EXCLUDED_FOLDERS)
+    save_catalog(catalog, CATALOG_FILE)
+
+    print(f"Catalog with {len(catalog)} cards saved to {CATALOG_FILE}")
+    print(f"Size: {CATALOG_FILE.stat().st_size / 1024:.0f} KB, took {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
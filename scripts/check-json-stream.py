@@ -0,0 +1,102 @@
+# Checks the streaming reader of modules/json_stream.py against json.loads
+# The test document is split at every position (the reader gets the two parts as separate chunks)
+# and read with very small chunk sizes, so values that span chunk boundaries are covered.
+# Numbers are the critical case: "12." or "1e" at the end of a chunk must not end the value.
+
+import json
+import os
+import tempfile
+from modules import json_stream
+
+DOCUMENT = {
+    "SaveName": "Split test",
+    "Number": 12.5,
+    "Exponent": 1e-7,
+    "BigExponent": 1.5e20,
+    "Negative": -0.125,
+    "Integer": 1234567,
+    "Flag": True,
+    "Nothing": None,
+    "ObjectStates": [
+        {
+            "Name": "Deck",
+            "Transform": {"posX": -12.75, "posY": 1.0e5, "scaleX": 1.000001},
+            "ContainedObjects": [
+                {"Name": "Card", "CardID": 123400, "Value": 3.25e-10},
+                {"Name": "Card", "CardID": 123401, "Value": -2e+30},
+            ],
+            "Last": 99.99,
+        },
+        {"Name": "Token", "Value": 7},
+    ],
+    "Tail": 0.5,
+}
+
+CHUNK_SIZES = [1, 2, 3, 5, 7]
+
+
+class SplitFile:
+    """File-like object that returns the text in the given parts."""
+
+    def __init__(self, *parts):
+        self.parts = [part for part in parts if part]
+
+    def read(self, _size=None):
+        return self.parts.pop(0) if self.parts else ""
+
+
+def read_document(f, chunk_size):
+    """Reads the document with the streaming reader and puts the contained objects back in place."""
+    reader = json_stream._JsonReader(f, chunk_size)
+    generator = json_stream._iter_dict(reader)
+    objects = []
+    try:
+        while True:
+            objects.append(next(generator))
+    except StopIteration as stop:
+        return stop.value, objects
+
+
+def main():
+    failures = []
+    for indent in (None, 2):
+        text = json.dumps(DOCUMENT, indent=indent)
+        expected = read_document(SplitFile(text), len(text))
+        reference = {key: value for key, value in json.loads(text).items() if key != "ObjectStates"}
+        if expected[0] != reference or len(expected[1]) != 4:
+            failures.append(f"indent={indent}, single chunk: {expected}")
+
+        # Every split position
+        for split in range(1, len(text)):
+            try:
+                result = read_document(SplitFile(text[:split], text[split:]), len(text))
+            except ValueError as e:
+                result = e
+            if result != expected:
+                failures.append(f"indent={indent}, split at {split} ({text[max(0, split - 5):split]!r}): {result}")
+
+        # Small chunks through iter_objects
+        with tempfile.TemporaryDirectory(prefix="sced-json-stream-") as folder:
+            path = os.path.join(folder, "save.json")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+
+            expected_objects = list(json_stream.iter_objects(path))
+            for chunk_size in CHUNK_SIZES:
+                try:
+                    objects = list(json_stream.iter_objects(path, chunk_size))
+                except ValueError as e:
+                    objects = e
+                if objects != expected_objects:
+                    failures.append(f"indent={indent}, chunk size {chunk_size}: {objects}")
+
+    if failures:
+        print(f"❌ {len(failures)} failures:")
+        for failure in failures[:20]:
+            print(f"- {failure}")
+    else:
+        print("✅ All split positions and chunk sizes read the same document.")
+
+
+if __name__ == "__main__":
+    main()
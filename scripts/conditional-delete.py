@@ -1,4 +1,5 @@
 # Deletes all files that contain the FILTER_STRING in the SEARCH_FOLDER
+# For repeated queries on large trees use query-files.py (indexed search with the same actions).
 
 import os
 
@@ -1,6 +1,8 @@
 # Filters files with a FILTER_STRING and then performs a search & replace on these files
+# For repeated queries on large trees use query-files.py (indexed search with the same actions).
 
 import os
+from modules.multi_replace import MultiReplacer
 
 # Config
 SEARCH_FOLDER = r"C:\git\SCED-downloads\decomposed\campaign\Edge of the Earth\EdgeoftheEarth.895eaa"
@@ -8,6 +10,11 @@ ORIGINAL_STRING = ',\n    "PlayerCard"'
 REPLACEMENT_STRING = ',\n    "CleanUpHelper_ignore",\n    "PlayerCard"'
 FILTER_STRING = '"Nickname": "Dr. Mala Sinha",'  # must be part of file
 
+# Optional: more replacements {original: replacement}, all of them are applied in a single scan of the file
+ADDITIONAL_REPLACEMENTS = {}
+
+replacer = MultiReplacer({ORIGINAL_STRING: REPLACEMENT_STRING, **ADDITIONAL_REPLACEMENTS})
+
 # Loop through files
 count = 0
 for root, dirs, files in os.walk(SEARCH_FOLDER):
@@ -21,7 +28,7 @@ for root, dirs, files in os.walk(SEARCH_FOLDER):
                 content = f.read()
 
             if FILTER_STRING in content:
-                new_content = content.replace(ORIGINAL_STRING, REPLACEMENT_STRING)
+                new_content = replacer.replace(content)
 
                 if new_content != content:
                     with open(file_path, "w", encoding="utf-8") as f:
@@ -1,3 +1,5 @@
+# For repeated queries on large trees use query-files.py (indexed search with the same actions).
+
 import os
 
 # Config
@@ -0,0 +1,68 @@
+# Consolidates the CustomDeck entries of a decomposed tree.
+# Every unique image sheet (FaceURL, BackURL, NumWidth, NumHeight) gets one canonical deck ID for the
+# whole tree: cards and decks that registered the same sheet under another ID are rewritten (CustomDeck,
+# CardID and DeckIDs), and IDs that were used for different sheets are split up.
+# Run sort-and-clean-decks.py afterwards to rebuild the deck data.
+
+import json
+from pathlib import Path
+from modules.decomposed_tree import DecomposedTree
+from modules.sheet_registry import EXCLUDED_FOLDERS as CONSOLIDATION_EXCLUDED_FOLDERS, consolidate_tree
+
+# --- Configuration ---
+ROOT_FOLDER_PATH = Path(r"C:\git\SCED-downloads\decomposed")
+
+# If True, only the report is written (no files are changed)
+REPORT_ONLY = False
+
+# Report with the ID redirects and conflicts (None = no report)
+REPORT_FILE = Path(__file__).parent / "custom-deck-consolidation.json"
+
+# Folders that are not processed (the same folders are skipped by sort-and-clean-decks.py)
+EXCLUDED_FOLDERS = CONSOLIDATION_EXCLUDED_FOLDERS
+
+
+def write_report(report_file, registry):
+    report = {
+        "sheets": len(registry),
+        "redirects": [
+            {"from": deck_id, "to": canon_id, "objects": count}
+            for (deck_id, canon_id), count in sorted(registry.redirects.items())
+        ],
+        "conflicts": registry.conflicts,
+    }
+    with open(report_file, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+def main():
+    print(f"Consolidating CustomDeck IDs in: {ROOT_FOLDER_PATH}")
+    tree = DecomposedTree(ROOT_FOLDER_PATH, EXCLUDED_FOLDERS).scan()
+    for path, error in tree.errors.items():
+        print(f"  - Warning: Could not load {path}: {error}")
+
+    registry = consolidate_tree(tree)
+    changed = sum(1 for obj in tree if obj.modified)
+
+    written = 0
+    if not REPORT_ONLY:
+        written = tree.save()
+
+    if REPORT_FILE:
+        write_report(REPORT_FILE, registry)
+
+    print("\n" + "=" * 40)
+    print(f"Objects checked:      {len(tree)}")
+    print(f"Unique sheets:        {len(registry)}")
+    print(f"Redirected IDs:       {len(registry.redirects)}")
+    print(f"Conflicting IDs:      {len(registry.conflicts)}")
+    print(f"Objects to update:    {changed}")
+    print(f"Files written:        {written}")
+    print("=" * 40)
+    if REPORT_FILE:
+        print(f"Report saved to {REPORT_FILE}")
+
+
+if __name__ == "__main__":
+    main()
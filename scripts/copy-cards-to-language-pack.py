@@ -2,6 +2,7 @@ import os
 import json
 import shutil
 import pandas as pd
+from modules.multi_replace import MultiReplacer
 
 TABLE_PATH = r"C:\Users\pulsc\Downloads\TRans(KR).csv"
 SOURCE_FOLDER = r"C:\git\SCED-downloads\decomposed\campaign\The Scarlet Keys"
@@ -11,8 +12,13 @@ TARGET_FOLDER = r"C:\git\SCED-downloads\decomposed\language-pack\Korean - Campai
 def process_card_jsons(table_path, source_dir, target_dir):
     # Load the URL mapping
     df = pd.read_csv(table_path, sep=';')
+    # Rows with a missing URL would map from or to NaN
+    df = df.dropna(subset=["old_url", "new_url"])
     url_map = dict(zip(df["old_url"], df["new_url"]))
 
+    # All URLs are replaced in a single scan of each card
+    url_replacer = MultiReplacer(url_map)
+
     if not os.path.exists(target_dir):
         os.makedirs(target_dir)
 
@@ -29,15 +35,10 @@ def process_card_jsons(table_path, source_dir, target_dir):
 
                     name_value = data.get("Name")
                     if name_value == "Card" or name_value == "CardCustom":
-                        found_match = False
                         json_str = json.dumps(data, ensure_ascii=False)
+                        json_str, replacement_count = url_replacer.replace_with_count(json_str)
 
-                        for old_url, new_url in url_map.items():
-                            if old_url in json_str:
-                                json_str = json_str.replace(old_url, new_url)
-                                found_match = True
-
-                        if found_match:
+                        if replacement_count:
                             # Because we are flattening subfolders, we check if the file
                             # already exists in the target to avoid overwriting blindly
                             target_path = os.path.join(target_dir, filename)
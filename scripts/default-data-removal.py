@@ -5,7 +5,11 @@
 import os
 import json
 import copy
+import csv
 import math
+from concurrent.futures import ProcessPoolExecutor
+from modules.git_changes import get_changed_objects, parse_change_args
+from modules.json_writer import write_text_atomic
 
 # Set the root directory where your JSON files are located.
 # Examples:
@@ -20,6 +24,20 @@ PRINTING_DEPTH = 2
 ANGLE_MULTIPLE = 5
 REMOVE_TAGS_AND_SCRIPTING = False
 
+# Report mode: calculates the byte savings per key and per folder without writing any files
+REPORT_ONLY = False
+REPORT_TOP_N = 20
+# Optional export of the full report, e.g. "default-data-report.csv" or "default-data-report.json"
+REPORT_EXPORT_PATH = None
+
+# Number of worker processes (1 = process all files in this process, 0 = one per CPU core)
+WORKER_COUNT = 0
+
+# Only process the files that git reports as changed (also available as "--changed-only")
+CHANGED_ONLY = False
+# Compare against this git ref instead of the last commit, e.g. "origin/main" (also "--since <ref>")
+CHANGED_SINCE = None
+
 # Default key-value pairs to remove from the JSON files.
 # If a key's value in a file matches the default, the key will be removed.
 DEFAULT_VALUES = {
@@ -93,169 +111,177 @@ def round_angle_and_normalize(angle, multiple):
     return int((angle + multiple / 2) // multiple) * multiple % 360
 
 
-def remove_default_values(data, defaults, is_nested=False):
-    """
-    Recursively removes keys from a dictionary if their values match the defaults.
-    Also handles special cases for "Deck" objects and float precision.
-    Removes position/rotation keys from any 'Transform' dictionary found
-    when is_nested is True (i.e., not the top-level object in the file).
-    This function modifies the 'data' dictionary in place.
+# Keys that are removed with REMOVE_TAGS_AND_SCRIPTING
+SCRIPTING_KEYS = [
+    "Tags",
+    "LuaScript",
+    "LuaScript_path",
+    "LuaScriptState",
+    "LuaScriptState_path",
+    "XmlUI",
+    "CustomUIAssets",
+]
 
-    Args:
-        data (dict): The dictionary to clean (from the JSON file).
-        defaults (dict): The dictionary of default values.
-        is_nested (bool, optional): True if the current data is nested
-    """
-    # Special case: Handle "UniqueBack"
-    if "CustomDeck" in data and isinstance(data["CustomDeck"], dict):
-        custom_deck = data["CustomDeck"]
-        for deck_id in list(custom_deck.keys()):
-            deck_data = custom_deck[deck_id]
-
-            if isinstance(deck_data, dict):
-                if deck_data.get("BackURL") in NON_UNIQUE_BACKS.values():
-                    # This has a regular back (= non unique)
-                    deck_data.pop("UniqueBack", None)
-                elif deck_data.get("NumWidth") == 1 and deck_data.get("NumHeight") == 1:
-                    # This is a single card
-                    deck_data["UniqueBack"] = True
-                elif deck_data.get("UniqueBack") is False:
-                    # UniqueBack is False and can be removed (this is the default behaviour)
-                    deck_data.pop("UniqueBack", None)
-
-    # Special case: If the object's Name is "Deck", remove "HideWhenFaceDown" field
-    if data.get("Name") == "Deck" and "HideWhenFaceDown" in data:
-        del data["HideWhenFaceDown"]
-
-    # Special case: Conditional HideWhenFaceDown for Cards
-    if data.get("Name") in ["Card", "CardCustom"] and "HideWhenFaceDown" in data:
-        # Get the Card's DeckID (TTS DeckIDs have the last two digits for card index)
-        card_id_str = str(data.get("CardID", ""))
-        deck_id_prefix = card_id_str[:-2]
-        custom_deck = data.get("CustomDeck", {})
-        deck_settings = custom_deck.get(deck_id_prefix)
-
-        if isinstance(deck_settings, dict):
-            unique_back = deck_settings.get("UniqueBack", False)
-
-            # Logic:
-            # If UniqueBack is False, default HideWhenFaceDown is True
-            # If UniqueBack is True, default HideWhenFaceDown is False
-            if unique_back != data["HideWhenFaceDown"]:
-                del data["HideWhenFaceDown"]
-
-    # Special case: Maybe remove secondary URL for Tiles
-    if data.get("Name") == "Custom_Tile" and "CustomImage" in data:
-        image_data = data["CustomImage"]
-        if (
-            "ImageSecondaryURL" in image_data
-            and image_data["ImageURL"] == image_data["ImageSecondaryURL"]
-        ):
-            del image_data["ImageSecondaryURL"]
-
-    # Maybe remove scripting (and XML)
-    if REMOVE_TAGS_AND_SCRIPTING:
-        for key in [
-            "Tags",
-            "LuaScript",
-            "LuaScript_path",
-            "LuaScriptState",
-            "LuaScriptState_path",
-            "XmlUI",
-            "CustomUIAssets",
-        ]:
-            if key in data:
-                del data[key]
-
-    if "Transform" in data:
-        clean_transform_data(data["Transform"], is_nested)
-
-    if "AttachedDecals" in data:
-        for decal in data["AttachedDecals"]:
-            if "OwnerSteamID" in decal:
-                del decal["OwnerSteamID"]
+# Keys whose default value isn't compared with a plain equality check (see compile_defaults)
+SPECIAL_DEFAULT_KEYS = ("ColorDiffuse", "CustomMesh")
 
-            if "Transform" in decal:
-                clean_transform_data(decal["Transform"], False)
+# (defaults table, compiled matcher) of the last used table, the table is kept so its id can't be reused
+_compiled_defaults = (None, None)
 
-    # Iterate over a copy of the keys, as we may modify the dictionary
-    for key in list(data.keys()):
-        current_value = data.get(key)
 
-        # Case 1: The key is a defined default (e.g., "AltLookAngle").
-        if key in defaults:
-            default_value = defaults[key]
+def compile_defaults(defaults):
+    """
+    Compiles a table of default values into a function (data, is_nested) that removes them.
+    The comparison of every key is decided once here instead of for every key of every object:
+    each object only looks at the keys it shares with the table (a set intersection)
+    and only steps into dicts and lists that aren't default values themselves.
+    """
+    defaults = copy.deepcopy(defaults)
+    color_default = defaults.get("ColorDiffuse")
+    mesh_default = defaults.get("CustomMesh")
+    equal_defaults = {key: value for key, value in defaults.items() if key not in SPECIAL_DEFAULT_KEYS}
+    equal_keys = set(equal_defaults)
+
+    default_keys = set(defaults)
+    # Values of these keys are not cleaned recursively
+    skipped_keys = default_keys | {"AttachedDecals"}
+    # A dict without any of these keys and without nested dicts / lists doesn't need to be cleaned
+    handled_keys = default_keys | {"CustomDeck", "Name", "Transform", "AttachedDecals"} | set(SCRIPTING_KEYS)
+    container_types = {dict, list}
+    non_unique_backs = set(NON_UNIQUE_BACKS.values())
+
+    def needs_cleaning(data):
+        # Both checks run in C (set operations), which is cheaper than calling clean() on a leaf like "Transform"
+        return not handled_keys.isdisjoint(data) or not container_types.isdisjoint(map(type, data.values()))
+
+    def clean(data, is_nested):
+        # Special case: Handle "UniqueBack"
+        if "CustomDeck" in data and isinstance(data["CustomDeck"], dict):
+            for deck_data in data["CustomDeck"].values():
+                if isinstance(deck_data, dict):
+                    if deck_data.get("BackURL") in non_unique_backs:
+                        # This has a regular back (= non unique)
+                        deck_data.pop("UniqueBack", None)
+                    elif deck_data.get("NumWidth") == 1 and deck_data.get("NumHeight") == 1:
+                        # This is a single card
+                        deck_data["UniqueBack"] = True
+                    elif deck_data.get("UniqueBack") is False:
+                        # UniqueBack is False and can be removed (this is the default behaviour)
+                        deck_data.pop("UniqueBack", None)
+
+        name = data.get("Name")
+        is_card = name == "Card" or name == "CardCustom"
+        if name == "Deck":
+            # Special case: If the object's Name is "Deck", remove "HideWhenFaceDown" field
+            data.pop("HideWhenFaceDown", None)
+        elif is_card and "HideWhenFaceDown" in data:
+            # Special case: Conditional HideWhenFaceDown for Cards
+            # Get the Card's DeckID (TTS DeckIDs have the last two digits for card index)
+            card_id_str = str(data.get("CardID", ""))
+            deck_settings = data.get("CustomDeck", {}).get(card_id_str[:-2])
+
+            if isinstance(deck_settings, dict):
+                # If UniqueBack is False, default HideWhenFaceDown is True
+                # If UniqueBack is True, default HideWhenFaceDown is False
+                if deck_settings.get("UniqueBack", False) != data["HideWhenFaceDown"]:
+                    del data["HideWhenFaceDown"]
+        elif name == "Custom_Tile" and "CustomImage" in data:
+            # Special case: Maybe remove secondary URL for Tiles
+            image_data = data["CustomImage"]
+            if "ImageSecondaryURL" in image_data and image_data["ImageURL"] == image_data["ImageSecondaryURL"]:
+                del image_data["ImageSecondaryURL"]
+
+        # Maybe remove scripting (and XML)
+        if REMOVE_TAGS_AND_SCRIPTING:
+            for key in SCRIPTING_KEYS:
+                data.pop(key, None)
+
+        if "Transform" in data:
+            clean_transform_data(data["Transform"], is_nested)
+
+        if "AttachedDecals" in data:
+            for decal in data["AttachedDecals"]:
+                if "OwnerSteamID" in decal:
+                    del decal["OwnerSteamID"]
+
+                if "Transform" in decal:
+                    clean_transform_data(decal["Transform"], False)
+
+        # Keys with a default value
+        for key in equal_keys & data.keys():
+            if data[key] == equal_defaults[key]:
+                del data[key]
 
-            # Special handling for "ColorDiffuse" to account for float precision.
+        # Special handling for "ColorDiffuse" to account for float precision.
+        if color_default is not None and "ColorDiffuse" in data:
+            current_value = data["ColorDiffuse"]
             if (
-                key == "ColorDiffuse"
-                and isinstance(current_value, dict)
-                and all(k in current_value for k in ("r", "g", "b"))
+                isinstance(current_value, dict)
+                and "r" in current_value
+                and "g" in current_value
+                and "b" in current_value
                 and "a" not in current_value
             ):
-                if data.get("Name") == "Card" or data.get("Name") == "CardCustom":
-                    precision = 1
-                else:
-                    precision = 5
-
-                # Using math.isclose is robust for float comparisons
+                tolerance = 10**-1 if is_card else 10**-5
                 if (
-                    math.isclose(
-                        current_value["r"],
-                        default_value["r"],
-                        rel_tol=1e-9,
-                        abs_tol=10**-precision,
-                    )
-                    and math.isclose(
-                        current_value["g"],
-                        default_value["g"],
-                        rel_tol=1e-9,
-                        abs_tol=10**-precision,
-                    )
-                    and math.isclose(
-                        current_value["b"],
-                        default_value["b"],
-                        rel_tol=1e-9,
-                        abs_tol=10**-precision,
-                    )
+                    math.isclose(current_value["r"], color_default["r"], rel_tol=1e-9, abs_tol=tolerance)
+                    and math.isclose(current_value["g"], color_default["g"], rel_tol=1e-9, abs_tol=tolerance)
+                    and math.isclose(current_value["b"], color_default["b"], rel_tol=1e-9, abs_tol=tolerance)
                 ):
-                    del data[key]
-
-            # Special handling for "CustomMesh" to remove nested defaults.
-            elif key == "CustomMesh" and isinstance(current_value, dict):
-                # Iterate over a copy of the nested keys
-                for mesh_key in list(current_value.keys()):
-                    if (
-                        mesh_key in default_value
-                        and current_value[mesh_key] == default_value[mesh_key]
-                    ):
-                        del current_value[mesh_key]
+                    del data["ColorDiffuse"]
+            elif current_value == color_default:
+                del data["ColorDiffuse"]
+
+        # Special handling for "CustomMesh" to remove nested defaults.
+        if mesh_default is not None and "CustomMesh" in data:
+            current_value = data["CustomMesh"]
+            if isinstance(current_value, dict):
+                for mesh_key in [k for k, v in current_value.items() if k in mesh_default and v == mesh_default[k]]:
+                    del current_value[mesh_key]
                 # If the CustomMesh dictionary becomes empty after cleanup, remove it.
                 if not current_value:
-                    del data[key]
+                    del data["CustomMesh"]
+            elif current_value == mesh_default:
+                del data["CustomMesh"]
 
-            # Standard comparison for all other keys.
-            elif current_value == default_value:
-                del data[key]
+        # Step into the remaining dictionaries and lists (e.g. "ObjectStates"), they are nested
+        for key, value in data.items():
+            value_type = type(value)
+            if value_type is dict:
+                if key not in skipped_keys and needs_cleaning(value):
+                    clean(value, True)
+            elif value_type is list and key not in skipped_keys:
+                for item in value:
+                    if type(item) is dict and needs_cleaning(item):
+                        clean(item, True)
 
-        # Do not recurse into "AttachedDecals"
-        elif key == "AttachedDecals":
-            continue
+    return clean
 
-        # Case 2: The key is NOT a default, but its value is a dictionary.
-        # We should step into it to clean its contents recursively.
-        elif isinstance(current_value, dict):
-            # Pass True to indicate that the next level is nested.
-            remove_default_values(current_value, defaults, is_nested=True)
 
-        # Case 3: The key is NOT a default, but its value is a list.
-        # We check for any dictionaries within the list to clean them.
-        # This is common for structures like "ObjectStates" in TTS files.
-        elif isinstance(current_value, list):
-            for item in current_value:
-                if isinstance(item, dict):
-                    # Pass True to indicate that items in the list are nested.
-                    remove_default_values(item, defaults, is_nested=True)
+def remove_default_values(data, defaults, is_nested=False):
+    """
+    Recursively removes keys from a dictionary if their values match the defaults.
+    Also handles special cases for "Deck" objects and float precision.
+    Removes position/rotation keys from any 'Transform' dictionary found
+    when is_nested is True (i.e., not the top-level object in the file).
+    This function modifies the 'data' dictionary in place.
+    The defaults are compiled once (see compile_defaults) and reused for the same or an equal table,
+    so the table must not be changed in place between calls.
+
+    Args:
+        data (dict): The dictionary to clean (from the JSON file).
+        defaults (dict): The dictionary of default values.
+        is_nested (bool, optional): True if the current data is nested
+    """
+    global _compiled_defaults
+    compiled_table, clean = _compiled_defaults
+    if compiled_table is not defaults:
+        # The worker processes get a new (equal) copy of the table with every task
+        if compiled_table != defaults:
+            clean = compile_defaults(defaults)
+        _compiled_defaults = (defaults, clean)
+
+    clean(data, is_nested)
 
 
 def clean_transform_data(transform_data, is_nested):
@@ -310,6 +336,249 @@ def is_tts_object_folder(folder_name):
     return True
 
 
+def _entry_size(key, value, level):
+    """Number of bytes a 'key: value' entry takes up in a file written with an indent of 2."""
+    indent = " " * (2 * level)
+    value_str = json.dumps(value, indent=2, ensure_ascii=False).replace("\n", "\n" + indent)
+    return len(f'{indent}{json.dumps(key, ensure_ascii=False)}: {value_str},\n'.encode("utf-8"))
+
+
+def collect_key_savings(original, cleaned, savings, level=1, path=""):
+    """
+    Attributes the size difference between two versions of a dictionary to its keys (added up in 'savings').
+    Nested keys are named by their path (e.g. "Transform.posX"), numeric keys (e.g. CustomDeck IDs)
+    are replaced by "*" and objects in lists (e.g. ContainedObjects) start a new path.
+    """
+    for key, original_value in original.items():
+        key_path = f"{path}.{'*' if key.isdigit() else key}" if path else key
+
+        if key not in cleaned:
+            savings[key_path] = savings.get(key_path, 0) + _entry_size(key, original_value, level)
+            continue
+
+        cleaned_value = cleaned[key]
+        if original_value == cleaned_value:
+            continue
+
+        if isinstance(original_value, dict) and isinstance(cleaned_value, dict):
+            collect_key_savings(original_value, cleaned_value, savings, level + 1, key_path)
+        elif (
+            isinstance(original_value, list)
+            and isinstance(cleaned_value, list)
+            and len(original_value) == len(cleaned_value)
+        ):
+            for original_item, cleaned_item in zip(original_value, cleaned_value):
+                if isinstance(original_item, dict) and isinstance(cleaned_item, dict):
+                    collect_key_savings(original_item, cleaned_item, savings, level + 2)
+        else:
+            saved = _entry_size(key, original_value, level) - _entry_size(key, cleaned_value, level)
+            savings[key_path] = savings.get(key_path, 0) + saved
+
+    # Keys can also be added (e.g. "UniqueBack" for single cards), which counts as negative savings
+    for key, cleaned_value in cleaned.items():
+        if key not in original:
+            key_path = f"{path}.{'*' if key.isdigit() else key}" if path else key
+            savings[key_path] = savings.get(key_path, 0) - _entry_size(key, cleaned_value, level)
+
+
+class SavingsReport:
+    """Collects the byte savings of all processed files (used by the report mode)."""
+
+    def __init__(self, base_directory):
+        self.base_directory = base_directory
+        self.total_before = 0
+        self.total_after = 0
+        self.keys = {}  # key path -> [bytes saved, number of files]
+        self.folders = {}  # folder -> [bytes saved, number of files]
+
+    def add(self, file_path, savings):
+        saved = savings["bytes_before"] - savings["bytes_after"]
+        self.total_before += savings["bytes_before"]
+        self.total_after += savings["bytes_after"]
+
+        # Whatever can't be attributed to a key comes from formatting (e.g. unicode escapes)
+        key_savings = dict(savings["keys"])
+        formatting = saved - sum(key_savings.values())
+        if formatting:
+            key_savings["(formatting)"] = formatting
+
+        for key, key_saved in key_savings.items():
+            entry = self.keys.setdefault(key, [0, 0])
+            entry[0] += key_saved
+            entry[1] += 1
+
+        # Group by folder, limited to PRINTING_DEPTH levels below the base directory
+        relative_folder = os.path.relpath(os.path.dirname(file_path), self.base_directory)
+        folder = os.sep.join(relative_folder.split(os.sep)[:PRINTING_DEPTH])
+        entry = self.folders.setdefault(folder, [0, 0])
+        entry[0] += saved
+        entry[1] += 1
+
+    def _sorted(self, table):
+        return sorted(table.items(), key=lambda item: (-item[1][0], item[0]))
+
+    def print_summary(self, top_n):
+        saved = self.total_before - self.total_after
+        percentage = saved / self.total_before * 100 if self.total_before else 0
+        print("\n--- 📊 Savings Report (no files were written) ---")
+        print(f"Size of affected files: {self.total_before} bytes")
+        print(f"Possible savings:       {saved} bytes ({percentage:.1f}%)")
+
+        for title, table in (("keys", self.keys), ("folders", self.folders)):
+            print(f"\nTop {top_n} {title}:")
+            for name, (key_saved, files) in self._sorted(table)[:top_n]:
+                print(f"  {key_saved:>12} bytes  {files:>7} files  {name}")
+
+    def export(self, export_path):
+        """Exports the full report as .csv or .json (based on the file extension)."""
+        rows = [
+            {"kind": kind, "name": name, "bytes_saved": key_saved, "files": files}
+            for kind, table in (("key", self.keys), ("folder", self.folders))
+            for name, (key_saved, files) in self._sorted(table)
+        ]
+
+        if export_path.lower().endswith(".json"):
+            with open(export_path, "w", encoding="utf-8") as f:
+                report = {
+                    "bytes_before": self.total_before,
+                    "bytes_after": self.total_after,
+                    "entries": rows,
+                }
+                json.dump(report, f, indent=2, ensure_ascii=False)
+                f.write("\n")
+        else:
+            with open(export_path, "w", encoding="utf-8", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=["kind", "name", "bytes_saved", "files"])
+                writer.writeheader()
+                writer.writerows(rows)
+        print(f"\nReport exported to: {export_path}")
+
+
+def process_file(file_path, defaults, is_nested, report_only=False):
+    """
+    Removes the default values from a single file.
+    Returns a tuple (modified, messages, savings) - the messages are printed by the caller,
+    so the output stays in order when files are processed by multiple workers.
+    'savings' is only calculated in report mode (the file is not written in that case).
+    """
+    messages = []
+    if DETAILED_PRINTING:
+        messages.append(f"-> Processing: {file_path}")
+    try:
+        # Read the original file to load JSON data
+        with open(file_path, "r", encoding="utf-8") as f:
+            content = f.read()
+            # TTS JSON can sometimes have leading/trailing characters; we find the main object
+            json_start = content.find("{")
+            json_end = content.rfind("}") + 1
+            if json_start == -1:
+                messages.append("   - No JSON object found. Skipping.")
+                return False, messages, None
+
+            json_content = content[json_start:json_end]
+            data = json.loads(json_content)
+
+        # Keep a deep copy of the original data for comparison later
+        original_data = copy.deepcopy(data)
+
+        # Remove the default values by modifying 'data' in place
+        remove_default_values(data, defaults, is_nested=is_nested)
+
+        # We rewrite the file if data was changed OR if the original file
+        # contained Unicode escape sequences that need to be fixed.
+        file_needs_rewrite = (data != original_data) or ("\\u" in json_content)
+
+        if file_needs_rewrite:
+            # Use an indent of 2 and no trailing whitespace for clean files
+            # Add a newline at the end of the file for POSIX compliance
+            output = json.dumps(data, indent=2, separators=(",", ": "), ensure_ascii=False) + "\n"
+
+            if report_only:
+                savings = {
+                    "bytes_before": len(content.encode("utf-8")),
+                    "bytes_after": len(output.encode("utf-8")),
+                    "keys": {},
+                }
+                collect_key_savings(original_data, data, savings["keys"])
+
+                if DETAILED_PRINTING:
+                    saved = savings["bytes_before"] - savings["bytes_after"]
+                    messages.append(f"   - 📝 Would save {saved} bytes.")
+                return True, messages, savings
+
+            write_text_atomic(file_path, output)
+
+            if DETAILED_PRINTING:
+                messages.append("   - ✅ Modified and saved.")
+            return True, messages, None
+
+        if DETAILED_PRINTING:
+            messages.append("   - 💤 No changes needed.")
+
+    except json.JSONDecodeError:
+        messages.append(f"   - ⚠️ Error: Could not decode JSON. ({file_path})")
+    except Exception as e:
+        messages.append(f"   - ❌ An unexpected error occurred: {e}. ({file_path})")
+    return False, messages, None
+
+
+def _process_task(task):
+    """Worker entry point for the process pool."""
+    return process_file(*task)
+
+
+def run_tasks(tasks, defaults, report=None):
+    """
+    Processes a list of (file_path, is_nested) tuples and returns the number of modified files.
+    Plain strings in the list are headers and get printed at their position.
+    If a SavingsReport is provided, no files are written and the savings are added to it.
+    """
+    report_only = report is not None
+    file_tasks = [
+        (task[0], defaults, task[1], report_only) for task in tasks if not isinstance(task, str)
+    ]
+    worker_count = WORKER_COUNT or os.cpu_count() or 1
+
+    if worker_count > 1 and len(file_tasks) > 1:
+        executor = ProcessPoolExecutor(max_workers=worker_count)
+        chunksize = max(1, min(64, len(file_tasks) // (worker_count * 4)))
+        results = executor.map(_process_task, file_tasks, chunksize=chunksize)
+    else:
+        executor = None
+        results = map(_process_task, file_tasks)
+
+    modified_files = 0
+    try:
+        # Results are collected in submission order, so the output is deterministic
+        for task in tasks:
+            if isinstance(task, str):
+                print(task)
+                continue
+
+            modified, messages, savings = next(results)
+            for message in messages:
+                print(message)
+            if modified:
+                modified_files += 1
+            if savings:
+                report.add(task[0], savings)
+    finally:
+        if executor:
+            executor.shutdown()
+
+    return modified_files
+
+
+def finish_report(report):
+    """Prints (and maybe exports) the savings report."""
+    if report is None:
+        return
+
+    report.print_summary(REPORT_TOP_N)
+    if REPORT_EXPORT_PATH:
+        report.export(REPORT_EXPORT_PATH)
+
+
 def process_files_in_directory(directory, defaults):
     """Walks through a directory and processes all .json files."""
     abs_directory = os.path.abspath(directory)
@@ -318,8 +587,7 @@ def process_files_in_directory(directory, defaults):
         return
 
     print(f"Starting cleanup in directory: '{abs_directory}'")
-    total_files = 0
-    modified_files = 0
+    tasks = []
     last_root = None
 
     for root, dirs, files in os.walk(directory):
@@ -340,73 +608,48 @@ def process_files_in_directory(directory, defaults):
 
             # depth > 0 ensures we don't re-print the starting directory.
             if 0 < depth <= PRINTING_DEPTH:
-                print(f"Processing subfolder: {root}")
+                tasks.append(f"Processing subfolder: {root}")
             last_root = root
 
         for filename in files:
             # Handles standard JSON and Tabletop Simulator saved object files
             if filename.endswith(".json"):
-                file_path = os.path.join(root, filename)
-                total_files += 1
+                tasks.append((os.path.join(root, filename), is_folder_nested))
 
-                if DETAILED_PRINTING:
-                    print(f"-> Processing: {file_path}")
-                try:
-                    # Read the original file to load JSON data
-                    with open(file_path, "r", encoding="utf-8") as f:
-                        content = f.read()
-                        # TTS JSON can sometimes have leading/trailing characters; we find the main object
-                        json_start = content.find("{")
-                        json_end = content.rfind("}") + 1
-                        if json_start == -1:
-                            print("   - No JSON object found. Skipping.")
-                            continue
-
-                        json_content = content[json_start:json_end]
-                        data = json.loads(json_content)
-
-                    # Keep a deep copy of the original data for comparison later
-                    original_data = copy.deepcopy(data)
-
-                    # Remove the default values by modifying 'data' in place
-                    remove_default_values(data, defaults, is_nested=is_folder_nested)
-
-                    # We rewrite the file if data was changed OR if the original file
-                    # contained Unicode escape sequences that need to be fixed.
-                    file_needs_rewrite = (data != original_data) or (
-                        "\\u" in json_content
-                    )
-
-                    if file_needs_rewrite:
-                        with open(file_path, "w", encoding="utf-8") as f:
-                            # Use an indent of 2 and no trailing whitespace for clean files
-                            json.dump(
-                                data,
-                                f,
-                                indent=2,
-                                separators=(",", ": "),
-                                ensure_ascii=False,
-                            )
-                            # Add a newline at the end of the file for POSIX compliance
-                            f.write("\n")
-
-                        modified_files += 1
-
-                        if DETAILED_PRINTING:
-                            print("   - ✅ Modified and saved.")
-                    else:
-                        if DETAILED_PRINTING:
-                            print("   - 💤 No changes needed.")
-
-                except json.JSONDecodeError:
-                    print(f"   - ⚠️ Error: Could not decode JSON. ({file_path})")
-                except Exception as e:
-                    print(f"   - ❌ An unexpected error occurred: {e}. ({file_path})")
+    total_files = sum(1 for task in tasks if not isinstance(task, str))
+    report = SavingsReport(abs_directory) if REPORT_ONLY else None
+    modified_files = run_tasks(tasks, defaults, report)
 
     print("\n--- ✨ Cleanup Complete! ---")
     print(f"Scanned {total_files} files.")
-    print(f"Modified {modified_files} files.")
+    print(f"{'Would modify' if report else 'Modified'} {modified_files} files.")
+    finish_report(report)
+
+
+def process_changed_files(directory, defaults, since=None):
+    """Only processes the .json files that git reports as changed (plus their containers)."""
+    abs_directory = os.path.abspath(directory)
+    if not os.path.isdir(abs_directory):
+        print(f"Error: The specified directory '{abs_directory}' does not exist.")
+        return
+
+    print(f"Starting cleanup of changed files in directory: '{abs_directory}'")
+    tasks = [
+        (str(file_path), is_tts_object_folder(file_path.parent.name))
+        for file_path in get_changed_objects(abs_directory, since)
+    ]
+    report = SavingsReport(abs_directory) if REPORT_ONLY else None
+    modified_files = run_tasks(tasks, defaults, report)
+
+    print("\n--- ✨ Cleanup Complete! ---")
+    print(f"Scanned {len(tasks)} changed files.")
+    print(f"{'Would modify' if report else 'Modified'} {modified_files} files.")
+    finish_report(report)
 
 
 if __name__ == "__main__":
-    process_files_in_directory(TARGET_DIRECTORY, DEFAULT_VALUES)
+    changed_only, since = parse_change_args(CHANGED_ONLY, CHANGED_SINCE)
+    if changed_only:
+        process_changed_files(TARGET_DIRECTORY, DEFAULT_VALUES, since)
+    else:
+        process_files_in_directory(TARGET_DIRECTORY, DEFAULT_VALUES)
@@ -0,0 +1,50 @@
+# Finds duplicate cards across all decks and bags of a decomposed tree in a single pass.
+# Writes a report with the exact duplicates, the partial matches (manual review) and the files
+# that can be discarded. The discard list can be applied with sort-and-clean-decks.py
+# (set DUPLICATE_REPORT_FILE there).
+
+from pathlib import Path
+from modules.card_fingerprints import DuplicateIndex, fingerprint_from_summary, write_report
+from modules.decomposed_tree import EXCLUDED_DIRS
+from modules.parse_cache import ParseCache
+
+# --- Configuration ---
+SEARCH_FOLDER = Path(r"C:\git\SCED-downloads\decomposed")
+REPORT_FILE = Path(__file__).parent / "duplicate-cards.json"
+
+# Folders that are not searched
+EXCLUDED_FOLDERS = EXCLUDED_DIRS | {"language-pack"}
+
+
+def main():
+    print(f"Searching for duplicate cards in: {SEARCH_FOLDER}")
+    index = DuplicateIndex()
+    card_count = 0
+
+    # The parse cache keeps the fingerprint data, so repeated runs only parse changed files
+    with ParseCache() as cache:
+        for json_file_path, summary in cache.iter_summaries(SEARCH_FOLDER, EXCLUDED_FOLDERS):
+            if summary.get("Name") not in ["Card", "CardCustom"]:
+                continue
+
+            # Raw URLs: only cards with the very same URLs are discarded, cards that only differ in the
+            # Steam host are left to the partial matches for manual review
+            index.add(json_file_path, fingerprint_from_summary(summary, normalize_urls=False))
+            card_count += 1
+
+    report = write_report(REPORT_FILE, SEARCH_FOLDER, index)
+    discard_count = sum(len(mapping) for mapping in report["discard"].values())
+    cross_folder_count = sum(1 for group in report["exact_duplicates"] if group["cross_folder"])
+
+    print("\n" + "=" * 40)
+    print(f"Cards checked:             {card_count}")
+    print(f"Exact duplicate groups:    {len(report['exact_duplicates'])}")
+    print(f"  - across folders:        {cross_folder_count}")
+    print(f"Partial duplicate groups:  {len(report['partial_duplicates'])}")
+    print(f"Files to discard:          {discard_count}")
+    print("=" * 40)
+    print(f"Report saved to {REPORT_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,12 @@
 import os
 import json
+from modules.json_writer import write_json_if_changed
+from modules.metadata_access import load_metadata
 
 ORIGINAL_PATH = r"C:\git\SCED-downloads\decomposed\campaign\Alice in Wonderland"
 LANGUAGEPACK_PATH = r"C:\git\SCED-downloads\decomposed\language-pack\German - Fan Campaigns\German-FanCampaigns.GermanFC\AliceinWonderland.08d1cc"
 
 
-def get_metadata_obj(file_path):
-    base_name = os.path.splitext(file_path)[0]
-    gmnotes_file = base_name + ".gmnotes"
-
-    if os.path.exists(gmnotes_file):
-        with open(gmnotes_file, "r", encoding="utf-8") as f:
-            try:
-                return json.load(f)
-            except json.JSONDecodeError:
-                return {}
-
-    if os.path.exists(file_path):
-        with open(file_path, "r", encoding="utf-8") as f:
-            try:
-                data = json.load(f)
-                raw_notes = data.get("GMNotes", "")
-                if isinstance(raw_notes, str) and (
-                    raw_notes.startswith("{") or raw_notes.startswith("[")
-                ):
-                    return json.loads(raw_notes)
-                return {"type": raw_notes}
-            except (json.JSONDecodeError, TypeError):
-                return {}
-    return {}
-
-
 def update_transform(file_path):
     if not os.path.exists(file_path):
         return False
@@ -41,9 +17,7 @@ def update_transform(file_path):
         if "Transform" in data:
             data["Transform"]["scaleX"] = 0.8214
             data["Transform"]["scaleZ"] = 0.8214
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-                f.write("\n")
+            write_json_if_changed(file_path, data)
             return True
     except Exception:
         return False
@@ -56,7 +30,7 @@ for root, dirs, files in os.walk(ORIGINAL_PATH):
     for filename in files:
         if filename.endswith(".json"):
             file_path = os.path.join(root, filename)
-            meta = get_metadata_obj(file_path)
+            meta = load_metadata(file_path)
             meta_type = str(meta.get("type", ""))
 
             if meta_type in ["Act", "Agenda"] and "TtsZoopGuid" in meta:
@@ -72,7 +46,7 @@ for root, dirs, files in os.walk(LANGUAGEPACK_PATH):
             file_path = os.path.join(root, filename)
 
             try:
-                meta = get_metadata_obj(file_path)
+                meta = load_metadata(file_path)
                 id = meta.get("id", meta.get("TtsZoopGuid"))
 
                 if id in act_agenda_set:
@@ -3,6 +3,7 @@
 
 import json
 import os
+from modules.json_writer import write_json_if_changed
 
 # CONFIGURATION
 INPUT_FOLDER = r"C:\git\SCED-downloads\decomposed"
@@ -48,9 +49,7 @@ def update_json_files_in_folder(folder_path):
 
             data["CardID"] = proper_card_id
 
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-                f.write("\n")
+            write_json_if_changed(file_path, data)
 
             print(f"Processed file: {filename}")
 
@@ -1,54 +1,52 @@
 # Correctly sets the GMNotes_path for all files in a project folder
 
-import json
-import os
 from pathlib import Path
+from modules.decomposed_tree import DecomposedTree, TreeObject
 
 # --- Configuration ---
 TARGET_DIRECTORY = r"C:\git\SCED\objects\AllPlayerCards.15bb07"
-BASE_FOLDER_NAME = Path(TARGET_DIRECTORY).name
+
+
+def fix_object_gmnotes_path(tree_obj: TreeObject, base_folder) -> bool:
+    """Repairs the GMNotes_path of a single object. Returns True if it was changed."""
+    data = tree_obj.data
+    if "GMNotes_path" not in data:
+        return False
+
+    # repair the GMNNotes_path
+    rel_dir = tree_obj.path.parent.relative_to(base_folder)
+    new_path_parts = [Path(base_folder).name]
+
+    # Add the relative subdirectory if it's not the base directory itself
+    if rel_dir.parts:
+        # Use forward slashes for the GMNotes_path format
+        new_path_parts.append(rel_dir.as_posix())
+
+    # Add the final file name (name without file extension) with the new extension
+    new_path_parts.append(tree_obj.stem + ".gmnotes")
+
+    # Join all parts using a forward slash to match the target format
+    new_path = "/".join(new_path_parts)
+
+    if data["GMNotes_path"] == new_path:
+        return False
+
+    data["GMNotes_path"] = new_path
+    tree_obj.mark_modified()
+    return True
+
 
 def fix_gmnotes_path(base_folder):
-    for root, _, files in os.walk(base_folder):
-        for file_name in files:
-            if not file_name.endswith((".json")):
-                continue
-
-            file_path = os.path.join(root, file_name)
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-            if "GMNotes_path" not in data:
-                continue
-        
-            # name without file extension
-            name_with_guid = os.path.splitext(file_name)[0]
-
-            # repair the GMNNotes_path
-            rel_dir = os.path.relpath(root, base_folder)
-            new_path_parts = [BASE_FOLDER_NAME]
-
-            # Add the relative subdirectory if it's not the base directory itself (represented by '.')
-            if rel_dir != ".":
-                # Convert the relative path to use forward slashes for the GMNotes_path format
-                new_path_parts.append(rel_dir.replace("\\", "/"))
-
-            # Add the final file name with the new extension
-            new_path_parts.append(name_with_guid + ".gmnotes")
-            
-            # Join all parts using a forward slash to match the target format
-            new_path = "/".join(new_path_parts)
-
-            if data["GMNotes_path"] == new_path:
-                continue
-
-            data["GMNotes_path"] = new_path
-
-            # save the repaired .json file
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-                f.write("\n")
-
-                
+    tree = DecomposedTree(base_folder).scan()
+    for path, error in tree.errors.items():
+        print(f"Warning: Could not load {path}: {error}")
+
+    for tree_obj in tree:
+        fix_object_gmnotes_path(tree_obj, tree.root)
+
+    # save the repaired .json files
+    tree.save()
+
+
 if __name__ == "__main__":
     fix_gmnotes_path(TARGET_DIRECTORY)
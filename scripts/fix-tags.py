@@ -1,13 +1,22 @@
 # Uses the BackURL to enforce correct tags on cards
 
-import os
-import json
 from pathlib import Path
 from collections import OrderedDict
+from modules.decomposed_tree import DecomposedTree, TreeObject, EXCLUDED_DIRS
+from modules.git_changes import get_changed_objects, parse_change_args
+from modules.parse_cache import ParseCache, summarize_object
 
 # --- Configuration ---
 SEARCH_FOLDER = Path(r"C:\git\SCED-downloads\decomposed")
 
+# Keeps a summary of every file on disk so unchanged files don't have to be parsed again
+USE_PARSE_CACHE = True
+
+# Only process the files that git reports as changed (also available as "--changed-only")
+CHANGED_ONLY = False
+# Compare against this git ref instead of the last commit, e.g. "origin/main" (also "--since <ref>")
+CHANGED_SINCE = None
+
 # Mapping of BackURLs to Tag values
 BACK_URL_MAPPING = {
     "https://steamusercontent-a.akamaihd.net/ugc/2342503777940351785/F64D8EFB75A9E15446D24343DA0A6EEF5B3E43DB/": "ScenarioCard",
@@ -19,20 +28,17 @@ BACK_URL_MAPPING = {
 
 
 # --- Helper Functions ---
-def update_card_tags(json_file_path: Path, managed_tags: set):
-    with open(json_file_path, "r", encoding="utf-8") as f_json:
-        json_data = json.load(f_json)
-
-    updated = False
-
+def get_final_tags(summary: dict, managed_tags: set, file_name: str):
+    """
+    Calculates the tags of a card from its summary (see modules/parse_cache.py).
+    Returns None if the object should be skipped.
+    """
     # Skip decks
-    if json_data.get("Name") != "Card" and json_data.get("Name") != "CardCustom":
-        return
+    if summary.get("Name") != "Card" and summary.get("Name") != "CardCustom":
+        return None
 
     # Initialize current_tags safely
-    current_tags = []
-    if "Tags" in json_data and isinstance(json_data["Tags"], list):
-        current_tags = list(json_data["Tags"])  # Make a mutable copy
+    current_tags = list(summary.get("Tags") or [])
 
     # Use a set to build new tags, automatically handling uniqueness
     new_tags_set = set()
@@ -43,30 +49,19 @@ def update_card_tags(json_file_path: Path, managed_tags: set):
             new_tags_set.add(existing_tag)
 
     # Check BackURL for tag
-    if "CustomDeck" in json_data and isinstance(json_data["CustomDeck"], dict):
-        for _, deck_data in json_data["CustomDeck"].items():
-            if deck_data["BackURL"] in BACK_URL_MAPPING:
-                new_tags_set.add(BACK_URL_MAPPING[deck_data["BackURL"]])
-            else:
-                return
-
-    # Check for GM Notes and their internal 'type' field
-    gmnotes_data = None
-    if json_data.get("GMNotes"):  # Inline GMNotes (encoded JSON string)
-        try:
-            gmnotes_data = json.loads(json_data["GMNotes"])
-        except json.JSONDecodeError:
-            print(f"  - Warning: Could not decode GMNotes in {json_file_path.name}.")
-    elif json_data.get("GMNotes_path"):  # External .gmnotes file
-        absolute_gmnotes_name = json_file_path.stem + ".gmnotes"
-        absolute_gmnotes_path = json_file_path.parent / absolute_gmnotes_name
-        if absolute_gmnotes_path.exists():
-            with open(absolute_gmnotes_path, "r", encoding="utf-8") as f_gmnotes:
-                gmnotes_data = json.load(f_gmnotes)
+    for deck_data in summary.get("CustomDeck", {}).values():
+        if deck_data["BackURL"] in BACK_URL_MAPPING:
+            new_tags_set.add(BACK_URL_MAPPING[deck_data["BackURL"]])
+        else:
+            return None
+
+    # Check for GM Notes (inline or external .gmnotes file) and their internal 'type' field
+    if not summary.get("GMNotesValid", True):
+        print(f"  - Warning: Could not decode GMNotes in {file_name}.")
 
     # Check for metadata
-    if gmnotes_data:
-        card_type = gmnotes_data.get("type")
+    if summary.get("HasMetadata"):
+        card_type = summary.get("MetadataType")
         if card_type == "Asset" or card_type == "Location":
             new_tags_set.add(card_type)
     else:
@@ -76,20 +71,22 @@ def update_card_tags(json_file_path: Path, managed_tags: set):
                 new_tags_set.add(existing_tag)
 
     # Convert the set of new tags to a sorted list for consistent output and comparison
-    final_tags = sorted(list(new_tags_set))
+    return sorted(list(new_tags_set))
 
-    # Check if the tags have actually changed compared to the original sorted tags
-    if sorted(current_tags) != final_tags:
-        json_data["Tags"] = final_tags
-        updated = True
 
-    if updated:
-        sorted_json_data = OrderedDict(sorted(json_data.items()))
+def update_card_tags(tree_obj: TreeObject, managed_tags: set) -> bool:
+    """Updates the Tags of a card object in memory. Returns True if they were changed."""
+    summary = summarize_object(tree_obj.data, tree_obj.gmnotes)
+    final_tags = get_final_tags(summary, managed_tags, tree_obj.path.name)
+
+    # Check if the tags have actually changed compared to the original sorted tags
+    if final_tags is None or sorted(summary["Tags"] or []) == final_tags:
+        return False
 
-        with open(json_file_path, "w", encoding="utf-8") as f_json:
-            json.dump(sorted_json_data, f_json, indent=2)
-            f_json.write("\n")  # Add an empty line at the end of the file
-        print(f"Updated Tags in {json_file_path}")
+    tree_obj.data["Tags"] = final_tags
+    tree_obj.data = OrderedDict(sorted(tree_obj.data.items()))
+    tree_obj.mark_modified()
+    return True
 
 
 # --- Main Execution ---
@@ -102,15 +99,36 @@ def main():
     all_managed_tags.add("Asset")
     all_managed_tags.add("Location")
 
-    for root, dirs, files in os.walk(SEARCH_FOLDER):
-        if "language-pack" in dirs:
-            dirs.remove("language-pack")
+    excluded_dirs = EXCLUDED_DIRS | {"language-pack"}
+    changed_only, since = parse_change_args(CHANGED_ONLY, CHANGED_SINCE)
+
+    if changed_only:
+        tree = DecomposedTree(SEARCH_FOLDER, excluded_dirs)
+        search_root = Path(SEARCH_FOLDER).resolve()
+        for json_file_path in get_changed_objects(search_root, since):
+            if excluded_dirs.isdisjoint(json_file_path.relative_to(search_root).parts):
+                tree.load_file(json_file_path)
+        print(f"Found {len(tree)} changed objects.")
+    elif USE_PARSE_CACHE:
+        # Only the files with outdated tags are fully loaded
+        tree = DecomposedTree(SEARCH_FOLDER, excluded_dirs)
+        with ParseCache() as cache:
+            for json_file_path, summary in cache.iter_summaries(SEARCH_FOLDER, excluded_dirs):
+                final_tags = get_final_tags(summary, all_managed_tags, json_file_path.name)
+                if final_tags is not None and sorted(summary["Tags"] or []) != final_tags:
+                    tree.load_file(json_file_path)
+            print(f"Parse cache: {cache.hits} unchanged, {cache.misses} parsed.")
+    else:
+        tree = DecomposedTree(SEARCH_FOLDER, excluded_dirs).scan()
+
+    for path, error in tree.errors.items():
+        print(f"  - Warning: Could not load {path}: {error}")
 
-        for file_name in files:
-            if file_name.endswith(".json"):
-                json_file_path = Path(root) / file_name
-                update_card_tags(json_file_path, all_managed_tags)
+    for tree_obj in tree:
+        if update_card_tags(tree_obj, all_managed_tags):
+            print(f"Updated Tags in {tree_obj.path}")
 
+    tree.save()
     print(f"\nScript finished.")
 
 
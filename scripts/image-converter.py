@@ -1,16 +1,31 @@
 # Converts images to specified resolution, file format and file size (if JPG/WEBP)
 # Handles CMYK and removes borders if white
-# Attempts to extract card number for file name
+# Attempts to extract card number for file name (one Tesseract process per batch of images, or one
+# long-lived Tesseract instance per worker with tesserocr)
 
 import cv2
+import hashlib
+import io
+import json
 import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
 import numpy as np
 from PIL import Image
 import platform
 import pytesseract
 import re
 import sys
+import tempfile
 from PIL import Image, ImageCms, ImageEnhance, ImageOps
+from modules.json_writer import write_json_if_changed
+
+# tesserocr is optional: it keeps one Tesseract instance per process, otherwise the card number
+# areas of a batch are recognized by one Tesseract process (see OCR_BATCH_SIZE)
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
 
 # --------------------------------
 # MARK: Configuration
@@ -22,10 +37,13 @@ from PIL import Image, ImageCms, ImageEnhance, ImageOps
 ROTATE_HORIZONTAL_IMAGES = True
 OUTPUT = (750, 1050)  # width x height, use 0 to calculate automatically
 MAX_FILE_SIZE_KB = 450  # used for JPEG and WEBP
+PREDICT_QUALITY = True  # Start the quality search at the quality of the previous image in the folder
 OUTPUT_FORMAT = "WEBP"  # e.g. PNG / JPEG / WEBP
 OVERRIDE_EXISTING_FILES = False  # Will append "_1" etc. to the name if false
 OUTPUT_FOLDER = None  # Use "" (empty string) to save in the same folder as the source
 INPUT_PATH = None  # If undefined, you will be prompted for an input
+WORKER_COUNT = 0  # Number of worker processes for folders (0 = one per CPU core, 1 = no parallel processing)
+USE_MANIFEST = True  # Skip images that were already converted with the same settings (see MANIFEST_FILE_NAME)
 
 # Image cropping
 # --------------------------------
@@ -46,14 +64,16 @@ CONTRAST_BOOST = 1.0  # Default 1.0
 BRIGHTNESS_BOOST = 1.0  # Default 1.0
 AUTO_CONTRAST = False
 
-# Card Number Extracting (via Tesseract - Windows Only)
+# Card Number Extracting (via Tesseract)
 # --------------------------------
 
 EXTRACT_CARD_NUMBER = False
 DEBUG_IMAGES = False
 CARD_NUMBER_START = 11501
 CARD_NUMBER_AREA = {"h_start": 0.967, "h_end": 0.995, "w_start": 0.87, "w_end": 0.96}
-pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+TESSERACT_CMD = r"C:\Program Files\Tesseract-OCR\tesseract.exe"  # Windows only, elsewhere "tesseract" from PATH is used
+TESSDATA_PATH = None  # Folder with the Tesseract language data for tesserocr (None = default)
+OCR_BATCH_SIZE = 16  # Images per Tesseract process without tesserocr (the prepared images are kept in memory)
 
 # --------------------------------
 # MARK: Data
@@ -63,21 +83,55 @@ OUTPUT_LANDSCAPE = (OUTPUT[1], OUTPUT[0])
 OUTPUT_PORTRAIT = OUTPUT
 FILE_ENDING = {"PNG": "png", "JPEG": "jpg", "WEBP": "webp"}
 PLATFORM = platform.system()
+MIN_QUALITY = 51
+MAX_QUALITY = 100
+
+# The card number is a single line of text
+OCR_WHITELIST = "0123456789abcdefgh"
+OCR_CONFIG = f"--psm 7 -c tessedit_char_whitelist={OCR_WHITELIST}"
+OCR_API = None  # tesserocr instance, created once per process
+
+if PLATFORM == "Windows":
+    pytesseract.pytesseract.tesseract_cmd = TESSERACT_CMD
+
+# ICC profiles for the CMYK conversion (next to this script, independent of the working directory)
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CMYK_PROFILE = os.path.join(SCRIPT_DIR, "CGATS21_CRPC7.icc")
+SRGB_PROFILE = os.path.join(SCRIPT_DIR, "sRGB_ICC_v4_Appearance.icc")
+
+# Manifest in every output folder: source path -> content hash, settings hash and output file
+MANIFEST_FILE_NAME = ".image-converter-manifest.json"
+MANIFESTS = {}  # Loaded manifests per output folder
+MANIFEST_UPDATES = []  # (output folder, source key, entry) of this process, saved by the main process
+
+# CMYK -> RGB transform, built once per process (or the error if it couldn't be built)
+CMYK_TRANSFORM = None
+CMYK_TRANSFORM_ERROR = None
+
+# Last quality that was used per output folder (images of a set usually end up with similar qualities)
+QUALITY_PREDICTION = {}
+
+
+def get_cmyk_transform():
+    """Builds the CMYK -> sRGB transform on first use, parsing the profiles only once per process."""
+    global CMYK_TRANSFORM, CMYK_TRANSFORM_ERROR
+    if CMYK_TRANSFORM is None and CMYK_TRANSFORM_ERROR is None:
+        try:
+            CMYK_TRANSFORM = ImageCms.buildTransform(CMYK_PROFILE, SRGB_PROFILE, "CMYK", "RGB")
+        except Exception as e:
+            CMYK_TRANSFORM_ERROR = e
+    return CMYK_TRANSFORM
 
 
 def safe_convert_to_rgb(img):
     if img.mode == "CMYK":
         try:
-            cmyk_profile = "CGATS21_CRPC7.icc"
-            srgb_profile = "sRGB_ICC_v4_Appearance.icc"
-
             # Attempt the high-quality conversion
-            converted = ImageCms.profileToProfile(
-                img,
-                cmyk_profile,
-                srgb_profile,
-                outputMode="RGB",
-            )
+            transform = get_cmyk_transform()
+            if transform is None:
+                raise CMYK_TRANSFORM_ERROR
+
+            converted = ImageCms.applyTransform(img, transform)
 
             # If the tool returned something valid, use it
             if converted:
@@ -122,13 +176,19 @@ def get_content_box(img):
 
 
 def get_unique_filename(base_path, base_name, extension):
-    """Generate a unique filename by adding a numeric suffix if the file already exists."""
+    """
+    Generate a unique filename by adding a numeric suffix if the file already exists.
+    The (empty) file is created right away, so parallel workers can't pick the same name.
+    """
     counter = 1
     output_path = os.path.join(base_path, f"{base_name}{extension}")
-    while os.path.exists(output_path):
-        output_path = os.path.join(base_path, f"{base_name}_{counter}{extension}")
-        counter += 1
-    return output_path
+    while True:
+        try:
+            os.close(os.open(output_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return output_path
+        except FileExistsError:
+            output_path = os.path.join(base_path, f"{base_name}_{counter}{extension}")
+            counter += 1
 
 
 def calculate_new_size(original_size, target_size):
@@ -154,7 +214,8 @@ def calculate_new_size(original_size, target_size):
     return target_size
 
 
-def extract_card_number(img, image_path, debug_save_path):
+def get_card_number_roi(img):
+    """Returns the preprocessed card number area (black text on white) and a debug visualization."""
     img = np.array(img.copy().convert("RGB"))
     img = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
     h, w, _ = img.shape
@@ -186,10 +247,56 @@ def extract_card_number(img, image_path, debug_save_path):
 
     # Invert (Black text on white)
     img = cv2.bitwise_not(img)
+    return img, debug_img
+
+
+def recognize_card_number(roi):
+    """Returns the text of one card number area, with the same settings for tesserocr and pytesseract."""
+    global OCR_API
+    if tesserocr is None:
+        return pytesseract.image_to_string(roi, config=OCR_CONFIG)
+
+    if OCR_API is None:
+        kwargs = {"path": TESSDATA_PATH} if TESSDATA_PATH else {}
+        OCR_API = tesserocr.PyTessBaseAPI(psm=tesserocr.PSM.SINGLE_LINE, **kwargs)
+        OCR_API.SetVariable("tessedit_char_whitelist", OCR_WHITELIST)
+
+    OCR_API.SetImage(Image.fromarray(roi))
+    return OCR_API.GetUTF8Text()
+
+
+def recognize_card_numbers(rois):
+    """
+    Returns the text of every card number area. Without tesserocr, the areas are passed to a single
+    Tesseract process as a list of images (each one is still recognized as a single line).
+    """
+    if tesserocr is not None or len(rois) < 2:
+        return [recognize_card_number(roi) for roi in rois]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        image_paths = []
+        for index, roi in enumerate(rois):
+            image_paths.append(os.path.join(temp_dir, f"{index}.png"))
+            cv2.imwrite(image_paths[-1], roi)
+
+        # Tesseract reads a text file as a list of images and separates their text with form feeds
+        list_path = os.path.join(temp_dir, "images.txt")
+        with open(list_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(image_paths) + "\n")
 
-    # OCR
-    config = "--psm 7 -c tessedit_char_whitelist=0123456789abcdefgh"
-    text = pytesseract.image_to_string(img, config=config)
+        output_base = os.path.join(temp_dir, "output")
+        pytesseract.pytesseract.run_tesseract(list_path, output_base, "txt", None, OCR_CONFIG)
+        with open(output_base + ".txt", "r", encoding="utf-8") as f:
+            texts = f.read().split("\f")
+
+    if len(texts) != len(rois):
+        # A page was skipped (e.g. unreadable), the texts can't be assigned to the images
+        return [recognize_card_number(roi) for roi in rois]
+    return texts
+
+
+def parse_card_number(text):
+    """Returns the card number for the recognized text (or the cleaned text if it doesn't match)."""
     cleaned_text = re.sub(r"[^a-z0-9]", "", text.lower())
     match = re.search(r"(\d{1,3})([a-h]?)", cleaned_text)
 
@@ -200,10 +307,14 @@ def extract_card_number(img, image_path, debug_save_path):
 
         # Pad the number part to 3 digits and combine
         combined_number = CARD_NUMBER_START - 1 + int(number_part)
-        extracted_number = f"{combined_number:05d}{suffix_part}"
-    else:
-        extracted_number = cleaned_text  # Fallback to the fully cleaned text
+        return f"{combined_number:05d}{suffix_part}"
 
+    return cleaned_text  # Fallback to the fully cleaned text
+
+
+def extract_card_number(text, roi, debug_img, image_path, debug_save_path):
+    """Returns the card number for the recognized text of an image, or None if it couldn't be detected."""
+    extracted_number = parse_card_number(text)
     if len(extracted_number) > 0:
         return extracted_number
 
@@ -220,10 +331,11 @@ def extract_card_number(img, image_path, debug_save_path):
 
         # Save processed image
         processed_debug_filename = f"{name_start}_debug_processed.jpg"
-        cv2.imwrite(os.path.join(debug_save_path, processed_debug_filename), img)
+        cv2.imwrite(os.path.join(debug_save_path, processed_debug_filename), roi)
         print(f"[INFO] No number detected for {name_start} (see debug images)")
     else:
         print(f"[INFO] No number detected for {name_start}")
+    return None
 
 
 def crop_to_content(img, base_name):
@@ -247,143 +359,376 @@ def crop_to_content(img, base_name):
     return img
 
 
-def resize_and_compress(image_path):
+def encode_image(img, quality):
+    """Encodes the image in OUTPUT_FORMAT into memory and returns the bytes."""
+    buffer = io.BytesIO()
+    img.save(buffer, format=OUTPUT_FORMAT, quality=quality, method=6)
+    return buffer.getvalue()
+
+
+def encode_to_size(img, max_bytes, predicted_quality=None):
+    """
+    Binary-searches the highest quality (MIN_QUALITY to MAX_QUALITY) that stays below 'max_bytes'.
+    Returns (bytes, quality), or the result at MIN_QUALITY if nothing fits.
+    With a predicted quality, the search range is narrowed down by checking it (and the one above) first.
+    """
+    encoded = {}
+
+    def fits(quality):
+        if quality not in encoded:
+            encoded[quality] = encode_image(img, quality)
+        return len(encoded[quality]) <= max_bytes
+
+    low, high = MIN_QUALITY, MAX_QUALITY  # the answer is in [low, high]
+    if predicted_quality and MIN_QUALITY <= predicted_quality <= MAX_QUALITY:
+        if fits(predicted_quality):
+            low = predicted_quality
+            if low < high and fits(low + 1):
+                low += 1
+            else:
+                high = low
+        else:
+            high = max(MIN_QUALITY, predicted_quality - 1)
+
+    while low < high:
+        middle = (low + high + 1) // 2
+        if fits(middle):
+            low = middle
+        else:
+            high = middle - 1
+
+    fits(low)
+    return encoded[low], low
+
+
+def get_settings_hash():
+    """Hash of all settings that change the output image or its name."""
+    settings = {
+        "ROTATE_HORIZONTAL_IMAGES": ROTATE_HORIZONTAL_IMAGES,
+        "OUTPUT": OUTPUT,
+        "MAX_FILE_SIZE_KB": MAX_FILE_SIZE_KB,
+        "OUTPUT_FORMAT": OUTPUT_FORMAT,
+        "REMOVE_WHITE_BORDERS": REMOVE_WHITE_BORDERS,
+        "WHITE_THRESHOLD": WHITE_THRESHOLD,
+        "MAX_CROP_LIMIT": MAX_CROP_LIMIT,
+        "FIXED_CROP_OFFSETS": FIXED_CROP_OFFSETS,
+        "CROP_TO_OUTPUT_SIZE": CROP_TO_OUTPUT_SIZE,
+        "COLOR_BOOST": COLOR_BOOST,
+        "CONTRAST_BOOST": CONTRAST_BOOST,
+        "BRIGHTNESS_BOOST": BRIGHTNESS_BOOST,
+        "AUTO_CONTRAST": AUTO_CONTRAST,
+        # Settings that change the name of the output
+        "OVERRIDE_EXISTING_FILES": OVERRIDE_EXISTING_FILES,
+        "EXTRACT_CARD_NUMBER": EXTRACT_CARD_NUMBER,
+        "CARD_NUMBER_START": CARD_NUMBER_START,
+        "CARD_NUMBER_AREA": CARD_NUMBER_AREA,
+    }
+    return hashlib.sha1(json.dumps(settings, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def get_file_hash(file_path):
+    with open(file_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def load_manifest(target_dir):
+    """Returns the manifest of an output folder (cached per process)."""
+    if target_dir not in MANIFESTS:
+        try:
+            with open(os.path.join(target_dir, MANIFEST_FILE_NAME), "r", encoding="utf-8") as f:
+                MANIFESTS[target_dir] = json.load(f)
+        except (OSError, ValueError):
+            MANIFESTS[target_dir] = {}
+    return MANIFESTS[target_dir]
+
+
+def save_manifest_updates(updates):
+    """Merges the entries of converted images into the manifests of their output folders."""
+    by_folder = {}
+    for target_dir, source_key, entry in updates:
+        by_folder.setdefault(target_dir, {})[source_key] = entry
+
+    for target_dir, entries in by_folder.items():
+        # Reload, the cached manifest of this process doesn't contain the entries of other workers
+        MANIFESTS.pop(target_dir, None)
+        manifest = load_manifest(target_dir)
+        manifest.update(entries)
+        write_json_if_changed(os.path.join(target_dir, MANIFEST_FILE_NAME), dict(sorted(manifest.items())))
+
+
+def get_manifest_outputs(target_dir):
+    """Returns the (normalized) paths of the images that the manifest of an output folder lists as outputs."""
+    return {os.path.normcase(os.path.join(target_dir, entry["output"])) for entry in load_manifest(target_dir).values()}
+
+
+def get_target_dir(image_path, create=True):
+    """Determine which folder to use (created if needed)."""
+    if OUTPUT_FOLDER:
+        # If it's a relative path, put it inside the source image's directory
+        if not os.path.isabs(OUTPUT_FOLDER):
+            target_dir = os.path.join(os.path.dirname(image_path), OUTPUT_FOLDER)
+        else:
+            target_dir = OUTPUT_FOLDER
+
+        if create and not os.path.exists(target_dir):
+            os.makedirs(target_dir, exist_ok=True)
+        return target_dir
+
+    return os.path.dirname(image_path)
+
+
+def prepare_image(img, base_name):
+    """Converts, crops, resizes and enhances the image. Returns None if the image should be skipped."""
+    img = safe_convert_to_rgb(img)
+
+    # Check top row & bottom row and crop if white
+    if REMOVE_WHITE_BORDERS:
+        img = crop_to_content(img, base_name)
+        if img is None:
+            return None  # skip this file if the content wasn't properly detected
+
+    original_size = img.size
+
+    if ROTATE_HORIZONTAL_IMAGES:
+        # Calculate the final output size based on aspect ratio
+        output_size = calculate_new_size(original_size, OUTPUT)
+
+        # Rotate horizontal images 90° clockwise
+        if original_size[0] > original_size[1]:
+            img = img.rotate(-90, expand=True)
+    else:
+        # Determine orientation and set target size accordingly
+        if original_size[0] > original_size[1]:
+            output_size = calculate_new_size(original_size, OUTPUT_LANDSCAPE)
+        else:
+            output_size = calculate_new_size(original_size, OUTPUT_PORTRAIT)
+
+    # Maybe crop image with preference
+    if FIXED_CROP_OFFSETS:
+        left, top, right, bottom = FIXED_CROP_OFFSETS  # type: ignore
+        # Calculate the crop box: (left, top, width-right, height-bottom)
+        width, height = img.size
+        img = img.crop((left, top, width - right, height - bottom))
+
+    if CROP_TO_OUTPUT_SIZE:
+        # Crop image to output size
+        width, height = img.size
+        target_w, target_h = output_size
+
+        # Calculate the cropping box to center the cut
+        left = (width - target_w) / 2
+        top = (height - target_h) / 2
+        right = (width + target_w) / 2
+        bottom = (height + target_h) / 2
+
+        # Remove the outer area and keep the center
+        img = img.crop((left, top, right, bottom))
+    else:
+        # Resize image to exact dimensions (without keeping aspect ratio)
+        img = img.resize(output_size, Image.Resampling.LANCZOS)
+
+    # Cuts off 1% of extreme pixels to normalize
+    if AUTO_CONTRAST:
+        img = ImageOps.autocontrast(img, cutoff=1)
+
+    # Maybe boost colors
+    if COLOR_BOOST != 1.0:
+        converter = ImageEnhance.Color(img)
+        img = converter.enhance(COLOR_BOOST)
+
+    # Maybe boost contrast
+    if CONTRAST_BOOST != 1.0:
+        contrast_converter = ImageEnhance.Contrast(img)
+        img = contrast_converter.enhance(CONTRAST_BOOST)
+
+    # Maybe boost brightness
+    if BRIGHTNESS_BOOST != 1.0:
+        brightener = ImageEnhance.Brightness(img)
+        img = brightener.enhance(BRIGHTNESS_BOOST)
+
+    return img
+
+
+def is_output_name(output_path, base_name_no_ext, ending):
+    """Checks if the output has the name for 'base_name_no_ext' (including the suffix of get_unique_filename)."""
+    file_name = os.path.basename(output_path)
+    return re.fullmatch(re.escape(base_name_no_ext) + r"(_\d+)?" + re.escape(ending), file_name) is not None
+
+
+def check_manifest(image_path, target_dir):
+    """
+    Returns (source key, manifest entry without the output, previous output path, unchanged)
+    for an image, based on the manifest of its output folder.
+    """
+    source_key = os.path.relpath(image_path, target_dir).replace(os.sep, "/")
+    new_entry = {"hash": get_file_hash(image_path), "settings": get_settings_hash()}
+    entry = load_manifest(target_dir).get(source_key)
+    if not entry or not os.path.isfile(os.path.join(target_dir, entry["output"])):
+        return source_key, new_entry, None, False
+
+    unchanged = entry["hash"] == new_entry["hash"] and entry["settings"] == new_entry["settings"]
+    return source_key, new_entry, os.path.join(target_dir, entry["output"]), unchanged
+
+
+def load_image(image_path):
+    """
+    First step of the conversion: checks the manifest and prepares the image.
+    Returns the state for save_image(), or the status if the image is already done.
+    """
     base_name = os.path.basename(image_path)
     try:
+        target_dir = get_target_dir(image_path)
+        job = {"image_path": image_path, "target_dir": target_dir, "previous_output": None}
+
+        # Skip images that didn't change since the last conversion with the same settings
+        if USE_MANIFEST:
+            source_key, entry, previous_output, unchanged = check_manifest(image_path, target_dir)
+            if unchanged:
+                print(f"[SKIP] {base_name}: unchanged ({os.path.basename(previous_output)})")
+                return "unchanged"
+            job.update(source_key=source_key, entry=entry, previous_output=previous_output)
+
         with Image.open(image_path) as img:
-            img = safe_convert_to_rgb(img)
+            img = prepare_image(img, base_name)
+        if img is None:
+            return "skipped"
+        job["img"] = img
 
-            # Check top row & bottom row and crop if white
-            if REMOVE_WHITE_BORDERS:
-                img = crop_to_content(img, base_name)
-                if img is None:
-                    return  # skip this file if the content wasn't properly detected
+        # The card number area is recognized for the whole batch (see convert_images)
+        if EXTRACT_CARD_NUMBER and not OVERRIDE_EXISTING_FILES:
+            job["roi"], job["debug_img"] = get_card_number_roi(img)
+        return job
 
-            original_size = img.size
+    except Exception as e:
+        print(f"[ERROR] Failed to process {image_path}: {e}")
+        return "failed"
 
-            if ROTATE_HORIZONTAL_IMAGES:
-                # Calculate the final output size based on aspect ratio
-                output_size = calculate_new_size(original_size, OUTPUT)
 
-                # Rotate horizontal images 90° clockwise
-                if original_size[0] > original_size[1]:
-                    img = img.rotate(-90, expand=True)
-            else:
-                # Determine orientation and set target size accordingly
-                if original_size[0] > original_size[1]:
-                    output_size = calculate_new_size(original_size, OUTPUT_LANDSCAPE)
-                else:
-                    output_size = calculate_new_size(original_size, OUTPUT_PORTRAIT)
-
-            # Maybe crop image with preference
-            if FIXED_CROP_OFFSETS:
-                left, top, right, bottom = FIXED_CROP_OFFSETS  # type: ignore
-                # Calculate the crop box: (left, top, width-right, height-bottom)
-                width, height = img.size
-                img = img.crop((left, top, width - right, height - bottom))
-
-            if CROP_TO_OUTPUT_SIZE:
-                # Crop image to output size
-                width, height = img.size
-                target_w, target_h = output_size
-
-                # Calculate the cropping box to center the cut
-                left = (width - target_w) / 2
-                top = (height - target_h) / 2
-                right = (width + target_w) / 2
-                bottom = (height + target_h) / 2
-
-                # Remove the outer area and keep the center
-                img = img.crop((left, top, right, bottom))
-            else:
-                # Resize image to exact dimensions (without keeping aspect ratio)
-                img = img.resize(output_size, Image.Resampling.LANCZOS)
-
-            # Cuts off 1% of extreme pixels to normalize
-            if AUTO_CONTRAST:
-                img = ImageOps.autocontrast(img, cutoff=1)
-
-            # Maybe boost colors
-            if COLOR_BOOST != 1.0:
-                converter = ImageEnhance.Color(img)
-                img = converter.enhance(COLOR_BOOST)
-
-            # Maybe boost contrast
-            if CONTRAST_BOOST != 1.0:
-                contrast_converter = ImageEnhance.Contrast(img)
-                img = contrast_converter.enhance(CONTRAST_BOOST)
-
-            # Maybe boost brightness
-            if BRIGHTNESS_BOOST != 1.0:
-                brightener = ImageEnhance.Brightness(img)
-                img = brightener.enhance(BRIGHTNESS_BOOST)
-
-
-
-            # Determine which folder to use
-            if OUTPUT_FOLDER:
-                # If it's a relative path, put it inside the source image's directory
-                if not os.path.isabs(OUTPUT_FOLDER):
-                    target_dir = os.path.join(
-                        os.path.dirname(image_path), OUTPUT_FOLDER
-                    )
-                else:
-                    target_dir = OUTPUT_FOLDER
-
-                if not os.path.exists(target_dir):
-                    os.makedirs(target_dir)
-            else:
-                target_dir = os.path.dirname(image_path)
-
-            base_name_no_ext = os.path.splitext(base_name)[0]
-
-            # Attempt to extract card number (Windows only)
-            if (
-                PLATFORM == "Windows"
-                and not OVERRIDE_EXISTING_FILES
-                and EXTRACT_CARD_NUMBER
-            ):
-                card_number = extract_card_number(img, image_path, target_dir)
-                if card_number:
-                    base_name_no_ext = card_number
-
-            # Construct final output path
-            ending = "." + FILE_ENDING[OUTPUT_FORMAT]
-            if OVERRIDE_EXISTING_FILES:
-                output_path = os.path.join(target_dir, f"{base_name_no_ext}{ending}")
-            else:
-                output_path = get_unique_filename(target_dir, base_name_no_ext, ending)
+def save_image(job, card_number_text=None):
+    """Second step of the conversion: names, encodes and saves the prepared image. Returns the status."""
+    image_path = job["image_path"]
+    target_dir = job["target_dir"]
+    previous_output = job["previous_output"]
+    img = job["img"]
+    output_path = None
+    try:
+        base_name_no_ext = os.path.splitext(os.path.basename(image_path))[0]
+
+        # Use the extracted card number as name
+        if card_number_text is not None:
+            card_number = extract_card_number(card_number_text, job["roi"], job["debug_img"], image_path, target_dir)
+            if card_number:
+                base_name_no_ext = card_number
+
+        # Construct final output path
+        ending = "." + FILE_ENDING[OUTPUT_FORMAT]
+        if previous_output and is_output_name(previous_output, base_name_no_ext, ending):
+            # Replace the previous conversion of this image instead of adding a copy
+            output_path = previous_output
+        elif OVERRIDE_EXISTING_FILES:
+            output_path = os.path.join(target_dir, f"{base_name_no_ext}{ending}")
+        else:
+            output_path = get_unique_filename(target_dir, base_name_no_ext, ending)
 
-            if OUTPUT_FORMAT.upper() == "PNG":
-                img.save(output_path, format=OUTPUT_FORMAT)
-            else:
-                # Save with compression to ensure file size is under MAX_FILE_SIZE_KB
-                # WebP and JPEG both use the 'quality' parameter
-                quality = 100
-                while quality > 50:
-                    img.save(
-                        output_path,
-                        format=OUTPUT_FORMAT,
-                        quality=quality,
-                        method=6,
-                    )
-                    file_size_kb = os.path.getsize(output_path) / 1024
-                    if file_size_kb <= MAX_FILE_SIZE_KB:
-                        break
-                    quality -= 1
-
-            if OUTPUT_FORMAT == "PNG":
-                file_size_kb = os.path.getsize(output_path) / 1024
-            else:
-                # Only perform size check for JPEG/WEBP, as PNG compression is different
-                if file_size_kb > MAX_FILE_SIZE_KB:
-                    print(f"[WARNING] Unable to compress {image_path}")
+        if OUTPUT_FORMAT.upper() == "PNG":
+            img.save(output_path, format=OUTPUT_FORMAT)
+            file_size_kb = os.path.getsize(output_path) / 1024
+        else:
+            # Find the highest quality below MAX_FILE_SIZE_KB and only write the final file
+            predicted = QUALITY_PREDICTION.get(target_dir) if PREDICT_QUALITY else None
+            data, quality = encode_to_size(img, MAX_FILE_SIZE_KB * 1024, predicted)
+            QUALITY_PREDICTION[target_dir] = quality
+            with open(output_path, "wb") as f:
+                f.write(data)
+
+            # Only perform size check for JPEG/WEBP, as PNG compression is different
+            file_size_kb = len(data) / 1024
+            if file_size_kb > MAX_FILE_SIZE_KB:
+                print(f"[WARNING] Unable to compress {image_path}")
 
-            print(f"[SUCCESS] Saved {output_path} ({file_size_kb:.2f} KB)")
+        # The previous conversion has a different name now (e.g. the card number), remove it
+        if previous_output and previous_output != output_path and os.path.isfile(previous_output):
+            os.remove(previous_output)
+
+        if USE_MANIFEST:
+            job["entry"]["output"] = os.path.basename(output_path)
+            MANIFEST_UPDATES.append((target_dir, job["source_key"], job["entry"]))
+
+        print(f"[SUCCESS] Saved {output_path} ({file_size_kb:.2f} KB)")
+        return "saved"
 
     except Exception as e:
         print(f"[ERROR] Failed to process {image_path}: {e}")
 
+        # Remove the name reserved by get_unique_filename
+        if output_path and os.path.isfile(output_path) and os.path.getsize(output_path) == 0:
+            os.remove(output_path)
+        return "failed"
+
+
+def convert_images(image_paths):
+    """
+    Converts a batch of images, the card numbers of the batch are recognized together.
+    Returns the status of every image: "saved", "unchanged", "skipped" or "failed".
+    """
+    jobs = [load_image(image_path) for image_path in image_paths]
+    prepared = [job for job in jobs if isinstance(job, dict)]
+
+    texts = [None] * len(prepared)
+    if EXTRACT_CARD_NUMBER and not OVERRIDE_EXISTING_FILES and prepared:
+        try:
+            texts = recognize_card_numbers([job["roi"] for job in prepared])
+        except Exception as e:
+            print(f"[ERROR] Card number recognition failed: {e}")
+            return [job if isinstance(job, str) else "failed" for job in jobs]
+
+    text_by_path = {job["image_path"]: text for job, text in zip(prepared, texts)}
+    return [job if isinstance(job, str) else save_image(job, text_by_path[job["image_path"]]) for job in jobs]
+
+
+def convert_images_task(image_paths):
+    """Runs convert_images in a worker process, the output is returned to be printed in order."""
+    output = io.StringIO()
+    with redirect_stdout(output):
+        statuses = convert_images(image_paths)
+
+    # The manifests are written by the main process
+    updates = MANIFEST_UPDATES[:]
+    MANIFEST_UPDATES.clear()
+    return statuses, output.getvalue(), updates
+
+
+def process_files(file_paths):
+    """Converts the images (in parallel for more than one image) and prints a summary."""
+    counts = {"saved": 0, "unchanged": 0, "skipped": 0, "failed": 0}
+    worker_count = WORKER_COUNT or os.cpu_count() or 1
+
+    # Without tesserocr, the card numbers of a batch are recognized by one Tesseract process
+    batch_size = 1
+    if EXTRACT_CARD_NUMBER and not OVERRIDE_EXISTING_FILES and tesserocr is None:
+        batch_size = max(1, OCR_BATCH_SIZE)
+    batches = [file_paths[i : i + batch_size] for i in range(0, len(file_paths), batch_size)]
+
+    if worker_count > 1 and len(batches) > 1:
+        with ProcessPoolExecutor(max_workers=min(worker_count, len(batches))) as executor:
+            for statuses, output, updates in executor.map(convert_images_task, batches):
+                print(output, end="")
+                for status in statuses:
+                    counts[status] += 1
+                MANIFEST_UPDATES.extend(updates)
+    else:
+        for batch in batches:
+            for status in convert_images(batch):
+                counts[status] += 1
+
+    save_manifest_updates(MANIFEST_UPDATES)
+    MANIFEST_UPDATES.clear()
+
+    print(
+        f"[INFO] Done: {counts['saved']} saved, {counts['unchanged']} unchanged, {counts['skipped']} skipped, "
+        f"{counts['failed']} failed ({len(file_paths)} images)"
+    )
+
 
 def process_folder(folder_path):
     """Process all image files in a folder (and its subfolders)."""
@@ -391,15 +736,32 @@ def process_folder(folder_path):
 
     supported_extensions = (".jpg", ".jpeg", ".png", ".webp", ".bmp", ".gif", ".tiff")
 
+    file_paths = []
     for root, _, files in os.walk(folder_path):
         # Prevent processing the output folder if it's inside the source folder
         if OUTPUT_FOLDER and OUTPUT_FOLDER in root:
             continue
 
-        for file_name in files:
+        for file_name in sorted(files):
             if file_name.lower().endswith(supported_extensions):
-                file_path = os.path.join(root, file_name)
-                resize_and_compress(file_path)
+                file_paths.append(os.path.join(root, file_name))
+
+    # Images that were written by a previous run are not sources (e.g. without OUTPUT_FOLDER)
+    if USE_MANIFEST:
+        outputs = {}
+        source_paths = []
+        for file_path in file_paths:
+            target_dir = get_target_dir(file_path, create=False)
+            if target_dir not in outputs:
+                outputs[target_dir] = get_manifest_outputs(target_dir)
+            if os.path.normcase(file_path) not in outputs[target_dir]:
+                source_paths.append(file_path)
+
+        if len(source_paths) < len(file_paths):
+            print(f"[INFO] Ignoring {len(file_paths) - len(source_paths)} images from previous runs")
+        file_paths = source_paths
+
+    process_files(file_paths)
 
 
 def process_input(path):
@@ -410,7 +772,7 @@ def process_input(path):
     if os.path.isdir(path):
         process_folder(path)
     elif os.path.isfile(path):
-        resize_and_compress(path)
+        process_files([path])
     else:
         print(f"[ERROR] Invalid path: {path}")
 
@@ -3,6 +3,7 @@
 import json
 import os
 import requests
+from modules.decomposed_tree import DecomposedTree
 
 # CONFIGURATION
 LOCALE = "ES"
@@ -85,118 +86,98 @@ def is_already_processed(data):
         return False
 
 
-def process_files_recursively(base_path):
+def process_files_recursively(tree):
     """
-    Step 1: Recursively rename files and update their internal ID metadata.
-    Fills the renaming_cache for Step 2.
+    Step 1: Update the internal ID metadata of the objects in the tree.
+    Fills the renaming_cache for Step 2 and returns the files to rename as (object, new path).
     """
     global renaming_cache
+    renames = []
 
-    for root, dirs, files in os.walk(base_path):
-        for filename in files:
-            if not filename.endswith(".json"):
-                continue
-
-            file_path = os.path.join(root, filename)
-
-            with open(file_path, "r", encoding="utf-8") as f:
-                try:
-                    data = json.load(f)
-                except json.JSONDecodeError:
-                    continue
+    for tree_obj in tree:
+        data = tree_obj.data
+        filename = tree_obj.path.name
 
-            # skip already processed files
-            if is_already_processed(data):
-                continue
-
-            # Check if Nickname exists and is in our translation map
-            adb_id = data.get("Nickname")
-            if not adb_id:
-                continue
+        # skip already processed files
+        if is_already_processed(data):
+            continue
 
-            if adb_id not in translation_data:
-                # We skip files that don't have a valid ID in the Nickname field
-                skipped_files.append(adb_id)
-                continue
+        # Check if Nickname exists and is in our translation map
+        adb_id = data.get("Nickname")
+        if not adb_id:
+            continue
 
-            translation = translation_data[adb_id]
-            translated_name = translation.get("name") or translation.get("real_name")
+        if adb_id not in translation_data:
+            # We skip files that don't have a valid ID in the Nickname field
+            skipped_files.append(adb_id)
+            continue
 
-            if not translated_name:
-                skipped_files.append(adb_id)
-                continue
+        translation = translation_data[adb_id]
+        translated_name = translation.get("name") or translation.get("real_name")
 
-            # Update Metadata
-            data["Nickname"] = translated_name
-            subname = translation.get("subname", "").strip()
+        if not translated_name:
+            skipped_files.append(adb_id)
+            continue
 
-            if subname:
-                data["Description"] = subname
-            else:
-                # Remove the key entirely if subname is empty/missing
-                data.pop("Description", None)
+        # Update Metadata
+        data["Nickname"] = translated_name
+        subname = translation.get("subname", "").strip()
 
-            data["GMNotes"] = f'{{"id": "{adb_id}"}}'
+        if subname:
+            data["Description"] = subname
+        else:
+            # Remove the key entirely if subname is empty/missing
+            data.pop("Description", None)
 
-            # Save updated content
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-                f.write("\n")
+        data["GMNotes"] = f'{{"id": "{adb_id}"}}'
+        tree_obj.mark_modified()
 
-            # Calculate new filename
-            clean_name = remove_characters(translated_name)
-            guid = data.get("GUID", "NOGUID")
-            new_filename = f"{clean_name}.{guid}.json"
-            new_file_path = os.path.join(root, new_filename)
+        # Calculate new filename
+        clean_name = remove_characters(translated_name)
+        guid = data.get("GUID", "NOGUID")
+        new_filename = f"{clean_name}.{guid}.json"
 
-            # Store in cache for Step 2 (ContainedObjects_order)
-            # We use filename[:-5] to strip '.json'
-            renaming_cache[filename[:-5]] = new_filename[:-5]
+        # Store in cache for Step 2 (ContainedObjects_order)
+        # We use filename[:-5] to strip '.json'
+        renaming_cache[filename[:-5]] = new_filename[:-5]
+        renames.append((tree_obj, tree_obj.path.with_name(new_filename)))
 
-            # Rename on disk
-            try:
-                os.rename(file_path, new_file_path)
-                print(f"Processed: {filename} -> {new_filename}")
-            except OSError as e:
-                print(f"Error renaming {filename}: {e}")
+    return renames
 
 
-def update_contained_objects(base_path):
+def update_contained_objects(tree):
     """
-    Step 2: Recursively update the 'ContainedObjects_order' list in all JSONs
+    Step 2: Update the 'ContainedObjects_order' list of all objects in the tree
     using the renaming_cache created in Step 1.
     """
-    for root, dirs, files in os.walk(base_path):
-        for filename in files:
-            if not filename.endswith(".json"):
-                continue
-
-            file_path = os.path.join(root, filename)
-
-            with open(file_path, "r", encoding="utf-8") as f:
-                try:
-                    data = json.load(f)
-                except json.JSONDecodeError:
-                    continue
-
-            if "ContainedObjects_order" in data and isinstance(
-                data["ContainedObjects_order"], list
-            ):
-                updated_list = []
-                changed = False
-                for item in data["ContainedObjects_order"]:
-                    if item in renaming_cache:
-                        updated_list.append(renaming_cache[item])
-                        changed = True
-                    else:
-                        updated_list.append(item)
-
-                if changed:
-                    data["ContainedObjects_order"] = updated_list
-                    with open(file_path, "w", encoding="utf-8") as f:
-                        json.dump(data, f, indent=2, ensure_ascii=False)
-                        f.write("\n")
-                    print(f"Updated object order in: {filename}")
+    for tree_obj in tree:
+        data = tree_obj.data
+        if "ContainedObjects_order" in data and isinstance(
+            data["ContainedObjects_order"], list
+        ):
+            updated_list = []
+            changed = False
+            for item in data["ContainedObjects_order"]:
+                if item in renaming_cache:
+                    updated_list.append(renaming_cache[item])
+                    changed = True
+                else:
+                    updated_list.append(item)
+
+            if changed:
+                data["ContainedObjects_order"] = updated_list
+                tree_obj.mark_modified()
+                print(f"Updated object order in: {tree_obj.path.name}")
+
+
+def rename_files(renames):
+    """Step 3: Rename the updated files on disk (after they were saved)."""
+    for tree_obj, new_file_path in renames:
+        try:
+            os.rename(tree_obj.path, new_file_path)
+            print(f"Processed: {tree_obj.path.name} -> {new_file_path.name}")
+        except OSError as e:
+            print(f"Error renaming {tree_obj.path.name}: {e}")
 
 
 def main():
@@ -211,11 +192,20 @@ def main():
     if os.path.isfile(INPUT_PATH):
         target_path = os.path.dirname(INPUT_PATH)
 
-    print("--- Step 1: Renaming and Metadata ---")
-    process_files_recursively(target_path)
+    # Every file is loaded once, the changes are written before the files are renamed
+    tree = DecomposedTree(target_path).scan()
+    for path, error in tree.errors.items():
+        print(f"Warning: Could not load {path}: {error}")
+
+    print("--- Step 1: Metadata ---")
+    renames = process_files_recursively(tree)
 
     print("\n--- Step 2: Updating Contained Objects Order ---")
-    update_contained_objects(target_path)
+    update_contained_objects(tree)
+    tree.save()
+
+    print("\n--- Step 3: Renaming ---")
+    rename_files(renames)
 
     if skipped_files:
         print("\n--- Skipped IDs ---")
@@ -3,6 +3,7 @@
 import json
 import os
 import requests
+from modules.decomposed_tree import DecomposedTree
 
 # CONFIGURATION
 LOCALE = "ES"
@@ -60,73 +61,65 @@ def update_json_files_in_folder(folder_path):
         print(f"Error: The directory {folder_path} was not found.")
         return
 
-    for root, dirs, files in os.walk(folder_path):
-        dirs[:] = [d for d in dirs if d not in {".git", ".github", ".vscode"}]
-
-        for filename in files:
-            if not filename.endswith(".json"):
-                continue
-
-            file_path = os.path.join(root, filename)
-
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-            # Only process cards
-            if data["Name"] != "Card" and data["Name"] != "CardCustom":
-                continue
-
-            # Skip cards with GMNotes
-            if "GMNotes" in data:
-                continue
-
-            nickname = data["Nickname"]
-
-            is_taboo = False
-            is_upgradesheet = False
-
-            # Handle taboo cards
-            if nickname.endswith(TABOO_SUFFIX):
-                # Remove the suffix by slicing
-                nickname = nickname[: -len(TABOO_SUFFIX)]
-                is_taboo = True
-
-            # Attempt to find the ID based on nickname
-            if nickname.lower() in translation_data:
-                translation = translation_data[nickname.lower()]
-            else:
-                skipped_files.append(nickname)
-                continue
-
-            if "code" in translation:
-                adb_id = translation["code"]
-
-                # Append "-t" for taboo cards
-                if is_taboo:
-                    adb_id += "-t"
-
-                # Append "-c" for UpgradeSheets
-                if "customization_options" in translation:
-                    # Check for the URL
-                    custom_deck = data["CustomDeck"]
-                    deck_info = list(custom_deck.values())[0]
-                    if deck_info["BackURL"] == UPGRADESHEET_URL:
-                        is_upgradesheet = True
-                        adb_id += "-c"
-            else:
-                skipped_files.append(nickname)
-                continue
-
-            # Maybe update description with subtitle
-            if "subname" in translation and not is_upgradesheet:
-                data["Description"] = translation["subname"]
-            data["GMNotes"] = '{"id": "' + adb_id + '"}'
-
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-                f.write("\n")
-
-            print(f"Processed file: {filename} ({adb_id})")
+    tree = DecomposedTree(folder_path).scan()
+    for path, error in tree.errors.items():
+        print(f"Warning: Could not load {path}: {error}")
+
+    # Only process cards
+    for tree_obj in tree.cards():
+        data = tree_obj.data
+        filename = tree_obj.path.name
+
+        # Skip cards with GMNotes
+        if "GMNotes" in data:
+            continue
+
+        nickname = data["Nickname"]
+
+        is_taboo = False
+        is_upgradesheet = False
+
+        # Handle taboo cards
+        if nickname.endswith(TABOO_SUFFIX):
+            # Remove the suffix by slicing
+            nickname = nickname[: -len(TABOO_SUFFIX)]
+            is_taboo = True
+
+        # Attempt to find the ID based on nickname
+        if nickname.lower() in translation_data:
+            translation = translation_data[nickname.lower()]
+        else:
+            skipped_files.append(nickname)
+            continue
+
+        if "code" in translation:
+            adb_id = translation["code"]
+
+            # Append "-t" for taboo cards
+            if is_taboo:
+                adb_id += "-t"
+
+            # Append "-c" for UpgradeSheets
+            if "customization_options" in translation:
+                # Check for the URL
+                custom_deck = data["CustomDeck"]
+                deck_info = list(custom_deck.values())[0]
+                if deck_info["BackURL"] == UPGRADESHEET_URL:
+                    is_upgradesheet = True
+                    adb_id += "-c"
+        else:
+            skipped_files.append(nickname)
+            continue
+
+        # Maybe update description with subtitle
+        if "subname" in translation and not is_upgradesheet:
+            data["Description"] = translation["subname"]
+        data["GMNotes"] = '{"id": "' + adb_id + '"}'
+
+        tree_obj.mark_modified()
+        print(f"Processed file: {filename} ({adb_id})")
+
+    tree.save()
 
 
 def remove_characters(text):
@@ -5,6 +5,8 @@
 import copy
 import json
 from pathlib import Path
+from modules.json_writer import write_json_if_changed
+from modules.sheet_registry import SheetRegistry, remap_custom_deck
 
 # Set the root directory where your JSON files are located.
 # Examples:
@@ -23,8 +25,7 @@ DETAILED_PRINTING = False
 PRINTING_DEPTH = 2
 
 # Global registry to track CustomDeck ID conflicts
-# Format: { "ID_STR": (FaceURL, BackURL) }
-ID_TO_FINGERPRINT = {}
+SHEET_REGISTRY = SheetRegistry()
 
 
 def process_files_in_directory(directory, keys_to_keep):
@@ -97,36 +98,8 @@ def process_files_in_directory(directory, keys_to_keep):
                             }
                             data["Transform"] = new_t
 
-                        # Fix CustomDeck Conflicts
-                        custom_deck = data.get("CustomDeck")
-                        if (
-                            custom_deck
-                            and isinstance(custom_deck, dict)
-                            and len(custom_deck) > 0
-                        ):
-                            orig_id = list(custom_deck.keys())[0]
-                            info = custom_deck[orig_id]
-                            fingerprint = (info.get("FaceURL"), info.get("BackURL"))
-
-                            # Find a valid ID for this fingerprint
-                            target_id = orig_id
-                            while (
-                                target_id in ID_TO_FINGERPRINT
-                                and ID_TO_FINGERPRINT[target_id] != fingerprint
-                            ):
-                                # Conflict detected: increment ID
-                                target_id = str(int(target_id) + 1)
-
-                            ID_TO_FINGERPRINT[target_id] = fingerprint
-
-                            # If the ID changed, update CustomDeck key and CardID
-                            if target_id != orig_id:
-                                # Rename CustomDeck Key
-                                data["CustomDeck"] = {target_id: custom_deck[orig_id]}
-                                # Update CardID suffix (preserving the last 2 digits)
-                                if "CardID" in data:
-                                    suffix = str(data["CardID"]).zfill(2)[-2:]
-                                    data["CardID"] = int(f"{target_id}{suffix}")
+                        # Fix CustomDeck Conflicts (one ID per sheet across all processed files)
+                        remap_custom_deck(data, SHEET_REGISTRY, str(file_path))
 
                     if file_path.suffix == ".gmnotes":
                         if "TtsZoopGuid" in data and "id" not in data:
@@ -142,17 +115,8 @@ def process_files_in_directory(directory, keys_to_keep):
                     )
 
                     if file_needs_rewrite:
-                        with open(file_path, "w", encoding="utf-8") as f:
-                            # Use an indent of 2 and no trailing whitespace for clean files
-                            json.dump(
-                                data,
-                                f,
-                                indent=2,
-                                separators=(",", ": "),
-                                ensure_ascii=False,
-                            )
-                            # Add a newline at the end of the file for POSIX compliance
-                            f.write("\n")
+                        # Canonical layout: indent of 2, no escaped unicode, newline at the end
+                        write_json_if_changed(file_path, data)
 
                         modified_files += 1
 
@@ -170,6 +134,8 @@ def process_files_in_directory(directory, keys_to_keep):
     print("\n--- ✨ Cleanup Complete! ---")
     print(f"Scanned {total_files} files.")
     print(f"Modified {modified_files} files.")
+    if SHEET_REGISTRY.conflicts:
+        print(f"Moved {len(SHEET_REGISTRY.conflicts)} sheets to a new CustomDeck ID (ID already in use).")
 
 
 if __name__ == "__main__":
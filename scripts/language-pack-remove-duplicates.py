@@ -1,43 +1,12 @@
 import os
 import json
+from modules.card_fingerprints import DuplicateIndex, get_card_fingerprint
 
 TARGET_FOLDER = r"C:\git\SCED-downloads\decomposed\language-pack\Korean - Campaigns\Korean-Campaigns.KoreanC\TheFeastofHemlockVale.c740af"
 
 
-def get_card_fingerprint(data):
-    """Extracts the specific properties needed for comparison."""
-    # Last two digits of CardID
-    card_id_suffix = str(data.get("CardID", ""))[-2:]
-
-    # URLs (Extracting from the first deck found in CustomDeck)
-    face_url = ""
-    back_url = ""
-    custom_deck = data.get("CustomDeck", {})
-    if custom_deck:
-        first_deck = list(custom_deck.values())[0]
-        face_url = first_deck.get("FaceURL", "")
-        back_url = first_deck.get("BackURL", "")
-
-    # GMNotes ID
-    gm_id = ""
-    gm_notes_str = data.get("GMNotes", "")
-    if gm_notes_str:
-        try:
-            gm_data = json.loads(gm_notes_str)
-            gm_id = gm_data.get("id", "")
-        except json.JSONDecodeError:
-            pass
-
-    return {
-        "id_suffix": card_id_suffix,
-        "face": face_url,
-        "back": back_url,
-        "gm_id": gm_id,
-    }
-
-
 def clean_duplicates(folder):
-    seen_exact = {}  # (suffix, face, back, gm_id) -> filename
+    index = DuplicateIndex()  # (suffix, face, back, gm_id) -> filenames
     partial_matches = []
     to_remove = []
 
@@ -49,11 +18,12 @@ def clean_duplicates(folder):
             with open(path, "r", encoding="utf-8") as f:
                 data = json.load(f)
 
-            fp = get_card_fingerprint(data)
-            exact_key = (fp["id_suffix"], fp["face"], fp["back"], fp["gm_id"])
+            # Compares the raw URLs: files are deleted, so only cards with identical URLs count as duplicates
+            fp = get_card_fingerprint(data, normalize_urls=False)
+            first_file, conflicting_files = index.add(filename, fp)
 
             # Check for Exact Duplicates
-            if exact_key in seen_exact:
+            if first_file is not None:
                 to_remove.append(path)
 
                 # Also check for .gmnotes to remove
@@ -62,24 +32,13 @@ def clean_duplicates(folder):
                     to_remove.append(gm_path)
                 continue
 
-            # Check for Partial Matches (Conflicts)
-            # We compare against already processed cards
-            for other_key, other_file in seen_exact.items():
-                other_suffix, other_face, other_back, other_gm = other_key
-
-                img_match = (
-                    fp["face"] == other_face
-                    and fp["back"] == other_back
-                    and fp["id_suffix"] == other_suffix
+            # Check for Partial Matches (Conflicts) against the already processed cards
+            # The index only returns cards where either the images or the ID match, but not both
+            for other_file, match in conflicting_files:
+                img_match = match == "image"
+                partial_matches.append(
+                    f"Conflict: {filename} <-> {other_file} (Img Match: {img_match}, ID Match: {not img_match})"
                 )
-                id_match = fp["gm_id"] == other_gm and fp["gm_id"] != ""
-
-                if img_match != id_match:  # XOR: one matches but not both
-                    partial_matches.append(
-                        f"Conflict: {filename} <-> {other_file} (Img Match: {img_match}, ID Match: {id_match})"
-                    )
-
-            seen_exact[exact_key] = filename
 
         except Exception as e:
             print(f"Error reading {filename}: {e}")
@@ -3,6 +3,7 @@
 import json
 import pandas as pd
 import re
+from modules.json_stream import rewrite_objects
 
 # Set the path to the TTS savegame JSON file
 SAVE_FILE = r"C:\Users\pulsc\Documents\My Games\Tabletop Simulator\Saves\Saved Objects\Children of Blood.json"
@@ -44,24 +45,20 @@ def load_metadata(file):
     return metadata_dict
 
 
-# Recursively update GMNotes in the save file
-def update_metadata(obj_list, metadata, unused_metadata):
-    for obj in obj_list:
-        if obj["Name"] == "Card" or obj["Name"] == "CardCustom":
-            # Try exact match (assuming the name is the ID)
-            name = obj["Nickname"].strip()
-            md_value = metadata.get(name)
+# Update GMNotes of a single object (called for every object while the save file is streamed)
+def update_metadata(obj, metadata, unused_metadata):
+    if obj.get("Name") == "Card" or obj.get("Name") == "CardCustom":
+        # Try exact match (assuming the name is the ID)
+        name = obj["Nickname"].strip()
+        md_value = metadata.get(name)
 
-            if md_value:
-                set_metadata(obj, md_value)
-                print(f"Updated metadata for: {name}")
+        if md_value:
+            set_metadata(obj, md_value)
+            print(f"Updated metadata for: {name}")
 
-                # Remove the data from the unused metadata list
-                unused_metadata.discard(name)
-
-        # Recursively update contained objects
-        if "ContainedObjects" in obj:
-            update_metadata(obj["ContainedObjects"], metadata, unused_metadata)
+            # Remove the data from the unused metadata list
+            unused_metadata.discard(name)
+    return obj
 
 
 def set_metadata(obj, md_value):
@@ -101,18 +98,6 @@ def set_metadata(obj, md_value):
         obj["Tags"].append("PlayerCard")
 
 
-# Load JSON save file
-def load_savegame(file):
-    with open(file, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-
-# Save the updated JSON back to file
-def save_savegame(file, data):
-    with open(file, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-
-
 # Main execution
 if __name__ == "__main__":
     metadata = load_metadata(METADATA_FILE)
@@ -121,13 +106,12 @@ if __name__ == "__main__":
     if not metadata:
         print("No valid metadata found. Please fix any JSON errors in the Excel file.")
     else:
-        savegame = load_savegame(SAVE_FILE)
-
-        # Change this to "ContainedObjects" for loadable objects
-        if "ObjectStates" in savegame:
-            update_metadata(savegame["ObjectStates"], metadata, unused_metadata)
-
-        save_savegame(SAVE_FILE, savegame)
+        # The save file is streamed object by object (works for saves and saved objects)
+        rewrite_objects(
+            SAVE_FILE,
+            SAVE_FILE,
+            lambda obj: update_metadata(obj, metadata, unused_metadata),
+        )
         print("\nSavegame updated successfully!")
 
         # Output unused metadata entries
@@ -1,10 +1,45 @@
-# Checks the embedded metadata for validity
+# Checks the metadata (embedded GMNotes and .gmnotes files) for validity
+# With VALIDATE_SCHEMA, the metadata is also checked against the schema in modules/metadata_schema.py
+# (type errors and missing required keys, unknown keys are only warnings). Use "--changed-only" as a pre-commit hook:
+#   python metadata-validation.py --changed-only
 
+import io
 import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
 from pathlib import Path
+from typing import Tuple
+from metadata_sorter import KEY_ORDER
+from modules.decomposed_tree import EXCLUDED_DIRS
+from modules.git_changes import get_changed_files, parse_change_args
+from modules.metadata_schema import compile_validator
+from modules.parse_cache import ParseCache
 
 SEARCH_FOLDER = Path(r"C:\git\SCED-downloads\downloadable\other")
 
+# Check the metadata against the schema (otherwise only checks that the GMNotes are valid JSON)
+VALIDATE_SCHEMA = True
+
+# Warn about keys that are neither in the schema nor in metadata_sorter.KEY_ORDER (doesn't fail the check)
+REPORT_UNKNOWN_KEYS = True
+
+# Only check the files that git reports as changed (also available as "--changed-only")
+CHANGED_ONLY = False
+# Compare against this git ref instead of the last commit, e.g. "origin/main" (also "--since <ref>")
+CHANGED_SINCE = None
+
+# Number of worker processes for the schema check (0 = one per CPU core, 1 = no parallel processing)
+WORKER_COUNT = 0
+
+# Keeps a summary of every file on disk so unchanged files don't have to be parsed again
+# (with VALIDATE_SCHEMA, only .json files with embedded GMNotes are parsed for the schema check)
+USE_PARSE_CACHE = True
+
+# Compiled once per process
+VALIDATOR = compile_validator(extra_known_keys=KEY_ORDER, report_unknown_keys=REPORT_UNKNOWN_KEYS)
+
 
 def check_gm_notes(json_file_path: Path) -> bool:
     """Returns True if the file is invalid, False otherwise."""
@@ -27,25 +62,164 @@ def check_gm_notes(json_file_path: Path) -> bool:
         return True
 
 
-def main():
+def check_summary(json_file_path: Path, summary: dict) -> bool:
+    """Same as check_gm_notes, but based on the cached summary. Returns True if the file is invalid."""
+    if "Error" in summary or not summary["GMNotesValid"]:
+        print(f"- Invalid: {json_file_path}")
+        return True
+    return False
+
+
+def check_schema(file_path: str) -> bool:
+    """
+    Validates the metadata of a .gmnotes file or the embedded GMNotes of a .json file.
+    Returns True if the file is invalid, False otherwise.
+    """
+    try:
+        with open(file_path, "rb") as f:
+            data = json.loads(f.read())
+
+        if file_path.endswith(".json"):
+            # Objects with a .gmnotes file are checked via that file
+            gm_notes = data.get("GMNotes") if "GMNotes_path" not in data else None
+            if not gm_notes:
+                return False
+            data = json.loads(gm_notes)
+
+        issues, warnings = VALIDATOR(data)
+    except (json.JSONDecodeError, UnicodeDecodeError, AttributeError):
+        print(f"- Invalid: {file_path}")
+        return True
+    except Exception as e:
+        print(f"- Error processing {os.path.basename(file_path)}: {e}")
+        return True
+
+    if issues or warnings:
+        print(f"- {'Invalid' if issues else 'Warning'}: {file_path}")
+        for issue in issues:
+            print(f"    {issue}")
+        for warning in warnings:
+            print(f"    warning: {warning}")
+    return bool(issues)
+
+
+def check_schema_task(file_path: str):
+    """Runs check_schema in a worker process, the output is returned to be printed in order."""
+    output = io.StringIO()
+    with redirect_stdout(output):
+        is_invalid = check_schema(file_path)
+    return is_invalid, output.getvalue()
+
+
+def precheck_with_cache(file_paths) -> Tuple[list, int]:
+    """
+    Uses the parse cache for the .json files: unreadable files and invalid GMNotes are reported right away,
+    files without embedded GMNotes are skipped. Returns (files that need the schema check, invalid count).
+    """
+    remaining = []
+    invalid_count = 0
+    with ParseCache() as cache:
+        for file_path in file_paths:
+            if not file_path.endswith(".json"):
+                remaining.append(file_path)
+                continue
+
+            try:
+                summary = cache.get_summary(file_path)
+            except OSError:
+                # Reported by check_schema
+                remaining.append(file_path)
+                continue
+
+            if "Error" in summary:
+                print(f"- Invalid: {file_path}")
+                invalid_count += 1
+            elif not summary["HasEmbeddedGMNotes"]:
+                continue
+            elif not summary["GMNotesValid"]:
+                print(f"- Invalid: {file_path}")
+                invalid_count += 1
+            else:
+                remaining.append(file_path)
+        print(f"Parse cache: {cache.hits} unchanged, {cache.misses} parsed.")
+    return remaining, invalid_count
+
+
+def check_files(file_paths) -> int:
+    """Runs the schema check for all files and returns the number of invalid files."""
+    worker_count = WORKER_COUNT or os.cpu_count() or 1
+
+    if worker_count > 1 and len(file_paths) > 1:
+        with ProcessPoolExecutor(max_workers=worker_count) as executor:
+            # Small files: hand them to the workers in chunks to keep the overhead low
+            chunk_size = max(1, min(256, len(file_paths) // (worker_count * 4)))
+            invalid_count = 0
+            for is_invalid, output in executor.map(check_schema_task, file_paths, chunksize=chunk_size):
+                print(output, end="")
+                invalid_count += is_invalid
+            return invalid_count
+
+    return sum(check_schema(file_path) for file_path in file_paths)
+
+
+def find_files(changed_only: bool, since) -> list:
+    if changed_only:
+        return sorted(
+            str(file_path)
+            for file_path in get_changed_files(SEARCH_FOLDER, since)
+            if file_path.suffix in (".json", ".gmnotes")
+        )
+
+    file_paths = []
+    for folder, dirs, files in os.walk(SEARCH_FOLDER):
+        dirs[:] = sorted(d for d in dirs if d not in EXCLUDED_DIRS)
+        for file_name in sorted(files):
+            if file_name.endswith((".json", ".gmnotes")):
+                file_paths.append(os.path.join(folder, file_name))
+    return file_paths
+
+
+def main() -> int:
     print(f"Searching for invalid metadata in: {SEARCH_FOLDER}")
 
     total_scanned = 0
     invalid_count = 0
 
-    # .rglob("*.json") recursively finds all JSON files
-    for json_file_path in SEARCH_FOLDER.rglob("*.json"):
-        total_scanned += 1
-        is_invalid = check_gm_notes(json_file_path)
+    if VALIDATE_SCHEMA:
+        file_paths = find_files(*parse_change_args(CHANGED_ONLY, CHANGED_SINCE))
+        total_scanned = len(file_paths)
+        if USE_PARSE_CACHE:
+            file_paths, invalid_count = precheck_with_cache(file_paths)
+        invalid_count += check_files(file_paths)
+    elif USE_PARSE_CACHE:
+        with ParseCache() as cache:
+            for json_file_path in SEARCH_FOLDER.rglob("*.json"):
+                total_scanned += 1
+                try:
+                    is_invalid = check_summary(json_file_path, cache.get_summary(json_file_path))
+                except OSError as e:
+                    print(f"- Error processing {json_file_path.name}: {e}")
+                    is_invalid = True
+
+                if is_invalid:
+                    invalid_count += 1
+            print(f"Parse cache: {cache.hits} unchanged, {cache.misses} parsed.")
+    else:
+        # .rglob("*.json") recursively finds all JSON files
+        for json_file_path in SEARCH_FOLDER.rglob("*.json"):
+            total_scanned += 1
+            is_invalid = check_gm_notes(json_file_path)
 
-        if is_invalid:
-            invalid_count += 1
+            if is_invalid:
+                invalid_count += 1
 
     print("-" * 30)
     print(f"Script finished.")
     print(f"Total files scanned: {total_scanned}")
     print(f"Invalid files found: {invalid_count}")
+    return invalid_count
 
 
 if __name__ == "__main__":
-    main()
+    # Non-zero exit code if there are invalid files (fails the pre-commit hook)
+    sys.exit(1 if main() else 0)
@@ -1,10 +1,27 @@
 # Sorts the metadata (*.gmnotes files) based on the specified order
 
+import io
 import json
 import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from modules.git_changes import get_changed_files, parse_change_args
+from modules.json_writer import dumps_json, write_text_atomic
 
 BASE_DIR = r"C:\git\SCED-downloads\decomposed"
 
+# Only process the files that git reports as changed (also available as "--changed-only")
+CHANGED_ONLY = False
+# Compare against this git ref instead of the last commit, e.g. "origin/main" (also "--since <ref>")
+CHANGED_SINCE = None
+
+# Number of worker processes (0 = one per CPU core, 1 = no parallel processing)
+WORKER_COUNT = 0
+
+# Files that are already sorted are skipped without serializing them again. Set to True to
+# rewrite them anyway if their formatting differs (indentation, escaped unicode characters).
+NORMALIZE_FORMATTING = False
+
 # Define the order of keys for top-level structure
 KEY_ORDER = [
     "id",
@@ -80,34 +97,43 @@ SUBTABLE_KEY_ORDER = [
 ]
 
 
+# Rank of every listed key (computed once), keys that aren't listed follow in alphabetical order
+KEY_RANK = {key: rank for rank, key in enumerate(KEY_ORDER)}
+SUBTABLE_KEY_RANK = {key: rank for rank, key in enumerate(SUBTABLE_KEY_ORDER)}
+
+
+def _sort_position(key, key_rank):
+    rank = key_rank.get(key)
+    return (0, rank, "") if rank is not None else (1, 0, key)
+
+
 def sortJSONKeys(data, is_top_level=True):
+    """
+    Returns the data with the keys of all dictionaries sorted.
+    Data that is already sorted is returned as is (the same object), so callers can check
+    'sortJSONKeys(data) is data' to skip unchanged files.
+    """
     try:
         if isinstance(data, dict):
-            sorted_dict = {}
-
-            if is_top_level:
-                # For the top-level dictionary, apply the specified key order
-                for key in KEY_ORDER:
-                    if key in data:
-                        sorted_dict[key] = sortJSONKeys(data[key], is_top_level=False)
-                # Add any remaining keys in alphabetical order
-                for key in sorted(data.keys()):
-                    if key not in sorted_dict:
-                        sorted_dict[key] = sortJSONKeys(data[key], is_top_level=False)
-            else:
-                # For subtables, apply SUBTABLE_KEY_ORDER first, then alphabetically sort the remaining keys
-                for key in SUBTABLE_KEY_ORDER:
-                    if key in data:
-                        sorted_dict[key] = sortJSONKeys(data[key], is_top_level=False)
-                for key in sorted(data.keys()):
-                    if key not in sorted_dict:
-                        sorted_dict[key] = sortJSONKeys(data[key], is_top_level=False)
-
-            return sorted_dict
+            # For the top-level dictionary apply KEY_ORDER, for subtables SUBTABLE_KEY_ORDER
+            key_rank = KEY_RANK if is_top_level else SUBTABLE_KEY_RANK
+            positions = [_sort_position(key, key_rank) for key in data]
+            in_order = all(positions[i] < positions[i + 1] for i in range(len(positions) - 1))
+
+            values = {key: sortJSONKeys(value, is_top_level=False) for key, value in data.items()}
+            if in_order and all(values[key] is data[key] for key in data):
+                return data
+
+            if in_order:
+                return values
+            return {key: values[key] for key in sorted(data, key=lambda key: _sort_position(key, key_rank))}
 
         elif isinstance(data, list):
             # Recursively sort any dictionaries in the list
-            return [sortJSONKeys(item, is_top_level=False) for item in data]
+            items = [sortJSONKeys(item, is_top_level=False) for item in data]
+            if all(new is old for new, old in zip(items, data)):
+                return data
+            return items
 
         else:
             # Return non-dict and non-list items as is
@@ -119,29 +145,66 @@ def sortJSONKeys(data, is_top_level=True):
 
 
 def process_file(file_path):
+    """Sorts a single .gmnotes file. Returns True if the file was written."""
     try:
         with open(file_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+            text = f.read()
+        data = json.loads(text)
     except json.JSONDecodeError:
         print(f"Error: File '{file_path}' contains invalid JSON.")
-        return
+        return False
     except UnicodeDecodeError as e:
         print(f"Error: Could not decode file '{file_path}'. {e}")
-        return
+        return False
     except IOError as e:
         print(f"Error: Could not read file '{file_path}'. {e}")
-        return
+        return False
 
     try:
         modified_data = sortJSONKeys(data)
 
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(modified_data, f, indent=2, ensure_ascii=False)
-            f.write("\n")  # Add an empty line at the end of the file
+        # Fast path: already sorted, so the file isn't serialized again
+        if modified_data is data and not NORMALIZE_FORMATTING:
+            return False
+
+        new_text = dumps_json(modified_data)
+        if new_text == text:
+            return False
+
+        write_text_atomic(file_path, new_text)
+        return True
     except IOError as e:
         print(f"Error: Could not write to file '{file_path}'. {e}")
     except Exception as e:
         print(f"Unexpected error processing file '{file_path}': {e}")
+    return False
+
+
+def process_file_task(file_path):
+    """Runs process_file in a worker process, the output is returned to be printed in order."""
+    output = io.StringIO()
+    with redirect_stdout(output):
+        written = process_file(file_path)
+    return written, output.getvalue()
+
+
+def process_files(file_paths):
+    file_paths = list(file_paths)
+    worker_count = WORKER_COUNT or os.cpu_count() or 1
+
+    if worker_count > 1 and len(file_paths) > 1:
+        with ProcessPoolExecutor(max_workers=worker_count) as executor:
+            # Small files: hand them to the workers in chunks to keep the overhead low
+            chunk_size = max(1, min(256, len(file_paths) // (worker_count * 4)))
+            results = executor.map(process_file_task, file_paths, chunksize=chunk_size)
+            written = 0
+            for file_written, output in results:
+                print(output, end="")
+                written += file_written
+    else:
+        written = sum(process_file(file_path) for file_path in file_paths)
+
+    print(f"Sorted {len(file_paths)} files, wrote {written} files.")
 
 
 def main():
@@ -149,11 +212,19 @@ def main():
         print(f"Error: Directory '{BASE_DIR}' does not exist.")
         return
 
+    changed_only, since = parse_change_args(CHANGED_ONLY, CHANGED_SINCE)
+    if changed_only:
+        process_files(
+            file_path for file_path in get_changed_files(BASE_DIR, since) if file_path.suffix == ".gmnotes"
+        )
+        return
+
+    file_paths = []
     for path, _, files in os.walk(BASE_DIR):
         for file in files:
-            file_path = os.path.join(path, file)
             if file.endswith(".gmnotes"):
-                process_file(file_path)
+                file_paths.append(os.path.join(path, file))
+    process_files(file_paths)
 
 
 if __name__ == "__main__":
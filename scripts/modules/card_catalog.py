@@ -0,0 +1,116 @@
+# Columnar catalog of all cards in a decomposed tree.
+# Every Card/CardCustom becomes one row with the commonly queried fields, so questions like
+# "which cards still use an old FaceURL host" can be answered with a DataFrame filter
+# instead of scanning the whole tree. The rows are built from the parse cache (see parse_cache.py).
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+import pandas as pd
+from modules.decomposed_tree import EXCLUDED_DIRS
+from modules.parse_cache import ParseCache
+
+COLUMNS = [
+    "Path",
+    "Container",
+    "Name",
+    "GUID",
+    "Nickname",
+    "CardID",
+    "DeckID",
+    "FaceURL",
+    "BackURL",
+    "UniqueBack",
+    "MetadataId",
+    "MetadataType",
+    "MetadataClass",
+    "MetadataCycle",
+    "Tags",
+    "ScaleX",
+    "ScaleY",
+    "ScaleZ",
+]
+
+# Columns with few distinct values are stored as categories (much smaller and faster to filter)
+CATEGORY_COLUMNS = ["Container", "Name", "DeckID", "FaceURL", "BackURL", "MetadataType", "MetadataClass", "MetadataCycle"]
+
+
+def catalog_row(relative_path: str, summary: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Flattens the summary of a card into a catalog row (None for other objects)."""
+    if summary.get("Name") not in ["Card", "CardCustom"]:
+        return None
+
+    deck_id, deck_data = next(iter((summary.get("CustomDeck") or {}).items()), (None, {}))
+    scale = summary.get("Scale") or [None, None, None]
+    metadata_class = summary.get("MetadataClass")
+    return {
+        "Path": relative_path,
+        "Container": relative_path.rpartition("/")[0],
+        "Name": summary.get("Name"),
+        "GUID": summary.get("GUID"),
+        "Nickname": summary.get("Nickname"),
+        "CardID": summary.get("CardID"),
+        "DeckID": deck_id,
+        "FaceURL": deck_data.get("FaceURL"),
+        "BackURL": deck_data.get("BackURL"),
+        "UniqueBack": deck_data.get("UniqueBack"),
+        "MetadataId": summary.get("MetadataId"),
+        "MetadataType": summary.get("MetadataType"),
+        # Multi-class cards store the classes separated by "|" (stored as text as well)
+        "MetadataClass": metadata_class if metadata_class is None else str(metadata_class),
+        "MetadataCycle": summary.get("MetadataCycle"),
+        "Tags": ",".join(summary.get("Tags") or []),
+        "ScaleX": scale[0],
+        "ScaleY": scale[1],
+        "ScaleZ": scale[2],
+    }
+
+
+def build_catalog(root, excluded_dirs: Iterable[str] = EXCLUDED_DIRS) -> pd.DataFrame:
+    """Builds the catalog of all cards below 'root' (only files changed since the last run are parsed)."""
+    root = Path(root)
+    rows = []
+    with ParseCache() as cache:
+        for json_path, summary in cache.iter_summaries(root, excluded_dirs):
+            row = catalog_row(json_path.relative_to(root).as_posix(), summary)
+            if row is not None:
+                rows.append(row)
+
+    catalog = pd.DataFrame(rows, columns=COLUMNS)
+    catalog["CardID"] = pd.to_numeric(catalog["CardID"], errors="coerce").astype("Int64")
+    catalog["UniqueBack"] = catalog["UniqueBack"].astype("boolean")
+    for column in ["ScaleX", "ScaleY", "ScaleZ"]:
+        catalog[column] = pd.to_numeric(catalog[column], errors="coerce")
+    for column in CATEGORY_COLUMNS:
+        catalog[column] = catalog[column].astype("category")
+    return catalog
+
+
+def save_catalog(catalog: pd.DataFrame, catalog_file):
+    """Saves the catalog, the format depends on the file extension (.parquet, .feather, .pkl or .csv)."""
+    catalog_file = Path(catalog_file)
+    catalog_file.parent.mkdir(parents=True, exist_ok=True)
+
+    # Parquet and Feather need pyarrow (or fastparquet for Parquet)
+    if catalog_file.suffix == ".parquet":
+        catalog.to_parquet(catalog_file, index=False)
+    elif catalog_file.suffix == ".feather":
+        catalog.to_feather(catalog_file)
+    elif catalog_file.suffix == ".pkl":
+        catalog.to_pickle(catalog_file)
+    elif catalog_file.suffix == ".csv":
+        catalog.to_csv(catalog_file, index=False)
+    else:
+        raise ValueError(f"Unsupported catalog format: {catalog_file.suffix}")
+
+
+def load_catalog(catalog_file) -> pd.DataFrame:
+    catalog_file = Path(catalog_file)
+    if catalog_file.suffix == ".parquet":
+        return pd.read_parquet(catalog_file)
+    if catalog_file.suffix == ".feather":
+        return pd.read_feather(catalog_file)
+    if catalog_file.suffix == ".pkl":
+        return pd.read_pickle(catalog_file)
+    if catalog_file.suffix == ".csv":
+        return pd.read_csv(catalog_file, dtype={"DeckID": str, "MetadataId": str})
+    raise ValueError(f"Unsupported catalog format: {catalog_file.suffix}")
@@ -0,0 +1,230 @@
+# Tree-wide duplicate detection for card objects.
+# Cards are reduced to a fingerprint (CardID suffix, image URLs, metadata id) and put into hash indexes,
+# so exact duplicates and partial matches (same image but different id or vice versa) are found in a
+# single pass instead of comparing every card with every other card.
+# Images are matched by their normalized URLs, so URLs that only differ in the Steam host are reported
+# as partial matches unless the fingerprints themselves were normalized.
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+# Version of the report format written by write_report()
+REPORT_VERSION = 1
+
+
+class CardFingerprint(NamedTuple):
+    id_suffix: str
+    face: str
+    back: str
+    gm_id: str
+
+    @property
+    def image_key(self) -> Tuple[str, str, str]:
+        return self.id_suffix, normalize_url(self.face), normalize_url(self.back)
+
+
+def normalize_url(url: Optional[str]) -> str:
+    """Steam cloud URLs are served from several hosts, only the part from 'ugc/' on identifies the image."""
+    url = (url or "").strip()
+    ugc_index = url.find("/ugc/")
+    if ugc_index != -1:
+        return url[ugc_index + 1 :].rstrip("/")
+    return url
+
+
+def get_card_fingerprint(
+    data: Dict[str, Any], gmnotes: Optional[Any] = None, normalize_urls: bool = True
+) -> CardFingerprint:
+    """
+    Fingerprint of a card object, 'gmnotes' is the parsed .gmnotes sidecar (used if GMNotes is empty).
+    With 'normalize_urls', URLs that only differ in the Steam host are the same image (see normalize_url).
+    """
+    # Last two digits of CardID
+    card_id_suffix = str(data.get("CardID", ""))[-2:]
+
+    # URLs (Extracting from the first deck found in CustomDeck)
+    face_url = ""
+    back_url = ""
+    custom_deck = data.get("CustomDeck", {})
+    if custom_deck:
+        first_deck = list(custom_deck.values())[0]
+        face_url = first_deck.get("FaceURL", "")
+        back_url = first_deck.get("BackURL", "")
+
+    # GMNotes ID
+    gm_id = ""
+    gm_notes_str = data.get("GMNotes", "")
+    if gm_notes_str:
+        try:
+            gm_data = json.loads(gm_notes_str)
+            if isinstance(gm_data, dict):
+                gm_id = gm_data.get("id", "")
+        except json.JSONDecodeError:
+            pass
+    elif isinstance(gmnotes, dict):
+        gm_id = gmnotes.get("id", "")
+
+    if normalize_urls:
+        face_url = normalize_url(face_url)
+        back_url = normalize_url(back_url)
+    return CardFingerprint(card_id_suffix, face_url, back_url, str(gm_id or ""))
+
+
+def fingerprint_from_summary(summary: Dict[str, Any], normalize_urls: bool = True) -> CardFingerprint:
+    """Fingerprint from a summary of the parse cache (see modules/parse_cache.py), see get_card_fingerprint()."""
+    face_url = ""
+    back_url = ""
+    custom_deck = summary.get("CustomDeck") or {}
+    if custom_deck:
+        first_deck = list(custom_deck.values())[0]
+        face_url = first_deck.get("FaceURL") or ""
+        back_url = first_deck.get("BackURL") or ""
+
+    if normalize_urls:
+        face_url = normalize_url(face_url)
+        back_url = normalize_url(back_url)
+
+    card_id = summary.get("CardID")
+    return CardFingerprint(
+        str(card_id if card_id is not None else "")[-2:],
+        face_url,
+        back_url,
+        str(summary.get("MetadataId") or ""),
+    )
+
+
+class DuplicateIndex:
+    """
+    Hash index of card fingerprints.
+    Exact duplicates share the full fingerprint, partial matches share either the images (and CardID suffix)
+    or the metadata id, but not both. Images are compared by their normalized URLs, so fingerprints
+    that only differ in the Steam host are partial "image" matches.
+    """
+
+    def __init__(self):
+        self.exact: Dict[CardFingerprint, List[Any]] = {}
+        self._by_image: Dict[Tuple[str, str, str], List[CardFingerprint]] = {}
+        self._by_id: Dict[str, List[CardFingerprint]] = {}
+
+    def add(self, item: Any, fingerprint: CardFingerprint) -> Tuple[Optional[Any], List[Tuple[Any, str]]]:
+        """
+        Adds an item (e.g. a path) to the index.
+        Returns (first item with the same fingerprint or None, partial matches as (first item, "image" / "id")).
+        Partial matches are only returned for the first item of each fingerprint.
+        """
+        items = self.exact.get(fingerprint)
+        if items:
+            items.append(item)
+            return items[0], []
+
+        conflicts = [
+            (self.exact[other][0], "image" if other.image_key == fingerprint.image_key else "id")
+            for other in self.partial_matches(fingerprint)
+        ]
+
+        self.exact[fingerprint] = [item]
+        self._by_image.setdefault(fingerprint.image_key, []).append(fingerprint)
+        if fingerprint.gm_id:
+            self._by_id.setdefault(fingerprint.gm_id, []).append(fingerprint)
+        return None, conflicts
+
+    def partial_matches(self, fingerprint: CardFingerprint) -> List[CardFingerprint]:
+        """Indexed fingerprints that match either the images or the metadata id of this fingerprint."""
+        matches = [other for other in self._by_image.get(fingerprint.image_key, []) if other != fingerprint]
+        if fingerprint.gm_id:
+            matches.extend(
+                other
+                for other in self._by_id.get(fingerprint.gm_id, [])
+                if other.image_key != fingerprint.image_key
+            )
+        return matches
+
+    def exact_duplicates(self) -> List[List[Any]]:
+        return [items for items in self.exact.values() if len(items) > 1]
+
+    def partial_groups(self) -> List[Dict[str, Any]]:
+        """Groups of fingerprints that share the images or the metadata id (but not both)."""
+        groups = []
+        for match, table in (("image", self._by_image), ("id", self._by_id)):
+            for key, fingerprints in table.items():
+                if len(fingerprints) < 2:
+                    continue
+                # Fingerprints with the same images are already an "image" group
+                if match == "id" and len({fingerprint.image_key for fingerprint in fingerprints}) < 2:
+                    continue
+                groups.append(
+                    {
+                        "match": match,
+                        "fingerprints": fingerprints,
+                        "items": [self.exact[fingerprint][0] for fingerprint in fingerprints],
+                    }
+                )
+        return groups
+
+
+def build_discard_map(duplicate_groups: List[List[Path]]) -> Dict[Path, Dict[str, str]]:
+    """
+    Picks the files to discard: within a folder the alphabetically first file is kept (like clean_deck()).
+    Duplicates in different folders belong to different containers and are only reported.
+    Returns {folder: {discarded stem: keeper stem}}.
+    """
+    discard: Dict[Path, Dict[str, str]] = {}
+    for paths in duplicate_groups:
+        by_folder: Dict[Path, List[str]] = {}
+        for path in paths:
+            by_folder.setdefault(path.parent, []).append(path.stem)
+
+        for folder, stems in by_folder.items():
+            if len(stems) < 2:
+                continue
+            keeper = min(stems)
+            for stem in stems:
+                if stem != keeper:
+                    discard.setdefault(folder, {})[stem] = keeper
+    return discard
+
+
+def write_report(report_file, root, index: DuplicateIndex):
+    """Writes the exact duplicates, the partial matches and the files to discard (paths relative to 'root')."""
+    root = Path(root)
+
+    def relative(path: Path) -> str:
+        return path.relative_to(root).as_posix()
+
+    duplicate_groups = index.exact_duplicates()
+    report = {
+        "version": REPORT_VERSION,
+        "root": str(root),
+        "exact_duplicates": [
+            {
+                "fingerprint": fingerprint._asdict(),
+                "files": [relative(path) for path in paths],
+                "cross_folder": len({path.parent for path in paths}) > 1,
+            }
+            for fingerprint, paths in index.exact.items()
+            if len(paths) > 1
+        ],
+        "partial_duplicates": [
+            {"match": group["match"], "files": [relative(path) for path in group["items"]]}
+            for group in index.partial_groups()
+        ],
+        "discard": {
+            relative(folder) if folder != root else ".": mapping
+            for folder, mapping in sorted(build_discard_map(duplicate_groups).items())
+        },
+    }
+
+    with open(report_file, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    return report
+
+
+def load_discard_map(report_file) -> Tuple[Path, Dict[Path, Dict[str, str]]]:
+    """Reads the files to discard from a report. Returns (root, {folder: {discarded stem: keeper stem}})."""
+    with open(report_file, "r", encoding="utf-8") as f:
+        report = json.load(f)
+
+    root = Path(report["root"])
+    return root, {root / folder: mapping for folder, mapping in report["discard"].items()}
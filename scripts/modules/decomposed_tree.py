@@ -0,0 +1,236 @@
+# Shared in-memory index of a decomposed TTS object tree (e.g. "C:\git\SCED-downloads\decomposed").
+# The tree is scanned once and keeps the parsed objects, their .gmnotes sidecars and the
+# ContainedObjects_order links, so multiple fixups in one run don't have to parse every file again.
+# The file content is kept as well, save() compares against it instead of reading the files again.
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+from modules.json_writer import dumps_json, write_json_if_changed, write_text_atomic
+
+# Folders that should never be processed
+EXCLUDED_DIRS = {".git", ".github", ".vscode"}
+
+
+class TreeObject:
+    """A single decomposed object (.json file) together with its optional .gmnotes sidecar."""
+
+    def __init__(self, path: Path, data: Dict[str, Any], gmnotes: Optional[Any] = None, text: Optional[str] = None):
+        self.path = path
+        self.data = data
+        self.gmnotes = gmnotes
+        self.text = text  # Content of the .json file when it was loaded (or last saved)
+        self.modified = False
+        self.gmnotes_modified = False
+        self._index_keys = []
+
+    def __repr__(self):
+        return f"TreeObject({self.path})"
+
+    @property
+    def stem(self) -> str:
+        return self.path.stem
+
+    @property
+    def name(self) -> Optional[str]:
+        return self.data.get("Name")
+
+    @property
+    def guid(self) -> Optional[str]:
+        return self.data.get("GUID")
+
+    @property
+    def gmnotes_path(self) -> Path:
+        return self.path.with_suffix(".gmnotes")
+
+    @property
+    def children_folder(self) -> Path:
+        """Folder that holds the contained objects (same name as the file without extension)."""
+        return self.path.parent / self.path.stem
+
+    @property
+    def contained_order(self) -> List[str]:
+        return self.data.get("ContainedObjects_order", [])
+
+    def is_card(self) -> bool:
+        return self.name in ["Card", "CardCustom"]
+
+    def get_metadata(self) -> Dict[str, Any]:
+        """Returns the metadata from the .gmnotes sidecar or the embedded GMNotes."""
+        if self.gmnotes is not None:
+            return self.gmnotes if isinstance(self.gmnotes, dict) else {}
+
+        raw_notes = self.data.get("GMNotes", "")
+        if isinstance(raw_notes, str) and raw_notes.startswith("{"):
+            try:
+                metadata = json.loads(raw_notes)
+                return metadata if isinstance(metadata, dict) else {}
+            except json.JSONDecodeError:
+                return {}
+        return {}
+
+    @property
+    def metadata_id(self) -> Optional[str]:
+        metadata = self.get_metadata()
+        return metadata.get("id") or metadata.get("TtsZoopGuid")
+
+    def mark_modified(self, gmnotes: bool = False):
+        """Flags the object (or its .gmnotes sidecar) to be written by DecomposedTree.save()."""
+        if gmnotes:
+            self.gmnotes_modified = True
+        else:
+            self.modified = True
+
+
+class DecomposedTree:
+    """
+    Index of all objects below a root folder.
+    Lookups by path, GUID, metadata id and file stem are O(1).
+    """
+
+    def __init__(self, root, excluded_dirs: Iterable[str] = EXCLUDED_DIRS):
+        self.root = Path(root)
+        self.excluded_dirs: Set[str] = set(excluded_dirs)
+        self.objects: Dict[Path, TreeObject] = {}
+        self.errors: Dict[Path, str] = {}
+        self._by_guid: Dict[str, List[TreeObject]] = {}
+        self._by_id: Dict[str, List[TreeObject]] = {}
+        self._by_stem: Dict[str, List[TreeObject]] = {}
+
+    def __iter__(self) -> Iterator[TreeObject]:
+        return iter(self.objects.values())
+
+    def __len__(self) -> int:
+        return len(self.objects)
+
+    def __contains__(self, path) -> bool:
+        return Path(path) in self.objects
+
+    def scan(self) -> "DecomposedTree":
+        """Walks the root folder and loads every .json file (plus its .gmnotes file)."""
+        for root, dirs, files in os.walk(self.root):
+            dirs[:] = sorted(d for d in dirs if d not in self.excluded_dirs)
+            root = Path(root)
+
+            for file_name in sorted(files):
+                if file_name.endswith(".json"):
+                    self.load_file(root / file_name)
+        return self
+
+    def load_file(self, path) -> Optional[TreeObject]:
+        """Loads (or reloads) a single object into the index."""
+        path = Path(path)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+            data = json.loads(text[1:] if text.startswith("\ufeff") else text)
+        except (json.JSONDecodeError, UnicodeDecodeError, OSError) as e:
+            self.errors[path] = str(e)
+            return None
+
+        if not isinstance(data, dict):
+            self.errors[path] = "Not a JSON object"
+            return None
+
+        gmnotes = None
+        gmnotes_path = path.with_suffix(".gmnotes")
+        if gmnotes_path.exists():
+            try:
+                with open(gmnotes_path, "r", encoding="utf-8-sig") as f:
+                    gmnotes = json.load(f)
+            except (json.JSONDecodeError, UnicodeDecodeError, OSError) as e:
+                self.errors[gmnotes_path] = str(e)
+
+        if path in self.objects:
+            self._unindex(self.objects[path])
+
+        obj = TreeObject(path, data, gmnotes, text)
+        self.objects[path] = obj
+        self.errors.pop(path, None)
+        self._index(obj)
+        return obj
+
+    def remove(self, obj: TreeObject):
+        """Drops an object from the index (the files on disk are not touched)."""
+        if self.objects.pop(obj.path, None) is not None:
+            self._unindex(obj)
+
+    def reindex(self, obj: TreeObject):
+        """Updates the lookup tables after the GUID or metadata of an object was changed."""
+        self._unindex(obj)
+        self._index(obj)
+
+    def _index(self, obj: TreeObject):
+        obj._index_keys = []
+        for table, key in (
+            (self._by_guid, obj.guid),
+            (self._by_id, obj.metadata_id),
+            (self._by_stem, obj.stem),
+        ):
+            if key:
+                table.setdefault(str(key), []).append(obj)
+                obj._index_keys.append((table, str(key)))
+
+    def _unindex(self, obj: TreeObject):
+        # Only visit the entries that were created for this object
+        for table, key in obj._index_keys:
+            entries = table.get(key, [])
+            if obj in entries:
+                entries.remove(obj)
+                if not entries:
+                    del table[key]
+        obj._index_keys = []
+
+    # --- Lookups ---
+    def get(self, path) -> Optional[TreeObject]:
+        return self.objects.get(Path(path))
+
+    def by_guid(self, guid: str) -> List[TreeObject]:
+        return self._by_guid.get(str(guid), [])
+
+    def by_id(self, metadata_id: str) -> List[TreeObject]:
+        return self._by_id.get(str(metadata_id), [])
+
+    def by_stem(self, stem: str) -> List[TreeObject]:
+        return self._by_stem.get(stem, [])
+
+    def parent(self, obj: TreeObject) -> Optional[TreeObject]:
+        """Returns the container object whose folder holds this object."""
+        folder = obj.path.parent
+        return self.objects.get(folder.parent / f"{folder.name}.json")
+
+    def children(self, obj: TreeObject) -> List[TreeObject]:
+        """Returns the contained objects in the order of 'ContainedObjects_order'."""
+        folder = obj.children_folder
+        children = []
+        for stem in obj.contained_order:
+            child = self.objects.get(folder / f"{stem}.json")
+            if child is not None:
+                children.append(child)
+        return children
+
+    def cards(self) -> Iterator[TreeObject]:
+        return (obj for obj in self if obj.is_card())
+
+    # --- Writing ---
+    def save(self) -> int:
+        """
+        Writes all modified objects and .gmnotes files back to disk (skipping files whose content didn't change).
+        Returns the number of written files.
+        """
+        written = 0
+        for obj in self:
+            if obj.modified:
+                text = dumps_json(obj.data)
+                if text != obj.text:
+                    write_text_atomic(obj.path, text)
+                    obj.text = text
+                    written += 1
+                obj.modified = False
+
+            if obj.gmnotes_modified and obj.gmnotes is not None:
+                if write_json_if_changed(obj.gmnotes_path, obj.gmnotes):
+                    written += 1
+                obj.gmnotes_modified = False
+        return written
@@ -0,0 +1,123 @@
+# Helpers for the "changed files only" mode of the tree-walking scripts.
+# Uses git to find the files that were modified, added or renamed, so a fixer
+# only has to look at these files (and their containers) instead of the full tree.
+#
+# Scripts read the mode from their config and allow overriding it from the command line:
+#   python fix-tags.py --changed-only        (uncommitted changes)
+#   python fix-tags.py --since origin/main   (changes since a git ref, including uncommitted ones)
+
+import argparse
+import json
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Sidecar files that belong to the .json file with the same name
+SIDECAR_SUFFIXES = {".gmnotes", ".ttslua", ".luascriptstate", ".xml"}
+
+
+def parse_change_args(changed_only: bool = False, since: Optional[str] = None) -> Tuple[bool, Optional[str]]:
+    """
+    Reads '--changed-only' and '--since <git-ref>' from the command line.
+    The arguments override the given config values. Returns (changed_only, since).
+    """
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--changed-only", action="store_true")
+    parser.add_argument("--since")
+    args, _ = parser.parse_known_args()
+
+    since = args.since or since
+    return bool(changed_only or args.changed_only or since), since
+
+
+def _run_git(args: List[str], cwd: Path) -> str:
+    result = subprocess.run(
+        ["git", *args],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        check=True,
+    )
+    return result.stdout
+
+
+def get_changed_files(folder, since: Optional[str] = None) -> Dict[Path, str]:
+    """
+    Returns the files below 'folder' that git reports as modified, added or renamed,
+    mapped to their status letter ("M", "A" or "R"). Deleted files are not included.
+    Without 'since', the uncommitted changes (staged, unstaged and untracked) are used.
+    """
+    folder = Path(folder).resolve()
+    changes: Dict[Path, str] = {}
+
+    try:
+        # Paths are relative to 'folder' because of '--relative'
+        diff_output = _run_git(
+            ["diff", "--name-status", "-M", "--diff-filter=AMR", "--relative", "-z", since or "HEAD"],
+            folder,
+        )
+        untracked_output = _run_git(["ls-files", "--others", "--exclude-standard", "-z"], folder)
+    except (subprocess.CalledProcessError, FileNotFoundError) as e:
+        print(f"Error: Could not get the changed files from git for '{folder}': {e}")
+        return changes
+
+    entries = diff_output.split("\0")
+    i = 0
+    while i < len(entries) - 1:
+        status = entries[i][:1]
+        if status == "R":
+            # Renames are listed as "R<score>", old path, new path
+            path = entries[i + 2]
+            i += 3
+        else:
+            path = entries[i + 1]
+            i += 2
+        changes[folder / path] = status
+
+    for path in untracked_output.split("\0"):
+        if path:
+            changes[folder / path] = "A"
+
+    return {path: status for path, status in changes.items() if path.is_file()}
+
+
+def _get_container_path(json_path: Path) -> Path:
+    """Decomposed containers store their content in a folder with the same name as the .json file."""
+    folder = json_path.parent
+    return folder.parent / f"{folder.name}.json"
+
+
+def get_changed_objects(folder, since: Optional[str] = None) -> List[Path]:
+    """
+    Returns the .json files of all changed objects below 'folder'.
+    Changed sidecars (e.g. .gmnotes) add their .json file. Containers are added if their
+    'ContainedObjects_order' lists a changed object or if an object was added to / renamed in them.
+    """
+    changes = get_changed_files(folder, since)
+    objects: Dict[Path, str] = {}
+
+    for path, status in changes.items():
+        if path.suffix == ".json":
+            objects[path] = status
+        elif path.suffix in SIDECAR_SUFFIXES and path.with_suffix(".json").is_file():
+            objects.setdefault(path.with_suffix(".json"), "M")
+
+    containers = {}
+    container_paths = set()
+    for path, status in objects.items():
+        container_path = _get_container_path(path)
+        if container_path in objects or not container_path.is_file():
+            continue
+
+        if container_path not in containers:
+            try:
+                with open(container_path, "r", encoding="utf-8") as f:
+                    containers[container_path] = set(json.load(f).get("ContainedObjects_order", []))
+            except (json.JSONDecodeError, OSError, AttributeError):
+                containers[container_path] = set()
+
+        if status in ("A", "R") or path.stem in containers[container_path]:
+            container_paths.add(container_path)
+
+    return sorted(container_paths.union(objects.keys()))
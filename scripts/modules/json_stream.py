@@ -0,0 +1,296 @@
+# Streaming reader / rewriter for monolithic TTS save files and saved objects.
+# The file is read in chunks and the objects in "ObjectStates" / "ContainedObjects" are handled
+# one at a time, so the memory usage doesn't depend on the size of the save file.
+#
+# Objects are visited in post-order (contained objects before their container) and are passed
+# without their "ContainedObjects" list - the already processed children are kept in a
+# spooled temporary file until the container is written.
+
+import json
+import os
+import re
+import shutil
+from tempfile import SpooledTemporaryFile
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Keys that hold a list of TTS objects
+OBJECT_LIST_KEYS = {"ObjectStates", "ContainedObjects"}
+
+# Size of the chunks that are read from the input file
+CHUNK_SIZE = 1024 * 1024
+
+# Processed contained objects are moved to disk once they need more memory than this
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+# Characters that can continue a number
+NUMBER_CHARS = set("0123456789.eE+-")
+
+Transform = Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]
+
+
+class _JsonReader:
+    """Minimal incremental tokenizer: structural characters are handled here, values by the json module."""
+
+    def __init__(self, f, chunk_size: int = CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _read_more(self, size: Optional[int] = None) -> bool:
+        # Drop the part of the buffer that was already consumed
+        if self.pos:
+            self.buffer = self.buffer[self.pos :]
+            self.pos = 0
+
+        chunk = self.f.read(size or self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer += chunk
+        return True
+
+    def peek(self) -> str:
+        """Skips whitespace and returns the next character (empty string at the end of the file)."""
+        while True:
+            self.pos = WHITESPACE.match(self.buffer, self.pos).end()  # type: ignore
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._read_more():
+                return ""
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' but found '{found}'")
+        self.pos += 1
+
+    def read_separator(self, end_char: str) -> bool:
+        """Consumes ',' or the closing character. Returns True if the container ended."""
+        found = self.peek()
+        self.pos += 1
+        if found == end_char:
+            return True
+        if found != ",":
+            raise ValueError(f"Expected ',' or '{end_char}' but found '{found}'")
+        return False
+
+    def _may_continue(self, value: Any, end: int) -> bool:
+        """True if the decoded value is a number that the next character (or chunk) could still extend."""
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return False
+        return end == len(self.buffer) or self.buffer[end] in NUMBER_CHARS
+
+    def read_value(self) -> Any:
+        """Reads a complete JSON value (reading more chunks until it fits into the buffer)."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+
+                # A number at the end of the buffer might continue in the next chunk ("12." or "1e")
+                if self.eof or not self._may_continue(value, end):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+
+            # Grow the read size with the value to avoid re-parsing it too often
+            self._read_more(max(self.chunk_size, len(self.buffer) - self.pos))
+
+    def read_key(self) -> str:
+        key = self.read_value()
+        if not isinstance(key, str):
+            raise ValueError(f"Expected a key but found '{key}'")
+        self.expect(":")
+        return key
+
+
+def _iter_dict(reader: _JsonReader):
+    """Generator that yields the objects in the lists of this dictionary and returns its other fields."""
+    reader.expect("{")
+    fields = {}
+    if reader.peek() == "}":
+        reader.pos += 1
+        return fields
+
+    while True:
+        key = reader.read_key()
+        if key in OBJECT_LIST_KEYS and reader.peek() == "[":
+            yield from _iter_list(reader)
+        else:
+            fields[key] = reader.read_value()
+
+        if reader.read_separator("}"):
+            return fields
+
+
+def _iter_list(reader: _JsonReader):
+    reader.expect("[")
+    if reader.peek() == "]":
+        reader.pos += 1
+        return
+
+    while True:
+        if reader.peek() == "{":
+            obj = yield from _iter_dict(reader)
+            yield obj
+        else:
+            reader.read_value()
+
+        if reader.read_separator("]"):
+            return
+
+
+def iter_objects(file_path, chunk_size: int = CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Yields every object of a save file (or saved object) without its "ContainedObjects".
+    The top-level dictionary (e.g. the save itself) is yielded last.
+    """
+    with open(file_path, "r", encoding="utf-8-sig") as f:
+        reader = _JsonReader(f, chunk_size)
+        root = yield from _iter_dict(reader)
+        yield root
+
+
+class _Rewriter:
+    def __init__(self, reader: _JsonReader, transform: Transform, indent: int, ensure_ascii: bool):
+        self.reader = reader
+        self.transform = transform
+        self.indent = " " * indent
+        self.ensure_ascii = ensure_ascii
+        self.count = 0
+
+    def read_dict(self, level: int) -> Tuple[Dict[str, Any], List[Tuple[List[str], str, Any]]]:
+        """
+        Reads a dictionary at the given indentation level.
+        Object lists are written to spooled files right away, they are returned as
+        (preceding keys, key, spool) so they can be put back in their original place.
+        """
+        reader = self.reader
+        reader.expect("{")
+        fields = {}
+        spools = []
+        keys = []
+        if reader.peek() == "}":
+            reader.pos += 1
+            return fields, spools
+
+        while True:
+            key = reader.read_key()
+            if key in OBJECT_LIST_KEYS and reader.peek() == "[":
+                spool = SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE, mode="w+", encoding="utf-8")
+                self.write_list(level + 2, spool)
+                spools.append((keys[:], key, spool))
+            else:
+                fields[key] = reader.read_value()
+            keys.append(key)
+
+            if reader.read_separator("}"):
+                return fields, spools
+
+    def write_list(self, level: int, out):
+        """Streams a list of objects, the items are written at the given indentation level."""
+        reader = self.reader
+        reader.expect("[")
+        out.write("[")
+        first = True
+        if reader.peek() == "]":
+            reader.pos += 1
+        else:
+            while True:
+                # Only objects can be removed by the transform (None), other items are written unchanged
+                if reader.peek() == "{":
+                    fields, spools = self.read_dict(level)
+                    self.count += 1
+                    obj = self.transform(fields)
+                    keep = obj is not None
+                else:
+                    obj, spools, keep = reader.read_value(), [], True
+
+                if keep:
+                    out.write(("\n" if first else ",\n") + self.indent * level)
+                    self.write_value(obj, spools, level, out)
+                    first = False
+
+                for _, _, spool in spools:
+                    spool.close()
+
+                if reader.read_separator("]"):
+                    break
+
+        if not first:
+            out.write("\n" + self.indent * (level - 1))
+        out.write("]")
+
+    def write_value(self, value: Any, spools: List[Tuple[List[str], str, Any]], level: int, out):
+        """Writes a value like json.dump() would, with the spooled lists inserted into dictionaries."""
+        if not spools:
+            text = json.dumps(value, indent=self.indent, ensure_ascii=self.ensure_ascii)
+            out.write(text.replace("\n", "\n" + self.indent * level))
+            return
+
+        # Each list goes after the last preceding key that wasn't removed by the transform
+        entries: List[Tuple[str, Any, Any]] = [(key, item, None) for key, item in value.items()]
+        for preceding_keys, key, spool in spools:
+            keys = [entry[0] for entry in entries]
+            position = 0
+            for preceding_key in reversed(preceding_keys):
+                if preceding_key in keys:
+                    position = keys.index(preceding_key) + 1
+                    break
+            entries.insert(position, (key, None, spool))
+
+        prefix = "\n" + self.indent * (level + 1)
+        out.write("{")
+        for i, (key, item, spool) in enumerate(entries):
+            out.write(("" if i == 0 else ",") + prefix)
+            out.write(json.dumps(key, ensure_ascii=self.ensure_ascii) + ": ")
+            if spool is None:
+                self.write_value(item, [], level + 1, out)
+            else:
+                spool.seek(0)
+                shutil.copyfileobj(spool, out)
+        out.write("\n" + self.indent * level + "}")
+
+
+def rewrite_objects(
+    input_path,
+    output_path,
+    transform: Transform,
+    indent: int = 2,
+    ensure_ascii: bool = False,
+    chunk_size: int = CHUNK_SIZE,
+) -> int:
+    """
+    Streams a save file (or saved object) to 'output_path' (which can be the input file).
+    'transform' gets every object (without its "ContainedObjects") and returns the object to write
+    or None to remove it. The top-level dictionary is passed last and can't be removed.
+    The output matches json.dump() with the given settings. Returns the number of visited objects.
+    """
+    output_path = os.fspath(output_path)
+    temp_path = f"{output_path}.tmp{os.getpid()}"
+
+    try:
+        with open(input_path, "r", encoding="utf-8-sig") as f_in, open(
+            temp_path, "w", encoding="utf-8"
+        ) as f_out:
+            rewriter = _Rewriter(_JsonReader(f_in, chunk_size), transform, indent, ensure_ascii)
+            fields, spools = rewriter.read_dict(0)
+            root = transform(fields)
+            rewriter.write_value(fields if root is None else root, spools, 0, f_out)
+
+            for _, _, spool in spools:
+                spool.close()
+
+        os.replace(temp_path, output_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    return rewriter.count + 1
@@ -0,0 +1,136 @@
+# Shared writer for JSON rewrites.
+# Files are serialized in memory first and only written if the content actually changed
+# (keeps mtimes, editor and git caches intact). Writes go to a temporary file that replaces
+# the original, so an interrupted run never leaves a half-written file behind.
+
+import json
+import os
+import re
+from typing import Any, Dict
+
+# orjson is optional: it is only used for the default layout (indent 2, no ASCII escaping)
+# and its output is adjusted to be identical to the json module.
+# (NaN / Infinity aren't valid JSON and don't occur in TTS files, orjson would write them as null.)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Set to False to always use the json module
+USE_ORJSON = True
+
+# orjson writes small floats as "0.00001" / "1e-7" and large ones as "1e16", the json module
+# as "1e-05" / "1e-07" / "1e+16". In the indented layout every number is the only value on its
+# line (after the key, if any).
+_ORJSON_FLOAT_FIX = re.compile(
+    r'^( *(?:"(?:[^"\\]|\\.)*": )?)(-?0\.0000\d*|-?\d(?:\.\d+)?e-?\d+)(,?)$', re.MULTILINE
+)
+
+# Quick check for an exponent at the end of a line (together with "0.0000" in the text)
+_ORJSON_EXPONENT_HINT = re.compile(r"e-?\d+,?$", re.MULTILINE)
+
+
+def _fix_orjson_float(match: "re.Match") -> str:
+    return match.group(1) + repr(float(match.group(2))) + match.group(3)
+
+
+def _dumps_orjson(data: Any, sort_keys: bool) -> str:
+    option = orjson.OPT_INDENT_2 | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+    text = orjson.dumps(data, option=option).decode("utf-8")
+    if "0.0000" in text or _ORJSON_EXPONENT_HINT.search(text):
+        text = _ORJSON_FLOAT_FIX.sub(_fix_orjson_float, text)
+    return text
+
+
+def dumps_json(
+    data: Any,
+    indent: int = 2,
+    ensure_ascii: bool = False,
+    sort_keys: bool = False,
+    trailing_newline: bool = True,
+) -> str:
+    """
+    Serializes data in the layout used for the decomposed files.
+    The output is the same as json.dumps(), orjson (if installed) is used as a faster backend.
+    """
+    text = None
+    if orjson is not None and USE_ORJSON and indent == 2 and not ensure_ascii:
+        try:
+            text = _dumps_orjson(data, sort_keys)
+        except TypeError:
+            # Not supported by orjson (e.g. non-string keys or integers above 64 bit)
+            pass
+
+    if text is None:
+        text = json.dumps(data, indent=indent, ensure_ascii=ensure_ascii, sort_keys=sort_keys)
+    return text + "\n" if trailing_newline else text
+
+
+def write_text_atomic(file_path, text: str):
+    """Writes to a temporary file first and then replaces the target file."""
+    file_path = os.fspath(file_path)
+    temp_path = f"{file_path}.tmp{os.getpid()}"
+    try:
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(temp_path, file_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def write_text_if_changed(file_path, text: str) -> bool:
+    """Writes the text unless the file already has this content. Returns True if the file was written."""
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            if f.read() == text:
+                return False
+    except (FileNotFoundError, UnicodeDecodeError):
+        pass
+
+    write_text_atomic(file_path, text)
+    return True
+
+
+def write_json_if_changed(file_path, data: Any, **json_format) -> bool:
+    """
+    Serializes the data (see dumps_json() for the format options) and writes it if the content changed.
+    Returns True if the file was written.
+    """
+    return write_text_if_changed(file_path, dumps_json(data, **json_format))
+
+
+class JsonWriter:
+    """
+    Collects JSON files to write at the end of a run.
+    Queuing the same path again replaces the earlier data, the data is serialized on flush().
+    Can be used as a context manager, which flushes when the block finishes without an error.
+    """
+
+    def __init__(self, **json_format):
+        self.json_format = json_format
+        self.pending: Dict[str, Any] = {}
+        self.written = 0
+        self.unchanged = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *_):
+        if exc_type is None:
+            self.flush()
+
+    def queue(self, file_path, data: Any):
+        self.pending[os.fspath(file_path)] = data
+
+    def flush(self) -> int:
+        """Writes all queued files (skipping unchanged ones). Returns the number of written files."""
+        written = 0
+        for file_path, data in self.pending.items():
+            if write_json_if_changed(file_path, data, **self.json_format):
+                written += 1
+            else:
+                self.unchanged += 1
+        self.pending.clear()
+        self.written += written
+        return written
@@ -0,0 +1,104 @@
+# Shared access to the metadata of decomposed objects (.gmnotes sidecar or embedded GMNotes).
+# Parsed metadata is memoized by path and mtime/size, so scripts that look at the same card several
+# times only read it once, and an edited file is picked up again automatically.
+# The memoized metadata is shared between calls: treat it as read-only and copy it before modifying it.
+
+import json
+import os
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Maximum number of memoized files
+CACHE_SIZE = 65536
+
+_cache: "OrderedDict[Tuple[str, int, int], Optional[Dict[str, Any]]]" = OrderedDict()
+_stats = {"hits": 0, "misses": 0}
+
+
+def parse_gmnotes(raw_notes: Any) -> Dict[str, Any]:
+    """Parses an embedded GMNotes string. Plain text notes are returned as {"type": text}."""
+    try:
+        if isinstance(raw_notes, str) and raw_notes.lstrip().startswith(("{", "[")):
+            return json.loads(raw_notes)
+        return {"type": raw_notes}
+    except (json.JSONDecodeError, TypeError):
+        return {}
+
+
+def _memoized(path: str, stat: os.stat_result, load) -> Optional[Dict[str, Any]]:
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    if key in _cache:
+        _stats["hits"] += 1
+        _cache.move_to_end(key)
+        return _cache[key]
+
+    _stats["misses"] += 1
+    metadata = load(path)
+    _cache[key] = metadata
+    if len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+    return metadata
+
+
+def _load_gmnotes_file(path: str) -> Optional[Dict[str, Any]]:
+    """Returns None if the file isn't valid JSON."""
+    with open(path, "r", encoding="utf-8") as f:
+        try:
+            return json.load(f)
+        except json.JSONDecodeError:
+            return None
+
+
+def _load_embedded(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        try:
+            data = json.load(f)
+        except json.JSONDecodeError:
+            return {}
+    return parse_gmnotes(data.get("GMNotes", "")) if isinstance(data, dict) else {}
+
+
+def load_metadata(
+    file_path, data: Optional[Dict[str, Any]] = None, fallback_on_invalid: bool = False
+) -> Dict[str, Any]:
+    """
+    Returns the metadata of the object at 'file_path' (a .json file).
+    The .gmnotes sidecar takes priority. Otherwise the GMNotes of 'data' (the already loaded object)
+    are used, the .json file is only read if 'data' isn't given.
+    An invalid .gmnotes file results in {}, with 'fallback_on_invalid' the GMNotes are used instead.
+    Metadata read from a file is memoized and shared, copy it (copy.deepcopy) before modifying it.
+    """
+    file_path = os.fspath(file_path)
+    gmnotes_file = os.path.splitext(file_path)[0] + ".gmnotes"
+
+    try:
+        metadata = _memoized(gmnotes_file, os.stat(gmnotes_file), _load_gmnotes_file)
+        if metadata is not None:
+            return metadata
+        if not fallback_on_invalid:
+            return {}
+    except FileNotFoundError:
+        pass
+
+    if data is not None:
+        return parse_gmnotes(data.get("GMNotes", ""))
+
+    try:
+        return _memoized(file_path, os.stat(file_path), _load_embedded)
+    except FileNotFoundError:
+        return {}
+
+
+def get_metadata_id(metadata: Any) -> Optional[str]:
+    if not isinstance(metadata, dict):
+        return None
+    return metadata.get("id") or metadata.get("TtsZoopGuid")
+
+
+def cache_info() -> Dict[str, int]:
+    return {"hits": _stats["hits"], "misses": _stats["misses"], "size": len(_cache)}
+
+
+def clear_cache():
+    _cache.clear()
+    _stats["hits"] = _stats["misses"] = 0
@@ -0,0 +1,160 @@
+# Schema of the card metadata (GMNotes / .gmnotes files) and a compiled validator for it.
+# The schema maps every known key to its allowed JSON types, compile_validator() turns it into
+# isinstance checks once, so validating a file is a single pass over its keys.
+# Unknown keys are only warnings, the data may contain keys that aren't in the schema yet.
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+# Python types of the JSON types used in the schema ("integer" excludes booleans, see _matches)
+JSON_TYPES = {
+    "string": str,
+    "integer": int,
+    "number": (int, float),
+    "boolean": bool,
+    "object": dict,
+    "array": list,
+    "null": type(None),
+}
+
+# Key -> allowed JSON type(s). None allows any type (known key without a fixed type).
+# "array:<type>" additionally checks the type of every item.
+METADATA_SCHEMA: Dict[str, Optional[Union[str, Sequence[str]]]] = {
+    "id": "string",
+    "alternate_ids": "array:string",
+    "TtsZoopGuid": "string",
+    "type": "string",
+    "slot": "string",
+    "class": "string",
+    "cost": ["integer", "string", "null"],
+    "level": ["integer", "null"],
+    "traits": "string",
+    "specialist": None,
+    "startsInHand": "boolean",
+    "startsInPlay": "boolean",
+    "permanent": "boolean",
+    "starting": None,
+    "weakness": "boolean",
+    "basicWeaknessCount": "integer",
+    "classRestriction": None,
+    "modeRestriction": None,
+    "hidden": "boolean",
+    "willpowerIcons": "integer",
+    "intellectIcons": "integer",
+    "combatIcons": "integer",
+    "agilityIcons": "integer",
+    "wildIcons": "integer",
+    "dynamicIcons": None,
+    "negativeIcons": None,
+    "elderSignEffect": None,
+    "health": ["integer", "string", "null"],
+    "sanity": ["integer", "string", "null"],
+    "bonded": "array:object",
+    "uses": "array:object",
+    "victory": ["integer", "string"],
+    "doomThreshold": ["integer", "object"],
+    "clueThreshold": ["integer", "object"],
+    "clueThresholdPerInvestigator": "integer",
+    "customizations": "array:object",
+    "handModifier": None,
+    "quantity": "integer",
+    "encounterSet": "string",
+    "cycle": "string",
+    "extraToken": None,
+    "starterDeck": None,
+    "signatures": "array",
+    "locationFront": "object",
+    "locationBack": "object",
+}
+
+# Each entry is a group of keys, at least one key of every group must be present
+REQUIRED_FIELDS: List[Tuple[str, ...]] = [("id", "TtsZoopGuid")]
+
+# metadata -> (errors, warnings)
+Validator = Callable[[Any], Tuple[List[str], List[str]]]
+
+
+def _compile_type(spec) -> Optional[Tuple[Tuple[type, ...], bool, Optional[Tuple[type, ...]], bool, str]]:
+    """Returns (types, allows bool, item types, items allow bool, description) or None for any type."""
+    if spec is None:
+        return None
+
+    names = [spec] if isinstance(spec, str) else list(spec)
+    types: List[type] = []
+    item_types: List[type] = []
+    for name in names:
+        base, _, item_name = name.partition(":")
+        python_type = JSON_TYPES[base]
+        types.extend(python_type if isinstance(python_type, tuple) else [python_type])
+        if item_name:
+            item_type = JSON_TYPES[item_name]
+            item_types.extend(item_type if isinstance(item_type, tuple) else [item_type])
+
+    return (
+        tuple(types),
+        "boolean" in names,
+        tuple(item_types) or None,
+        any(name.endswith(":boolean") for name in names),
+        " or ".join(names),
+    )
+
+
+def _matches(value, types, allows_bool) -> bool:
+    # bool is a subclass of int, but true/false isn't a valid "integer"
+    if isinstance(value, bool):
+        return allows_bool
+    return isinstance(value, types)
+
+
+def _json_type_name(value) -> str:
+    for name, python_type in JSON_TYPES.items():
+        if name != "number" and _matches(value, python_type, name == "boolean"):
+            return name
+    return "number" if isinstance(value, float) else type(value).__name__
+
+
+def compile_validator(
+    schema: Dict[str, Any] = METADATA_SCHEMA,
+    required: Iterable[Tuple[str, ...]] = REQUIRED_FIELDS,
+    extra_known_keys: Iterable[str] = (),
+    report_unknown_keys: bool = True,
+) -> Validator:
+    """
+    Compiles the schema into a function that returns the errors and warnings of a metadata dict
+    (both empty if it is valid). Unknown keys are warnings, 'extra_known_keys' are accepted with any type.
+    """
+    checks = {key: _compile_type(spec) for key, spec in schema.items()}
+    for key in extra_known_keys:
+        checks.setdefault(key, None)
+    required = [tuple(group) for group in required]
+
+    def validate(metadata) -> List[str]:
+        if not isinstance(metadata, dict):
+            return [f"metadata is {_json_type_name(metadata)}, expected object"], []
+
+        issues = []
+        warnings = []
+        for key, value in metadata.items():
+            if key not in checks:
+                if report_unknown_keys:
+                    warnings.append(f"unknown key '{key}'")
+                continue
+
+            check = checks[key]
+            if check is None:
+                continue
+
+            types, allows_bool, item_types, items_allow_bool, description = check
+            if not _matches(value, types, allows_bool):
+                issues.append(f"'{key}' is {_json_type_name(value)}, expected {description}")
+            elif item_types is not None and isinstance(value, list):
+                for index, item in enumerate(value):
+                    if not _matches(item, item_types, items_allow_bool):
+                        issues.append(f"'{key}[{index}]' is {_json_type_name(item)}, expected {description}")
+                        break
+
+        for group in required:
+            if not any(key in metadata for key in group):
+                issues.append(f"missing required key '{' / '.join(group)}'")
+        return issues, warnings
+
+    return validate
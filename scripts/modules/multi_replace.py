@@ -0,0 +1,71 @@
+# Replaces many search strings in a single pass over the text.
+# The search strings are merged into a trie and compiled into one regular expression, so the
+# text is scanned once no matter how many mappings there are (instead of one str.replace per mapping).
+# At every position the longest matching search string wins, and replaced text is not searched again.
+
+import re
+from typing import Dict, Tuple
+
+
+def _trie_pattern(strings) -> str:
+    """Builds a regular expression from a trie of the strings (common prefixes are only matched once)."""
+    trie: Dict[str, dict] = {}
+    for string in strings:
+        node = trie
+        for char in string:
+            node = node.setdefault(char, {})
+        node[""] = {}  # End of a search string
+
+    def build(node) -> str:
+        alternatives = []
+        for char in sorted(key for key in node if key):
+            # Chains without branches are merged into one literal
+            literal = char
+            child = node[char]
+            while len(child) == 1 and "" not in child:
+                next_char = next(iter(child))
+                literal += next_char
+                child = child[next_char]
+            alternatives.append(re.escape(literal) + build(child))
+
+        if not alternatives:
+            return ""
+
+        pattern = alternatives[0] if len(alternatives) == 1 else "(?:" + "|".join(alternatives) + ")"
+        # Greedy optional group: a longer search string is preferred over one that ends here
+        return f"(?:{pattern})?" if "" in node else pattern
+
+    return build(trie)
+
+
+class MultiReplacer:
+    """
+    Replaces all keys of 'mapping' with their values in one scan of the text (keys and values must be strings,
+    empty keys are ignored).
+    Unlike calling str.replace() for every mapping, a replacement is never replaced again
+    by a later mapping, and overlapping keys resolve to the longest match.
+    """
+
+    def __init__(self, mapping: Dict[str, str]):
+        # Only strings: converting e.g. a NaN of a missing table cell would replace or insert "nan"
+        for key, value in mapping.items():
+            if not isinstance(key, str) or not isinstance(value, str):
+                raise TypeError(f"MultiReplacer only accepts strings, got {key!r}: {value!r}")
+        self.mapping = {key: value for key, value in mapping.items() if key}
+        self.pattern = re.compile(_trie_pattern(self.mapping)) if self.mapping else None
+
+    def __len__(self) -> int:
+        return len(self.mapping)
+
+    def replace_with_count(self, text: str) -> Tuple[str, int]:
+        """Returns the new text and the number of replacements."""
+        if self.pattern is None:
+            return text, 0
+        return self.pattern.subn(lambda match: self.mapping[match.group()], text)
+
+    def replace(self, text: str) -> str:
+        return self.replace_with_count(text)[0]
+
+    def search(self, text: str) -> bool:
+        """True if the text contains any of the keys."""
+        return self.pattern is not None and self.pattern.search(text) is not None
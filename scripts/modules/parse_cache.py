@@ -0,0 +1,182 @@
+# Persistent parse cache for decomposed .json files and their .gmnotes sidecars.
+# Stores a small summary of each object keyed by path and mtime/size/content hash,
+# so repeated runs only have to parse the files that changed since the last run.
+
+import hashlib
+import json
+import os
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+from modules.decomposed_tree import EXCLUDED_DIRS
+
+# Stored next to the scripts (not inside the scanned repository)
+DEFAULT_CACHE_FILE = Path(__file__).resolve().parent.parent / ".cache" / "parse-cache.sqlite"
+
+# Increase this when the layout of the summary changes to invalidate old entries
+CACHE_VERSION = 3
+
+
+def summarize_object(data: Dict[str, Any], gmnotes: Optional[Any] = None) -> Dict[str, Any]:
+    """
+    Extracts the commonly used fields of an object.
+    'gmnotes' is the parsed content of the .gmnotes sidecar (if any).
+    """
+    custom_deck = {}
+    if isinstance(data.get("CustomDeck"), dict):
+        for deck_id, deck_data in data["CustomDeck"].items():
+            if isinstance(deck_data, dict):
+                custom_deck[deck_id] = {
+                    "FaceURL": deck_data.get("FaceURL"),
+                    "BackURL": deck_data.get("BackURL"),
+                    "UniqueBack": deck_data.get("UniqueBack"),
+                }
+
+    # Embedded GMNotes take priority, the sidecar is used if referenced by 'GMNotes_path'
+    metadata = None
+    gmnotes_valid = True
+    raw_notes = data.get("GMNotes")
+    if raw_notes:
+        try:
+            metadata = json.loads(raw_notes)
+        except (json.JSONDecodeError, TypeError):
+            gmnotes_valid = False
+    elif data.get("GMNotes_path"):
+        metadata = gmnotes
+
+    if not isinstance(metadata, dict):
+        metadata = {} if metadata else None
+
+    transform = data.get("Transform") if isinstance(data.get("Transform"), dict) else {}
+
+    return {
+        "Name": data.get("Name"),
+        "Nickname": data.get("Nickname"),
+        "GUID": data.get("GUID"),
+        "CardID": data.get("CardID"),
+        "CustomDeck": custom_deck,
+        "Tags": data.get("Tags") if isinstance(data.get("Tags"), list) else None,
+        "GMNotesValid": gmnotes_valid,
+        "HasEmbeddedGMNotes": bool(raw_notes) and "GMNotes_path" not in data,
+        "HasMetadata": bool(metadata),
+        "MetadataId": metadata.get("id") if metadata else None,
+        "MetadataType": metadata.get("type") if metadata else None,
+        "MetadataClass": metadata.get("class") if metadata else None,
+        "MetadataCycle": metadata.get("cycle") if metadata else None,
+        "Scale": [transform.get("scaleX"), transform.get("scaleY"), transform.get("scaleZ")],
+    }
+
+
+def _stat_signature(path: Path) -> Tuple[Optional[int], Optional[int]]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None, None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ParseCache:
+    """
+    SQLite backed cache of object summaries.
+    Use as a context manager (or call close()) to persist the changes.
+    """
+
+    def __init__(self, cache_file=DEFAULT_CACHE_FILE):
+        self.cache_file = Path(cache_file)
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(self.cache_file)
+        self.connection.execute(
+            """CREATE TABLE IF NOT EXISTS summaries (
+                path TEXT PRIMARY KEY,
+                version INTEGER,
+                mtime_ns INTEGER,
+                size INTEGER,
+                gm_mtime_ns INTEGER,
+                gm_size INTEGER,
+                content_hash TEXT,
+                summary TEXT
+            )"""
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+
+    def get_summary(self, json_path) -> Dict[str, Any]:
+        """
+        Returns the summary for a .json file, only parsing it if it changed.
+        Unreadable files get a summary with an 'Error' entry.
+        """
+        json_path = Path(json_path)
+        gmnotes_path = json_path.with_suffix(".gmnotes")
+        mtime_ns, size = _stat_signature(json_path)
+        gm_mtime_ns, gm_size = _stat_signature(gmnotes_path)
+        key = str(json_path.resolve())
+
+        row = self.connection.execute(
+            "SELECT version, mtime_ns, size, gm_mtime_ns, gm_size, content_hash, summary FROM summaries WHERE path = ?",
+            (key,),
+        ).fetchone()
+
+        # Fast path: nothing changed according to the file system
+        if row and row[0] == CACHE_VERSION and row[1:5] == (mtime_ns, size, gm_mtime_ns, gm_size):
+            self.hits += 1
+            return json.loads(row[6])
+
+        json_bytes = json_path.read_bytes()
+        gmnotes_bytes = gmnotes_path.read_bytes() if gm_size is not None else b""
+        content_hash = hashlib.sha1(json_bytes + b"\0" + gmnotes_bytes).hexdigest()
+
+        # Touched but not changed (e.g. after a checkout): only refresh the signature
+        if row and row[0] == CACHE_VERSION and row[5] == content_hash:
+            self._store(key, mtime_ns, size, gm_mtime_ns, gm_size, content_hash, row[6])
+            self.hits += 1
+            return json.loads(row[6])
+
+        self.misses += 1
+        summary = self._parse(json_bytes, gmnotes_bytes if gm_size is not None else None)
+        self._store(key, mtime_ns, size, gm_mtime_ns, gm_size, content_hash, json.dumps(summary))
+        return summary
+
+    def iter_summaries(
+        self, root, excluded_dirs: Iterable[str] = EXCLUDED_DIRS
+    ) -> Iterator[Tuple[Path, Dict[str, Any]]]:
+        """Walks a folder and yields (path, summary) for every .json file."""
+        excluded_dirs = set(excluded_dirs)
+        for folder, dirs, files in os.walk(root):
+            dirs[:] = sorted(d for d in dirs if d not in excluded_dirs)
+            for file_name in sorted(files):
+                if file_name.endswith(".json"):
+                    json_path = Path(folder) / file_name
+                    yield json_path, self.get_summary(json_path)
+
+    def _parse(self, json_bytes: bytes, gmnotes_bytes: Optional[bytes]) -> Dict[str, Any]:
+        try:
+            data = json.loads(json_bytes.decode("utf-8-sig"))
+            if not isinstance(data, dict):
+                raise ValueError("Not a JSON object")
+        except (json.JSONDecodeError, UnicodeDecodeError, ValueError) as e:
+            return {"Error": str(e)}
+
+        gmnotes = None
+        if gmnotes_bytes is not None:
+            try:
+                gmnotes = json.loads(gmnotes_bytes.decode("utf-8-sig"))
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                pass
+
+        return summarize_object(data, gmnotes)
+
+    def _store(self, key, mtime_ns, size, gm_mtime_ns, gm_size, content_hash, summary):
+        self.connection.execute(
+            "INSERT OR REPLACE INTO summaries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, CACHE_VERSION, mtime_ns, size, gm_mtime_ns, gm_size, content_hash, summary),
+        )
@@ -0,0 +1,25 @@
+# Loads the standalone scripts as modules, so their functions can be reused by other tools.
+# Most script names contain hyphens and can't be imported with a regular import statement.
+
+import importlib.util
+import sys
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent.parent
+
+
+def load_script(file_name):
+    """Loads a script from the scripts folder (the '__main__' block is not executed)."""
+    module_name = Path(file_name).stem.replace("-", "_")
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+
+    spec = importlib.util.spec_from_file_location(module_name, SCRIPT_DIR / file_name)
+    module = importlib.util.module_from_spec(spec)  # type: ignore
+
+    # Registered so repeated loads return the same module. Worker processes started with "spawn"
+    # (the default on Windows and macOS) can't import it by this name, so the process pools of
+    # a loaded script only work with "fork".
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)  # type: ignore
+    return module
@@ -0,0 +1,114 @@
+# Tree-wide registry of CustomDeck image sheets.
+# Every unique sheet (FaceURL, BackURL, NumWidth, NumHeight) gets one canonical deck ID, so the same
+# sheet isn't registered under different CustomDeck IDs in different objects and one ID never points
+# to two different sheets.
+
+from typing import Any, Dict, List, Optional, Tuple
+from modules.card_fingerprints import normalize_url
+from modules.decomposed_tree import DecomposedTree, EXCLUDED_DIRS
+
+# Folders that are not consolidated (language packs keep their own sheets)
+EXCLUDED_FOLDERS = EXCLUDED_DIRS | {"language-pack"}
+
+SheetKey = Tuple[str, str, Any, Any]
+
+
+def get_sheet_key(info: Dict[str, Any]) -> SheetKey:
+    return (
+        normalize_url(info.get("FaceURL")),
+        normalize_url(info.get("BackURL")),
+        info.get("NumWidth"),
+        info.get("NumHeight"),
+    )
+
+
+class SheetRegistry:
+    """
+    Assigns canonical deck IDs to sheets.
+    The first sheet registered with an ID keeps it, later sheets with an already taken ID get the next
+    free ID. Registering a known sheet returns its canonical ID (no matter which ID was passed).
+    """
+
+    def __init__(self):
+        self.sheets: Dict[str, Dict[str, Any]] = {}  # canonical ID -> CustomDeck entry
+        self._id_by_key: Dict[SheetKey, str] = {}
+        self.redirects: Dict[Tuple[str, str], int] = {}  # (original ID, canonical ID) -> count
+        self.conflicts: List[Dict[str, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self.sheets)
+
+    def register(self, deck_id, info: Dict[str, Any], source: Optional[str] = None) -> str:
+        """Returns the canonical ID for the sheet described by 'info' (a CustomDeck entry)."""
+        deck_id = str(deck_id)
+        key = get_sheet_key(info)
+
+        canon_id = self._id_by_key.get(key)
+        if canon_id is None:
+            canon_id = deck_id
+            while canon_id in self.sheets:
+                # Conflict: this ID is already used by a different sheet
+                canon_id = str(int(canon_id) + 1)
+
+            if canon_id != deck_id:
+                self.conflicts.append({"id": deck_id, "assigned": canon_id, "source": source})
+
+            self._id_by_key[key] = canon_id
+            self.sheets[canon_id] = info
+
+        if canon_id != deck_id:
+            self.redirects[(deck_id, canon_id)] = self.redirects.get((deck_id, canon_id), 0) + 1
+        return canon_id
+
+    def get_info(self, canon_id: str) -> Dict[str, Any]:
+        return self.sheets[canon_id]
+
+
+def remap_custom_deck(data: Dict[str, Any], registry: SheetRegistry, source: Optional[str] = None) -> bool:
+    """
+    Rewrites the CustomDeck keys of an object (and its CardID / DeckIDs) to the canonical IDs.
+    Returns True if the object was changed.
+    """
+    custom_deck = data.get("CustomDeck")
+    if not isinstance(custom_deck, dict) or not custom_deck:
+        return False
+
+    id_map = {}
+    new_custom_deck = {}
+    for deck_id, info in custom_deck.items():
+        if not isinstance(info, dict):
+            return False
+        canon_id = registry.register(deck_id, info, source)
+        id_map[str(deck_id)] = canon_id
+
+        # Only the ID changes, the other fields (UniqueBack, BackIsHidden, Type...) stay per object
+        new_custom_deck[canon_id] = info
+
+    def remap_card_id(card_id, default_id=None):
+        # CardID = deck ID + two digit index
+        card_id_str = str(card_id).zfill(3)
+        canon_id = id_map.get(card_id_str[:-2], default_id)
+        if canon_id is None:
+            return card_id
+        return int(f"{canon_id}{card_id_str[-2:]}")
+
+    original = (data.get("CardID"), data.get("DeckIDs"), custom_deck)
+    if "CardID" in data:
+        # A card always uses its first CustomDeck entry (like fix_card_id() in sort-and-clean-decks.py)
+        data["CardID"] = remap_card_id(data["CardID"], next(iter(new_custom_deck)))
+    if isinstance(data.get("DeckIDs"), list):
+        data["DeckIDs"] = [remap_card_id(card_id) for card_id in data["DeckIDs"]]
+    data["CustomDeck"] = new_custom_deck
+    return (data.get("CardID"), data.get("DeckIDs"), new_custom_deck) != original
+
+
+def consolidate_tree(tree: DecomposedTree, registry: Optional[SheetRegistry] = None) -> SheetRegistry:
+    """
+    Registers the sheets of all objects in the tree (in path order) and rewrites their CustomDeck entries.
+    Changed objects are marked as modified, call tree.save() to write them.
+    """
+    registry = registry or SheetRegistry()
+    for obj in sorted(tree, key=lambda obj: obj.path):
+        if remap_custom_deck(obj.data, registry, str(obj.path.relative_to(tree.root))):
+            obj.mark_modified()
+    return registry
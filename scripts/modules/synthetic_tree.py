@@ -0,0 +1,191 @@
+# Generates synthetic decomposed trees (bags -> decks -> cards) for benchmarks.
+# The objects contain the usual TTS default values, unsorted metadata and some duplicate cards,
+# so the maintenance scripts have realistic work to do. The output only depends on the seed.
+
+import json
+import random
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Card backs that are used for most cards (also listed in default-data-removal.py)
+PLAYER_BACK = "https://steamusercontent-a.akamaihd.net/ugc/2342503777940352139/A2D42E7E5C43D045D72CE5CFC907E4F886C8C690/"
+ENCOUNTER_BACK = "https://steamusercontent-a.akamaihd.net/ugc/2342503777940351785/F64D8EFB75A9E15446D24343DA0A6EEF5B3E43DB/"
+
+CARD_TYPES = ["Asset", "Event", "Skill", "Treachery", "Enemy", "Location", "Act", "Agenda"]
+
+
+def _guid(rng: random.Random) -> str:
+    return f"{rng.randrange(16**6):06x}"
+
+
+def _transform(rng: random.Random, nested: bool) -> Dict[str, float]:
+    return {
+        "posX": 0.0 if nested else round(rng.uniform(-50, 50), 4),
+        "posY": 0.0 if nested else round(rng.uniform(1, 3), 4),
+        "posZ": 0.0 if nested else round(rng.uniform(-50, 50), 4),
+        "rotX": rng.choice([0.0, 359.98, 0.02]),
+        "rotY": rng.choice([180.0, 179.97, 270.02]),
+        "rotZ": rng.choice([0.0, 0.01, 180.0]),
+        "scaleX": 1.0,
+        "scaleY": 1.0,
+        "scaleZ": 1.0,
+    }
+
+
+def _common_fields(rng: random.Random, name: str, nickname: str, nested: bool) -> Dict[str, Any]:
+    """Fields (mostly with TTS default values) that every object has in an unprocessed download."""
+    return {
+        "GUID": _guid(rng),
+        "Name": name,
+        "Transform": _transform(rng, nested),
+        "Nickname": nickname,
+        "Description": "",
+        "GMNotes": "",
+        "AltLookAngle": {"x": 0.0, "y": 0.0, "z": 0.0},
+        "ColorDiffuse": {"r": 0.713235259, "g": 0.713235259, "b": 0.713235259},
+        "LayoutGroupSortIndex": 0,
+        "Value": 0,
+        "Locked": False,
+        "Grid": True,
+        "Snap": True,
+        "IgnoreFoW": False,
+        "MeasureMovement": False,
+        "DragSelectable": True,
+        "Autoraise": True,
+        "Sticky": True,
+        "Tooltip": True,
+        "GridProjection": False,
+        "HideWhenFaceDown": True,
+        "Hands": name in ["Card", "CardCustom"],
+        "LuaScript": "",
+        "LuaScriptState": "",
+        "XmlUI": "",
+    }
+
+
+def _metadata(rng: random.Random, card_id: str) -> Dict[str, Any]:
+    """Card metadata with the keys in a random order (so the metadata sorter has work to do)."""
+    metadata = {
+        "id": card_id,
+        "type": rng.choice(CARD_TYPES),
+        "cycle": "Synthetic Cycle",
+        "traits": rng.choice(["Item. Tool.", "Ally. Miskatonic.", "Spell."]),
+        "level": rng.randrange(6),
+        "cost": rng.randrange(6),
+    }
+    if rng.random() < 0.3:
+        metadata["uses"] = [{"count": 3, "type": "Ammo", "token": "resource"}]
+    keys = list(metadata)
+    rng.shuffle(keys)
+    return {key: metadata[key] for key in keys}
+
+
+def _write_json(path: Path, data: Any) -> int:
+    text = json.dumps(data, indent=2, ensure_ascii=False) + "\n"
+    path.write_text(text, encoding="utf-8")
+    return len(text.encode("utf-8"))
+
+
+def generate_tree(
+    root,
+    cards: int = 10000,
+    decks: int = 100,
+    bags: int = 10,
+    gmnotes_ratio: float = 0.8,
+    duplicate_ratio: float = 0.05,
+    seed: int = 1,
+) -> Dict[str, int]:
+    """
+    Writes a decomposed tree to 'root': the cards are split over the decks, the decks over the bags
+    (decks are placed at the root if there are no bags). 'gmnotes_ratio' of the cards store their
+    metadata in a .gmnotes file, the others embed it. Returns the number of written files and bytes.
+    """
+    rng = random.Random(seed)
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    stats = {"files": 0, "bytes": 0}
+
+    def write(path: Path, data: Any):
+        stats["files"] += 1
+        stats["bytes"] += _write_json(path, data)
+
+    # Create the bag folders first, the decks are distributed round-robin
+    bag_folders: List[Path] = []
+    bag_orders: List[List[str]] = []
+    bag_data: List[Dict[str, Any]] = []
+    for bag_index in range(bags):
+        data = _common_fields(rng, "Bag", f"Bag {bag_index}", nested=False)
+        stem = f"Bag{bag_index}.{data['GUID']}"
+        bag_folders.append(root / stem)
+        bag_orders.append([])
+        bag_data.append(data)
+
+    cards_per_deck = [cards // decks + (1 if i < cards % decks else 0) for i in range(decks)]
+    card_number = 0
+    for deck_index, deck_size in enumerate(cards_per_deck):
+        deck_id = str(100 + deck_index)
+        folder = bag_folders[deck_index % bags] if bags else root
+        folder.mkdir(exist_ok=True)
+
+        deck = _common_fields(rng, "Deck", f"Deck {deck_index}", nested=bool(bags))
+        deck_stem = f"Deck{deck_index}.{deck['GUID']}"
+        deck_folder = folder / deck_stem
+        deck_folder.mkdir(exist_ok=True)
+
+        custom_deck = {
+            deck_id: {
+                "FaceURL": f"https://example.com/synthetic/{deck_id}/face.jpg",
+                "BackURL": rng.choice([PLAYER_BACK, ENCOUNTER_BACK]),
+                "NumWidth": 10,
+                "NumHeight": 7,
+                "BackIsHidden": True,
+                "UniqueBack": False,
+                "Type": 0,
+            }
+        }
+
+        contained_order = []
+        deck_ids = []
+        previous_card_id = None
+        for index in range(deck_size):
+            # Some cards are duplicates of the previous card (same CardID)
+            if previous_card_id is not None and rng.random() < duplicate_ratio:
+                card_id = previous_card_id
+            else:
+                card_id = int(deck_id) * 100 + index % 70
+            previous_card_id = card_id
+
+            arkham_id = f"{90000 + card_number:05d}"
+            card = _common_fields(rng, "Card", f"Card {card_number}", nested=True)
+            card["CardID"] = card_id
+            card["SidewaysCard"] = False
+            card["CustomDeck"] = custom_deck
+            card["Tags"] = rng.choice([[], ["PlayerCard"], ["ScenarioCard"]])
+
+            card_stem = f"Card{card_number}.{card['GUID']}"
+            metadata = _metadata(rng, arkham_id)
+            if rng.random() < gmnotes_ratio:
+                del card["GMNotes"]
+                card["GMNotes_path"] = f"{folder.name}/{deck_stem}/{card_stem}.gmnotes"
+                write(deck_folder / f"{card_stem}.gmnotes", metadata)
+            else:
+                card["GMNotes"] = json.dumps(metadata)
+
+            write(deck_folder / f"{card_stem}.json", card)
+            contained_order.append(card_stem)
+            deck_ids.append(card_id)
+            card_number += 1
+
+        deck["DeckIDs"] = deck_ids
+        deck["CustomDeck"] = custom_deck
+        deck["ContainedObjects_order"] = contained_order
+        write(folder / f"{deck_stem}.json", deck)
+
+        if bags:
+            bag_orders[deck_index % bags].append(deck_stem)
+
+    for folder, order, data in zip(bag_folders, bag_orders, bag_data):
+        data["ContainedObjects_order"] = order
+        write(root / f"{folder.name}.json", data)
+
+    return stats
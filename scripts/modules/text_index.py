@@ -0,0 +1,182 @@
+# Persistent substring index for the files of a decomposed tree.
+# The text of every file is kept in an SQLite FTS5 table with the trigram tokenizer, so literal
+# substring searches only have to look at the index instead of reading every file again.
+# Files are re-indexed when their mtime/size changes. Without FTS5 support the stored text is
+# searched directly (still no file reads, just no trigram lookup).
+
+import os
+import sqlite3
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+from modules.decomposed_tree import EXCLUDED_DIRS
+
+DEFAULT_INDEX_FILE = Path(__file__).resolve().parent.parent / ".cache" / "text-index.sqlite"
+
+# Increase this when the layout of the index changes
+INDEX_VERSION = 1
+
+# The trigram tokenizer can only look up substrings with at least 3 characters
+MIN_TRIGRAM_LENGTH = 3
+
+
+def _fts_phrase(text: str) -> str:
+    return '"' + text.replace('"', '""') + '"'
+
+
+class TextIndex:
+    """
+    SQLite backed index of file contents.
+    Use as a context manager (or call close()) to persist the changes.
+    """
+
+    def __init__(self, index_file=DEFAULT_INDEX_FILE):
+        self.index_file = Path(index_file)
+        self.index_file.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(self.index_file)
+
+        if self.connection.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+            self.connection.executescript("DROP TABLE IF EXISTS files; DROP TABLE IF EXISTS contents;")
+            self.connection.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS files (id INTEGER PRIMARY KEY, path TEXT UNIQUE, mtime_ns INTEGER, size INTEGER)"
+        )
+        try:
+            self.connection.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS contents USING fts5(body, tokenize='trigram case_sensitive 1')"
+            )
+        except sqlite3.OperationalError:
+            # SQLite < 3.34 (or built without FTS5)
+            self.connection.execute("CREATE TABLE IF NOT EXISTS contents (rowid INTEGER PRIMARY KEY, body TEXT)")
+
+        self.use_trigrams = self._is_fts_table()
+        self.indexed = 0
+
+    def _is_fts_table(self) -> bool:
+        row = self.connection.execute("SELECT sql FROM sqlite_master WHERE name = 'contents'").fetchone()
+        return bool(row) and "fts5" in row[0].lower()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+
+    # --- Updating ---
+    def refresh(self, root, excluded_dirs: Iterable[str] = EXCLUDED_DIRS) -> int:
+        """
+        Brings the index up to date for all files below 'root' (only changed files are read).
+        Returns the number of (re-)indexed files.
+        """
+        root = Path(root).resolve()
+        excluded_dirs = set(excluded_dirs)
+        known = {
+            path: (file_id, mtime_ns, size)
+            for file_id, path, mtime_ns, size in self._rows_below(root)
+        }
+
+        indexed_before = self.indexed
+        for folder, dirs, files in os.walk(root):
+            dirs[:] = sorted(d for d in dirs if d not in excluded_dirs)
+            for file_name in files:
+                path = os.path.join(folder, file_name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+
+                entry = known.pop(path, None)
+                if entry is None or entry[1:] != (stat.st_mtime_ns, stat.st_size):
+                    self.update_file(path, stat)
+
+        # Files that were deleted since the last refresh
+        for file_id, _, _ in known.values():
+            self._delete(file_id)
+
+        self.connection.commit()
+        return self.indexed - indexed_before
+
+    def update_file(self, path, stat: Optional[os.stat_result] = None):
+        """(Re-)indexes a single file. Files that aren't UTF-8 text are indexed without content."""
+        path = os.fspath(path)
+        stat = stat or os.stat(path)
+        try:
+            # Text mode (like the conditional-* scripts), so '\n' matches on every platform
+            with open(path, "r", encoding="utf-8") as f:
+                body = f.read()
+        except (UnicodeDecodeError, OSError):
+            body = None
+
+        row = self.connection.execute("SELECT id FROM files WHERE path = ?", (path,)).fetchone()
+        if row:
+            file_id = row[0]
+            self.connection.execute(
+                "UPDATE files SET mtime_ns = ?, size = ? WHERE id = ?", (stat.st_mtime_ns, stat.st_size, file_id)
+            )
+            self.connection.execute("DELETE FROM contents WHERE rowid = ?", (file_id,))
+        else:
+            file_id = self.connection.execute(
+                "INSERT INTO files (path, mtime_ns, size) VALUES (?, ?, ?)", (path, stat.st_mtime_ns, stat.st_size)
+            ).lastrowid
+
+        if body is not None:
+            self.connection.execute("INSERT INTO contents (rowid, body) VALUES (?, ?)", (file_id, body))
+        self.indexed += 1
+
+    def remove_file(self, path):
+        row = self.connection.execute("SELECT id FROM files WHERE path = ?", (os.fspath(path),)).fetchone()
+        if row:
+            self._delete(row[0])
+
+    def _delete(self, file_id: int):
+        self.connection.execute("DELETE FROM files WHERE id = ?", (file_id,))
+        self.connection.execute("DELETE FROM contents WHERE rowid = ?", (file_id,))
+
+    def _rows_below(self, root: Path) -> List[Tuple[int, str, int, int]]:
+        prefix = os.path.join(str(root), "")
+        return self.connection.execute(
+            "SELECT id, path, mtime_ns, size FROM files WHERE substr(path, 1, ?) = ?",
+            (len(prefix), prefix),
+        ).fetchall()
+
+    # --- Searching ---
+    def search(
+        self,
+        root,
+        include: Iterable[str] = (),
+        exclude: Iterable[str] = (),
+    ) -> Iterator[Tuple[str, str]]:
+        """
+        Yields (path, text) of the indexed files below 'root' that contain all 'include' substrings
+        and none of the 'exclude' substrings (case sensitive, like the 'in' operator).
+        """
+        include = [text for text in include if text]
+        exclude = [text for text in exclude if text]
+        prefix = os.path.join(str(Path(root).resolve()), "")
+
+        conditions = ["substr(files.path, 1, ?) = ?"]
+        parameters: List[object] = [len(prefix), prefix]
+
+        # Candidates from the trigram index, the exact check below also covers short substrings
+        trigram_terms = [_fts_phrase(text) for text in include if len(text) >= MIN_TRIGRAM_LENGTH]
+        if self.use_trigrams and trigram_terms:
+            conditions.append("contents MATCH ?")
+            parameters.append(" AND ".join(trigram_terms))
+
+        for text in include:
+            conditions.append("instr(contents.body, ?) > 0")
+            parameters.append(text)
+        for text in exclude:
+            conditions.append("instr(contents.body, ?) = 0")
+            parameters.append(text)
+
+        query = (
+            "SELECT files.path, contents.body FROM files JOIN contents ON contents.rowid = files.id WHERE "
+            + " AND ".join(conditions)
+            + " ORDER BY files.path"
+        )
+        yield from self.connection.execute(query, parameters)
@@ -0,0 +1,173 @@
+# Runs several fixers in a single pass over a decomposed tree.
+# Every object is loaded once, the registered transforms are applied in memory in the order of
+# PIPELINE and each file is written once at the end (unchanged files are not written at all).
+# This replaces running fix-gmnotes-paths.py, fix-tags.py, metadata_sorter.py,
+# default-data-removal.py and tool_sync-contained-objects.py one after another.
+
+from pathlib import Path
+from modules.decomposed_tree import DecomposedTree, EXCLUDED_DIRS
+from modules.json_writer import dumps_json
+from modules.script_loader import load_script
+
+# --- Configuration ---
+TARGET_DIRECTORY = r"C:\git\SCED-downloads\decomposed"
+
+# Transforms to apply (in this order), see TRANSFORMS below for the available names
+PIPELINE = [
+    "fix-gmnotes-paths",
+    "fix-tags",
+    "metadata-sorter",
+    "default-data-removal",
+    "sync-contained-objects",
+]
+
+# Containers (.json files) whose 'ContainedObjects_order' should be rebuilt from their folder
+# (like the "Input file" of tool_sync-contained-objects.py)
+SYNC_CONTAINED_OBJECTS_FOR = []
+
+# Folders that fix-tags.py skips
+TAG_EXCLUDED_DIRS = {"language-pack"}
+
+# Maps a transform name to a function that prepares it for a tree.
+# The prepared transform gets a TreeObject, updates it in memory and returns True if it changed it.
+TRANSFORMS = {}
+
+
+def register(name):
+    def decorator(factory):
+        TRANSFORMS[name] = factory
+        return factory
+
+    return decorator
+
+
+@register("fix-gmnotes-paths")
+def prepare_fix_gmnotes_paths(tree):
+    module = load_script("fix-gmnotes-paths.py")
+    is_object_folder = load_script("default-data-removal.py").is_tts_object_folder
+
+    def transform(tree_obj):
+        # The paths are relative to the top object folder (e.g. "AliceinWonderland.39916d/..."),
+        # like running the script on that folder. Objects outside of an object folder are skipped.
+        base_folder = tree.root
+        if is_object_folder(tree.root.name):
+            return module.fix_object_gmnotes_path(tree_obj, base_folder)
+
+        for part in tree_obj.path.parent.relative_to(tree.root).parts:
+            base_folder = base_folder / part
+            if is_object_folder(part):
+                return module.fix_object_gmnotes_path(tree_obj, base_folder)
+        return False
+
+    return transform
+
+
+@register("fix-tags")
+def prepare_fix_tags(tree):
+    module = load_script("fix-tags.py")
+    managed_tags = set(module.BACK_URL_MAPPING.values()) | {"Asset", "Location"}
+
+    def transform(tree_obj):
+        if not TAG_EXCLUDED_DIRS.isdisjoint(tree_obj.path.relative_to(tree.root).parts):
+            return False
+        return module.update_card_tags(tree_obj, managed_tags)
+
+    return transform
+
+
+@register("metadata-sorter")
+def prepare_metadata_sorter(tree):
+    module = load_script("metadata_sorter.py")
+
+    def transform(tree_obj):
+        if not isinstance(tree_obj.gmnotes, dict):
+            return False
+
+        # Already sorted metadata is returned as is
+        sorted_metadata = module.sortJSONKeys(tree_obj.gmnotes)
+        if sorted_metadata is tree_obj.gmnotes:
+            return False
+
+        tree_obj.gmnotes = sorted_metadata
+        tree_obj.mark_modified(gmnotes=True)
+        return True
+
+    return transform
+
+
+@register("default-data-removal")
+def prepare_default_data_removal(tree):
+    module = load_script("default-data-removal.py")
+
+    def transform(tree_obj):
+        # Compared as text, so files with escaped unicode characters get rewritten as well
+        previous_text = dumps_json(tree_obj.data) if tree_obj.modified else tree_obj.text
+        is_nested = module.is_tts_object_folder(tree_obj.path.parent.name)
+        module.remove_default_values(tree_obj.data, module.DEFAULT_VALUES, is_nested=is_nested)
+
+        if dumps_json(tree_obj.data) == previous_text:
+            return False
+
+        tree_obj.mark_modified()
+        return True
+
+    return transform
+
+
+def _sort_keys_recursive(data):
+    if isinstance(data, dict):
+        return {key: _sort_keys_recursive(data[key]) for key in sorted(data)}
+    if isinstance(data, list):
+        return [_sort_keys_recursive(item) for item in data]
+    return data
+
+
+@register("sync-contained-objects")
+def prepare_sync_contained_objects(tree):
+    container_paths = {Path(path) for path in SYNC_CONTAINED_OBJECTS_FOR}
+    if not container_paths:
+        return lambda tree_obj: False
+
+    # Only loaded when needed (the tool imports the GUI)
+    module = load_script("tool_sync-contained-objects.py")
+
+    def transform(tree_obj):
+        if tree_obj.path not in container_paths or not tree_obj.children_folder.is_dir():
+            return False
+
+        original_items = list(tree_obj.data.items())
+        tree_obj.data["ContainedObjects_order"] = module.get_contained_file_names(tree_obj.children_folder)
+
+        # The tool saves these files with sorted keys
+        tree_obj.data = _sort_keys_recursive(tree_obj.data)
+        tree_obj.mark_modified()
+        return list(tree_obj.data.items()) != original_items
+
+    return transform
+
+
+def run_pipeline(target_directory, pipeline):
+    tree = DecomposedTree(target_directory, EXCLUDED_DIRS).scan()
+    file_count = len(tree) + sum(1 for tree_obj in tree if tree_obj.gmnotes is not None)
+    print(f"Loaded {len(tree)} objects from {target_directory}.")
+    for path, error in tree.errors.items():
+        print(f"  - Warning: Could not load {path}: {error}")
+
+    transforms = [(name, TRANSFORMS[name](tree)) for name in pipeline]
+    changes = {name: 0 for name in pipeline}
+
+    for tree_obj in tree:
+        for name, transform in transforms:
+            if transform(tree_obj):
+                changes[name] += 1
+
+    written = tree.save()
+
+    print("\n--- ✨ Pipeline Complete! ---")
+    for name in pipeline:
+        print(f"{name:<24} changed {changes[name]} objects")
+    print(f"Read {file_count} files once, wrote {written} files.")
+
+
+if __name__ == "__main__":
+    run_pipeline(TARGET_DIRECTORY, PIPELINE)
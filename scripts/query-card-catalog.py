@@ -0,0 +1,47 @@
+# Runs a query against the card catalog written by build-card-catalog.py.
+# QUERY uses the pandas DataFrame.query() syntax, for example:
+#   'FaceURL.str.contains("cloud-3.steamusercontent.com")'  -> cards that still use the old host
+#   'UniqueBack == False and MetadataType == "Location"'     -> locations without unique backs
+#   'MetadataCycle == "Core" and ScaleX != 1'                 -> scaled core cards
+# Columns: see COLUMNS in modules/card_catalog.py
+
+from pathlib import Path
+import pandas as pd
+from modules.card_catalog import load_catalog
+
+# --- Configuration ---
+CATALOG_FILE = Path(__file__).parent / ".cache" / "card-catalog.parquet"
+QUERY = 'FaceURL.str.contains("cloud-3.steamusercontent.com", na=False)'
+
+# Columns to print for every match
+COLUMNS = ["Path", "Nickname", "MetadataId", "FaceURL"]
+
+# Prints the number of matches per value of this column instead of the matches (None = list matches)
+GROUP_BY = None
+
+# Optional: save the matches as .csv (None = don't save)
+EXPORT_FILE = None
+
+
+def main():
+    catalog = load_catalog(CATALOG_FILE)
+
+    # The python engine is needed for string methods like .str.contains
+    matches = catalog.query(QUERY, engine="python")
+
+    with pd.option_context("display.max_rows", None, "display.max_colwidth", 120, "display.width", 250):
+        if GROUP_BY:
+            print(matches.groupby(GROUP_BY, observed=True).size().sort_values(ascending=False).to_string())
+        else:
+            print(matches[COLUMNS].to_string(index=False))
+
+    print("-" * 30)
+    print(f"Matched {len(matches)} of {len(catalog)} cards.")
+
+    if EXPORT_FILE:
+        matches.to_csv(EXPORT_FILE, index=False)
+        print(f"Matches saved to {EXPORT_FILE}")
+
+
+if __name__ == "__main__":
+    main()
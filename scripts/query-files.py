@@ -0,0 +1,133 @@
+# Finds files by literal substrings and/or structured fields and then searches, copies, deletes or
+# replaces in them. Replaces conditional-search.py, conditional-copy.py, conditional-delete.py and
+# conditional-search-replace.py: the file contents are kept in an index (see modules/text_index.py),
+# so repeated queries only read the files that changed since the last run.
+
+import os
+import shutil
+from pathlib import Path
+from modules.decomposed_tree import EXCLUDED_DIRS
+from modules.json_writer import write_text_atomic
+from modules.multi_replace import MultiReplacer
+from modules.parse_cache import ParseCache
+from modules.text_index import TextIndex
+
+# --- Configuration ---
+SEARCH_FOLDER = Path(r"C:\git\SCED-downloads\decomposed")
+
+# All of these must be present in the file
+INCLUDE_FILTERS = ['"alternate_ids":', '"cycle": "Core"']
+
+# None of these can be present in the file (leave empty [] if none)
+EXCLUDE_FILTERS = []
+
+# Fields of the object summary that must match (see summarize_object in modules/parse_cache.py),
+# e.g. {"Name": "Card", "MetadataType": "Act"}. Only .json files can match if this is set.
+FIELD_FILTERS = {}
+
+# Folders to skip (names anywhere in the tree or full paths)
+SKIP_DIRS = EXCLUDED_DIRS
+SKIP_FOLDERS = []
+
+# "search", "copy", "delete" or "replace"
+ACTION = "search"
+
+# For "copy": where to copy the matches (existing files are skipped)
+TARGET_FOLDER = Path(r"C:\git\SCED-downloads\decomposed\language-pack\PDFs.pdfpdf")
+
+# For "replace": text to replace in the matches
+ORIGINAL_STRING = ',\n    "PlayerCard"'
+REPLACEMENT_STRING = ',\n    "CleanUpHelper_ignore",\n    "PlayerCard"'
+
+# For "replace": more replacements {original: replacement}, all of them are applied in a single scan of the file
+ADDITIONAL_REPLACEMENTS = {}
+
+# If True, the matches are only printed (no files are copied, deleted or changed)
+DRY_RUN = False
+
+
+def is_skipped(file_path: str, skip_folders) -> bool:
+    return any(os.path.commonpath([file_path, folder]) == folder for folder in skip_folders)
+
+
+def matches_fields(file_path: str, cache: ParseCache) -> bool:
+    if not FIELD_FILTERS:
+        return True
+    if not file_path.endswith(".json"):
+        return False
+
+    summary = cache.get_summary(file_path)
+    return all(summary.get(field) == value for field, value in FIELD_FILTERS.items())
+
+
+def find_matches(index: TextIndex):
+    skip_folders = [os.path.normpath(os.path.abspath(folder)) for folder in SKIP_FOLDERS]
+    with ParseCache() as cache:
+        return [
+            (file_path, content)
+            for file_path, content in index.search(SEARCH_FOLDER, INCLUDE_FILTERS, EXCLUDE_FILTERS)
+            if not is_skipped(file_path, skip_folders) and matches_fields(file_path, cache)
+        ]
+
+
+def run_action(index: TextIndex, matches):
+    count = 0
+    replacer = MultiReplacer({ORIGINAL_STRING: REPLACEMENT_STRING, **ADDITIONAL_REPLACEMENTS})
+    if ACTION == "copy" and not DRY_RUN:
+        TARGET_FOLDER.mkdir(parents=True, exist_ok=True)
+
+    for file_path, content in matches:
+        if ACTION == "search" or DRY_RUN:
+            print(f"Matched: {file_path}")
+            count += 1
+
+        elif ACTION == "copy":
+            dest_path = TARGET_FOLDER / os.path.basename(file_path)
+            if dest_path.exists():
+                print(f"ℹ️ Skipped {dest_path.name}")
+            else:
+                shutil.copy2(file_path, dest_path)
+                print(f"✅ Copied: {dest_path.name}")
+                count += 1
+
+        elif ACTION == "delete":
+            print(f"Deleting: {file_path}")
+            os.remove(file_path)
+            index.remove_file(file_path)
+            count += 1
+
+        elif ACTION == "replace":
+            new_content = replacer.replace(content)
+            if new_content != content:
+                write_text_atomic(file_path, new_content)
+                index.update_file(file_path)
+                print(f"Replaced in: {file_path}")
+                count += 1
+
+        else:
+            raise ValueError(f"Unknown action: {ACTION}")
+
+    return count
+
+
+def main():
+    with TextIndex() as index:
+        indexed = index.refresh(SEARCH_FOLDER, SKIP_DIRS)
+        print(f"Index updated ({indexed} changed files).")
+
+        matches = find_matches(index)
+        count = run_action(index, matches)
+
+    print("-" * 30)
+    if ACTION == "search" or DRY_RUN:
+        print(f"Done! Matched {count} files.")
+    elif ACTION == "copy":
+        print(f"Done! Copied {count} files to '{TARGET_FOLDER.absolute()}'")
+    elif ACTION == "delete":
+        print(f"Deleted {count} files.")
+    else:
+        print(f"Updated {count} files.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import json
+from modules.json_stream import rewrite_objects
 
 # Keys you want to remove
 KEYS_TO_REMOVE = {"LuaScript", "LuaScriptState", "XmlUI", "CustomUIAssets"}
@@ -28,22 +29,17 @@ def remove_keys_recursive(data, keys_to_remove):
 
 
 try:
-    # 1. Read the JSON file
-    with open(INPUT_FILE, "r", encoding="utf-8") as f:
-        json_data = json.load(f)
-
-    print(f"Successfully loaded data from {INPUT_FILE}")
-
-    # 2. Clean the data recursively
-    cleaned_data = remove_keys_recursive(json_data, KEYS_TO_REMOVE)
-
-    print("Data cleaned.")
-
-    # 3. Write the cleaned data to a new JSON file
-    with open(OUTPUT_FILE, "w") as f:
-        # Use an indent for a nicely formatted output
-        json.dump(cleaned_data, f, indent=4)
-
+    # Stream the file object by object, so large saves don't have to fit into memory.
+    # Each object (and the save itself) is cleaned recursively and written right away.
+    object_count = rewrite_objects(
+        INPUT_FILE,
+        OUTPUT_FILE,
+        lambda obj: remove_keys_recursive(obj, KEYS_TO_REMOVE),
+        indent=4,  # Use an indent for a nicely formatted output
+        ensure_ascii=True,
+    )
+
+    print(f"Cleaned {object_count} objects from {INPUT_FILE}")
     print(f"Cleaned data saved to {OUTPUT_FILE}")
 
 except FileNotFoundError:
@@ -1,6 +1,11 @@
 import json
 import os
 from pathlib import Path
+import sys
+
+# The shared modules live in the parent folder
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from modules.json_writer import write_json_if_changed
 
 script_path = Path(__file__).parent.resolve()
 
@@ -196,9 +201,7 @@ def update_tts_ids():
             )
 
             # Write the file back.
-            with file_path.open("w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-                f.write("\n")
+            write_json_if_changed(file_path, data)
 
             updated += 1
 
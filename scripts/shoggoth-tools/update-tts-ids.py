@@ -2,6 +2,12 @@ import json
 import os
 from pathlib import Path
 import re
+import sys
+
+# The shared modules live in the parent folder
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from modules.json_writer import write_json_if_changed
+from modules.metadata_access import load_metadata
 
 english_folder = Path(
     r"C:\git\SCED-downloads\decomposed\campaign\Alice in Wonderland\AliceinWonderland.39916d"
@@ -22,23 +28,6 @@ prefixes = (
 )
 
 
-def get_metadata_obj(file_path, data):
-    base_name = os.path.splitext(file_path)[0]
-    gmnotes_file = base_name + ".gmnotes"
-
-    if os.path.exists(gmnotes_file):
-        with open(gmnotes_file, "r", encoding="utf-8") as f:
-            try:
-                return json.load(f)
-            except json.JSONDecodeError:
-                return {}
-
-    try:
-        return json.loads(data.get("GMNotes", ""))
-    except (json.JSONDecodeError, TypeError):
-        return {}
-
-
 def update_tts_ids():
     # Load existing map of English name -> German name
     with open(name_map_path, "r", encoding="utf-8") as f:
@@ -62,7 +51,7 @@ def update_tts_ids():
             if data["Name"] not in ["Card", "CardCustom"]:
                 continue
 
-            metadata = get_metadata_obj(file_path, data)
+            metadata = load_metadata(file_path, data)
             name = data["Nickname"].strip()
 
             # Clean up name
@@ -154,9 +143,7 @@ def update_tts_ids():
             )
 
             # Write the file back
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-                f.write("\n")
+            write_json_if_changed(file_path, data)
 
             updated += 1
 
@@ -1,9 +1,18 @@
 # This script will process deck objects and ensure that duplicate cards are only stored once.
 # It will optionally sort the deck in reverse alphabetical order too.
 
+import io
 import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
 from pathlib import Path
-from typing import List, Dict, Any, Tuple, Set
+from typing import List, Dict, Any, Optional, Tuple, Set
+from modules.card_fingerprints import load_discard_map
+from modules.decomposed_tree import DecomposedTree
+from modules.json_writer import write_json_if_changed
+from modules.metadata_access import load_metadata
+from modules.sheet_registry import EXCLUDED_FOLDERS, consolidate_tree
 
 # Set the root folder path containing the JSON files
 ROOT_FOLDER_PATH = Path(r"C:\git\SCED-downloads\decomposed")
@@ -14,34 +23,38 @@ PRESERVE_CARD_ORDER = True
 # This will instruct the sorter to sort by internal CardID instead of by card name (not ArkhamDB ID)
 SORT_BY_ID = True
 
+# Loads every card only once (per deck) and rebuilds the decks in parallel
+USE_CARD_CACHE = True
 
-def get_metadata_obj(file_path: Path) -> Dict[str, Any]:
-    """Helper to load .gmnotes metadata if it exists."""
-    gmnotes_file = file_path.with_suffix(".gmnotes")
+# Number of worker processes for the card cache mode (0 = one per CPU core, 1 = no parallel processing)
+WORKER_COUNT = 0
 
-    if gmnotes_file.exists():
-        with open(gmnotes_file, "r", encoding="utf-8") as f:
-            try:
-                return json.load(f)
-            except json.JSONDecodeError:
-                return {}
+# Report of find-duplicate-cards.py: its duplicates are discarded before the decks are rebuilt
+DUPLICATE_REPORT_FILE = None
 
-    if file_path.exists():
-        with open(file_path, "r", encoding="utf-8") as f:
-            try:
-                data = json.load(f)
-                raw_notes = data.get("GMNotes", "")
-                if isinstance(raw_notes, str) and (
-                    raw_notes.startswith("{") or raw_notes.startswith("[")
-                ):
-                    return json.loads(raw_notes)
-                return {"type": raw_notes}
-            except (json.JSONDecodeError, TypeError):
-                return {}
-    return {}
-
-
-def is_act_or_agenda(data: Dict[str, Any], json_path: Path) -> bool:
+# Gives every image sheet one CustomDeck ID for the whole tree before the decks are rebuilt
+# (see consolidate-custom-decks.py), otherwise the IDs are only made unique per deck
+CONSOLIDATE_SHEETS = False
+
+
+def load_card_cache(folder_path: Path) -> Dict[str, Dict[str, Any]]:
+    """
+    Loads all objects of a deck folder once. Maps the file name (without extension) to
+    {"path", "data", "dirty"} - 'dirty' objects are written after the deck was rebuilt.
+    """
+    cards = {}
+    for card_path in sorted(folder_path.glob("*.json")):
+        try:
+            with open(card_path, "r", encoding="utf-8") as f:
+                cards[card_path.stem] = {"path": card_path, "data": json.load(f), "dirty": False}
+        except json.JSONDecodeError:
+            continue
+    return cards
+
+
+def is_act_or_agenda(
+    data: Dict[str, Any], json_path: Path, cards: Optional[Dict[str, Dict[str, Any]]] = None
+) -> bool:
     """Checks if the deck is an Act or Agenda deck"""
     # Check Deck Nickname
     name = data.get("Nickname", "").lower()
@@ -56,7 +69,12 @@ def is_act_or_agenda(data: Dict[str, Any], json_path: Path) -> bool:
         for card_stem in contained_names:
             # Construct path to the card data: folder/cardname.json
             card_path = associated_folder / f"{card_stem}.json"
-            card_meta = get_metadata_obj(card_path)
+            if cards is not None:
+                if card_stem not in cards:
+                    continue
+                card_meta = load_metadata(card_path, cards[card_stem]["data"])
+            else:
+                card_meta = load_metadata(card_path)
 
             if str(card_meta.get("type", "")) in ["Act", "Agenda"]:
                 return True
@@ -64,6 +82,29 @@ def is_act_or_agenda(data: Dict[str, Any], json_path: Path) -> bool:
     return False
 
 
+def fix_card_id(data: Dict[str, Any]) -> bool:
+    """Makes the CardID of a card match its first CustomDeck key. Returns True if it was changed."""
+    # Only process Card objects
+    if data.get("Name") not in ["Card", "CardCustom"]:
+        return False
+
+    custom_deck = data.get("CustomDeck")
+    if not custom_deck or "CardID" not in data:
+        return False
+
+    current_deck_id = list(custom_deck.keys())[0]
+    current_card_id = data["CardID"]
+
+    # Use zfill to ensure the index is always two digits (e.g., 05 instead of 5)
+    suffix = str(current_card_id).zfill(2)[-2:]
+    proper_card_id = int(f"{current_deck_id}{suffix}")
+
+    if current_card_id != proper_card_id:
+        data["CardID"] = proper_card_id
+        return True
+    return False
+
+
 def global_shallow_fix(root_path: Path):
     """Ensures every card's CardID matches its first CustomDeck key."""
     print(f"Running global shallow fix on: {root_path}")
@@ -72,26 +113,8 @@ def global_shallow_fix(root_path: Path):
             with open(file_path, "r", encoding="utf-8") as f:
                 data = json.load(f)
 
-            # Only process Card objects
-            if data.get("Name") not in ["Card", "CardCustom"]:
-                continue
-
-            custom_deck = data.get("CustomDeck")
-            if not custom_deck or "CardID" not in data:
-                continue
-
-            current_deck_id = list(custom_deck.keys())[0]
-            current_card_id = data["CardID"]
-
-            # Use zfill to ensure the index is always two digits (e.g., 05 instead of 5)
-            suffix = str(current_card_id).zfill(2)[-2:]
-            proper_card_id = int(f"{current_deck_id}{suffix}")
-
-            if current_card_id != proper_card_id:
-                data["CardID"] = proper_card_id
-                with open(file_path, "w", encoding="utf-8") as f:
-                    json.dump(data, f, indent=2, ensure_ascii=False)
-                    f.write("\n")
+            if fix_card_id(data):
+                write_json_if_changed(file_path, data)
                 print(f"  -> Fixed CardID: {file_path.name}")
 
         except (json.JSONDecodeError, KeyError, IndexError):
@@ -99,9 +122,15 @@ def global_shallow_fix(root_path: Path):
 
 
 def rebuild_deck_data(
-    data: Dict[str, Any], associated_folder_path: Path, skip_sort: bool = False
+    data: Dict[str, Any],
+    associated_folder_path: Path,
+    skip_sort: bool = False,
+    cards: Optional[Dict[str, Dict[str, Any]]] = None,
 ) -> Dict[str, Any]:
-    """Generates a fresh table for 'CustomDeck' and 'DeckIDs' fields."""
+    """
+    Generates a fresh table for 'CustomDeck' and 'DeckIDs' fields.
+    With a card cache (see load_card_cache), the cards are read from and updated in the cache.
+    """
     url_to_canon_id = {} # Maps (FaceURL, BackURL) -> canonical_id_str
     id_redirection_map = {} # Maps filename_stem -> canonical_id_str
     temp_card_list = []  # List of (filename, card_id)
@@ -111,12 +140,17 @@ def rebuild_deck_data(
 
     # Build the Redirection Map based on URLs
     for filename_stem in contained_objects:
-        card_path = associated_folder_path / f"{filename_stem}.json"
-        if not card_path.exists():
-            continue
+        if cards is not None:
+            if filename_stem not in cards:
+                continue
+            card_json = cards[filename_stem]["data"]
+        else:
+            card_path = associated_folder_path / f"{filename_stem}.json"
+            if not card_path.exists():
+                continue
 
-        with open(card_path, "r", encoding="utf-8") as f:
-            card_json = json.load(f)
+            with open(card_path, "r", encoding="utf-8") as f:
+                card_json = json.load(f)
 
         card_custom_deck = card_json.get("CustomDeck", {})
         if not card_custom_deck:
@@ -148,11 +182,16 @@ def rebuild_deck_data(
     # Update Card Files and Build Deck Lists
     for filename_stem in contained_objects:
         card_json_path = associated_folder_path / f"{filename_stem}.json"
-        if not card_json_path.exists():
-            continue
+        if cards is not None:
+            if filename_stem not in cards:
+                continue
+            card_data = cards[filename_stem]["data"]
+        else:
+            if not card_json_path.exists():
+                continue
 
-        with open(card_json_path, "r", encoding="utf-8") as f:
-            card_data = json.load(f)
+            with open(card_json_path, "r", encoding="utf-8") as f:
+                card_data = json.load(f)
 
         canon_id = id_redirection_map[filename_stem]
 
@@ -172,10 +211,10 @@ def rebuild_deck_data(
             card_data["CustomDeck"] = new_custom_deck
             needs_write = True
 
-        if needs_write:
-            with open(card_json_path, "w", encoding="utf-8") as f:
-                json.dump(card_data, f, indent=2, ensure_ascii=False)
-                f.write("\n")
+        if needs_write and cards is not None:
+            cards[filename_stem]["dirty"] = True
+        elif needs_write:
+            write_json_if_changed(card_json_path, card_data)
 
         # Track for sorting and final deck data
         temp_card_list.append((filename_stem, new_card_id))
@@ -266,6 +305,106 @@ def delete_discarded_files(discarded_files: Set[str], associated_folder_path: Pa
                 print(f"  -> Deleted: {f.name}")
 
 
+def cleanup_deck(
+    main_json_path: Path,
+    data: Dict[str, Any],
+    cards: Optional[Dict[str, Dict[str, Any]]] = None,
+):
+    """Rebuilds, deduplicates and saves a single deck (optionally using a card cache)."""
+    associated_folder_path = main_json_path.parent / main_json_path.stem
+
+    # Skip sorting for Act / Agenda decks
+    skip_sorting_for_this_file = is_act_or_agenda(data, main_json_path, cards)
+
+    # Capture the original key order before any modification to data
+    original_keys = list(data.keys())
+
+    # Ensure correct deck data by rebuilding it (handles consolidation and final sort)
+    updated_data = rebuild_deck_data(
+        data,
+        associated_folder_path,
+        skip_sorting_for_this_file,
+        cards,
+    )
+
+    # Perform the deduplication
+    updated_data, discarded_files = clean_deck(updated_data)
+
+    # Write the cards that were changed in the cache (discarded cards are deleted anyway)
+    if cards is not None:
+        for stem, card in cards.items():
+            if card["dirty"] and stem not in discarded_files:
+                write_json_if_changed(card["path"], card["data"])
+
+    # Delete the discarded files
+    delete_discarded_files(discarded_files, associated_folder_path)
+
+    # Save the updated JSON file (preserving top-level keys in the original order)
+    # We ensure 'CustomDeck' is included in the output even if it wasn't there originally
+    if "CustomDeck" not in original_keys:
+        original_keys.append("CustomDeck")
+
+    ordered_data = {
+        key: updated_data[key] for key in original_keys if key in updated_data
+    }
+
+    # Skips writing if the content is identical (to avoid file modification date changes)
+    if not write_json_if_changed(main_json_path, ordered_data):
+        return
+
+    feedbackStr = f"  Updated {main_json_path.name}: "
+    if PRESERVE_CARD_ORDER or skip_sorting_for_this_file:
+        print(f"{feedbackStr}Kept card order.")
+    else:
+        if SORT_BY_ID:
+            print(f"{feedbackStr}Sorted cards by internal CardID.")
+        else:
+            print(f"{feedbackStr}Sorted cards alphabetically.")
+
+    print("-" * 30)
+
+
+def apply_duplicate_report(report_file, root_path: Path):
+    """
+    Discards the duplicates listed in a report of find-duplicate-cards.py.
+    The container of each folder references the kept card instead (the deck data is rebuilt afterwards).
+    The report must have been created for 'root_path', otherwise nothing is changed.
+    """
+    report_root, discard_map = load_discard_map(report_file)
+    if report_root.resolve() != root_path.resolve():
+        print(f"Skipping duplicate report {report_file}: it was created for {report_root}, not {root_path}")
+        return
+
+    print(f"Applying duplicate report: {report_file}")
+
+    for associated_folder_path, keeper_mapping in discard_map.items():
+        container_path = associated_folder_path.parent / f"{associated_folder_path.name}.json"
+        if container_path.is_file():
+            with open(container_path, "r", encoding="utf-8") as f:
+                data: Dict[str, Any] = json.load(f)
+
+            if "ContainedObjects_order" in data:
+                data["ContainedObjects_order"] = [
+                    keeper_mapping.get(stem, stem) for stem in data["ContainedObjects_order"]
+                ]
+                write_json_if_changed(container_path, data)
+
+        delete_discarded_files(set(keeper_mapping), associated_folder_path)
+
+
+def consolidate_sheets(root_path: Path):
+    """Rewrites the CustomDeck entries of the whole tree to one canonical ID per image sheet."""
+    print(f"Consolidating CustomDeck IDs in: {root_path}")
+    # Same folders as consolidate-custom-decks.py
+    tree = DecomposedTree(root_path, EXCLUDED_FOLDERS).scan()
+    for path, error in tree.errors.items():
+        print(f"  - Warning: Could not load {path}: {error}")
+
+    registry = consolidate_tree(tree)
+    written = tree.save()
+    print(f"  -> {len(registry)} sheets, {len(registry.conflicts)} conflicts, updated {written} files")
+
+
 def process_folder_for_cleanup(root_folder_path: Path):
     """Main function to iterate through the root folder, validate files, and run the cleanup and sorting logic."""
     # Loop through all .json files in that folder
@@ -285,60 +424,7 @@ def process_folder_for_cleanup(root_folder_path: Path):
         if "ContainedObjects_order" not in data or not "DeckIDs" in data:
             continue
 
-        # Skip sorting for Act / Agenda decks
-        skip_sorting_for_this_file = is_act_or_agenda(data, main_json_path)
-
-        # Capture the original key order before any modification to data
-        original_keys = list(data.keys())
-
-        # Ensure correct deck data by rebuilding it (handles consolidation and final sort)
-        updated_data = rebuild_deck_data(
-            data,
-            associated_folder_path,
-            skip_sorting_for_this_file,
-        )
-
-        # Perform the deduplication
-        updated_data, discarded_files = clean_deck(updated_data)
-
-        # Delete the discarded files
-        delete_discarded_files(discarded_files, associated_folder_path)
-
-        # Save the updated JSON file (preserving top-level keys in the original order)
-        # We ensure 'CustomDeck' is included in the output even if it wasn't there originally
-        if "CustomDeck" not in original_keys:
-            original_keys.append("CustomDeck")
-
-        ordered_data = {
-            key: updated_data[key] for key in original_keys if key in updated_data
-        }
-
-        json_output = (
-            json.dumps(ordered_data, indent=2, sort_keys=False, ensure_ascii=False)
-            + "\n"
-        )
-
-        # Check if the content has actually changed
-        current_content = main_json_path.read_text(encoding="utf-8")
-
-        if current_content == json_output:
-            # Content is identical, skip writing to avoid file modification date changes
-            continue
-
-        # Content has changed, proceed with saving
-        with open(main_json_path, "w", encoding="utf-8") as f:
-            f.write(json_output)
-
-        feedbackStr = f"  Updated {main_json_path.name}: "
-        if PRESERVE_CARD_ORDER or skip_sorting_for_this_file:
-            print(f"{feedbackStr}Kept card order.")
-        else:
-            if SORT_BY_ID:
-                print(f"{feedbackStr}Sorted cards by internal CardID.")
-            else:
-                print(f"{feedbackStr}Sorted cards alphabetically.")
-
-        print("-" * 30)
+        cleanup_deck(main_json_path, data)
 
 
 def cleanup_everything(root_path: Path):
@@ -354,9 +440,106 @@ def cleanup_everything(root_path: Path):
             process_folder_for_cleanup(folder)
 
 
+# --- Card cache mode ---
+def shallow_fix_file(file_path: Path, data: Dict[str, Any]):
+    """Runs the shallow fix for an already loaded object and saves it if needed."""
+    try:
+        if fix_card_id(data):
+            write_json_if_changed(file_path, data)
+            print(f"  -> Fixed CardID: {file_path.name}")
+    except (KeyError, IndexError):
+        pass
+
+
+def process_deck_task(task: Tuple[Path, Dict[str, Any]]) -> str:
+    """
+    Worker entry point: loads the cards of a deck once, runs the shallow fix on them and rebuilds the deck.
+    Returns the printed output, so it can be shown in order.
+    """
+    main_json_path, data = task
+    output = io.StringIO()
+    with redirect_stdout(output):
+        try:
+            cards = load_card_cache(main_json_path.parent / main_json_path.stem)
+            for card in cards.values():
+                try:
+                    if fix_card_id(card["data"]):
+                        card["dirty"] = True
+                        print(f"  -> Fixed CardID: {card['path'].name}")
+                except (KeyError, IndexError):
+                    continue
+
+            cleanup_deck(main_json_path, data, cards)
+        except Exception as e:
+            print(f"Error processing {main_json_path}: {e}")
+    return output.getvalue()
+
+
+def cleanup_everything_cached(root_path: Path):
+    """
+    Same as cleanup_everything(), but every file is only loaded once:
+    the objects outside of decks are fixed right away, the decks (together with their cards)
+    are independent of each other and get rebuilt in parallel.
+    """
+    print(f"Running global shallow fix on: {root_path}")
+    deck_tasks = []
+    deck_folders = set()
+
+    for folder, dirs, files in os.walk(root_path):
+        dirs.sort()
+        folder = Path(folder)
+
+        # The cards of a deck are loaded by the worker that rebuilds the deck
+        if folder in deck_folders:
+            continue
+
+        for file_name in sorted(files):
+            if not file_name.endswith(".json"):
+                continue
+
+            file_path = folder / file_name
+            try:
+                with open(file_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except json.JSONDecodeError:
+                continue
+
+            associated_folder_path = folder / file_path.stem
+            if (
+                isinstance(data, dict)
+                and "ContainedObjects_order" in data
+                and "DeckIDs" in data
+                and associated_folder_path.is_dir()
+            ):
+                deck_tasks.append((file_path, data))
+                deck_folders.add(associated_folder_path)
+            elif isinstance(data, dict):
+                shallow_fix_file(file_path, data)
+
+    worker_count = WORKER_COUNT or os.cpu_count() or 1
+    print(f"Rebuilding {len(deck_tasks)} decks...")
+
+    if worker_count > 1 and len(deck_tasks) > 1:
+        with ProcessPoolExecutor(max_workers=worker_count) as executor:
+            for output in executor.map(process_deck_task, deck_tasks):
+                print(output, end="")
+    else:
+        for task in deck_tasks:
+            print(process_deck_task(task), end="")
+
+
 if __name__ == "__main__":
     if ROOT_FOLDER_PATH.is_dir():
+        if DUPLICATE_REPORT_FILE:
+            apply_duplicate_report(DUPLICATE_REPORT_FILE, ROOT_FOLDER_PATH)
+
+        if CONSOLIDATE_SHEETS:
+            consolidate_sheets(ROOT_FOLDER_PATH)
+
         # Execute the main function with the configured path
-        cleanup_everything(ROOT_FOLDER_PATH)
+        if USE_CARD_CACHE:
+            cleanup_everything_cached(ROOT_FOLDER_PATH)
+        else:
+            cleanup_everything(ROOT_FOLDER_PATH)
     else:
         print(f"Can't find {ROOT_FOLDER_PATH}")
@@ -1,5 +1,6 @@
 import os
 import json
+from modules.json_writer import dumps_json
 
 # --- Configuration ---
 TARGET_DIRECTORY = r"C:\git\SCED-downloads\decomposed"
@@ -37,7 +38,7 @@ def sort_json_keys_recursively(root_folder_path):
                     data = json.loads(original_content)
 
                     # 3. Generate the NEW, sorted JSON content string
-                    new_sorted_content = json.dumps(data, indent=2, sort_keys=True, ensure_ascii=False)
+                    new_sorted_content = dumps_json(data, sort_keys=True, trailing_newline=False)
 
                     # 4. Compare the original content to the new content
                     if original_content.strip() != new_sorted_content.strip():
@@ -3,6 +3,7 @@ import os
 from pathlib import Path
 import requests
 from tool_gui import ToolGUI
+from modules.json_writer import write_json_if_changed
 
 # Globals / Derived data
 DATA_API_URL = "https://api.arkham.build/v1/cache/cards/en"
@@ -88,9 +89,7 @@ def update_json_files_in_folder(log, input_folder, types, encounters):
                 flip_card(data)
                 flipped_count += 1
 
-                with file_path.open("w", encoding="utf-8") as f:
-                    json.dump(data, f, indent=2, ensure_ascii=False)
-                    f.write("\n")
+                write_json_if_changed(file_path, data)
 
                 log(f"Flipped file: {file} ({adb_id})")
 
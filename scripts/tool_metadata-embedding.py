@@ -1,11 +1,8 @@
 import os
-import json
 from pathlib import Path
 from collections import OrderedDict
 from tool_gui import ToolGUI
-
-# Folders that should never be processed
-EXCLUDED_DIRS = {".git", ".github", ".vscode"}
+from modules.decomposed_tree import DecomposedTree, EXCLUDED_DIRS
 
 # Setup for the GUI
 OPTIONS = {
@@ -35,57 +32,50 @@ def embed_metadata(log, input_folder, max_chars):
         log(f"Error: The directory {input_folder} was not found.")
         return
 
-    for root, dirs, files in os.walk(input_folder):
-        dirs[:] = [d for d in dirs if d not in EXCLUDED_DIRS]
-
-        root = Path(root)
-
-        for file_name in files:
-            if not file_name.endswith(".json"):
-                continue
-
-            file_path = root / file_name
+    tree = DecomposedTree(input_folder, EXCLUDED_DIRS).scan()
+    for path, error in tree.errors.items():
+        log(f"Warning: Could not load {path}: {error}")
 
-            with open(file_path, "r", encoding="utf-8") as f:
-                json_data = json.load(f)
+    for tree_obj in tree:
+        json_data = tree_obj.data
 
-            # Check for the "GMNotes_path" field
-            gmnotes_path_str = json_data.get("GMNotes_path")
-            if not gmnotes_path_str:
-                continue
+        # Check for the "GMNotes_path" field
+        gmnotes_path_str = json_data.get("GMNotes_path")
+        if not gmnotes_path_str:
+            continue
 
-            # Construct the path to the .gmnotes file in the same directory
-            gmnotes_path = file_path.with_suffix(".gmnotes")
+        # The .gmnotes file in the same directory
+        gmnotes_path = tree_obj.gmnotes_path
 
-            if not gmnotes_path.exists():
-                log(f"Warning: .gmnotes file not found for {file_path}.")
-                continue
+        if not gmnotes_path.exists():
+            log(f"Warning: .gmnotes file not found for {tree_obj.path}.")
+            continue
 
-            # Read the content of the .gmnotes file
-            with open(gmnotes_path, "r", encoding="utf-8") as f_gmnotes:
-                gmnotes_content = f_gmnotes.read()
+        # Read the content of the .gmnotes file
+        with open(gmnotes_path, "r", encoding="utf-8") as f_gmnotes:
+            gmnotes_content = f_gmnotes.read()
 
-            # Check the character count of the content
-            note_length = len(gmnotes_content)
-            if note_length <= max_chars:
-                # Delete the .gmnotes file
-                os.remove(gmnotes_path)
+        # Check the character count of the content
+        note_length = len(gmnotes_content)
+        if note_length <= max_chars:
+            # Delete the .gmnotes file
+            os.remove(gmnotes_path)
+            tree_obj.gmnotes = None
 
-                # Add the content as a new "GMNotes" field, removing newline from the end of the string
-                json_data["GMNotes"] = gmnotes_content.rstrip("\n")
+            # Add the content as a new "GMNotes" field, removing newline from the end of the string
+            json_data["GMNotes"] = gmnotes_content.rstrip("\n")
 
-                # Delete the old "GMNotes_path" field
-                del json_data["GMNotes_path"]
+            # Delete the old "GMNotes_path" field
+            del json_data["GMNotes_path"]
 
-                # Sort JSON fields alphabetically before writing
-                sorted_json_data = OrderedDict(sorted(json_data.items()))
+            # Sort JSON fields alphabetically before writing
+            tree_obj.data = OrderedDict(sorted(json_data.items()))
+            tree_obj.mark_modified()
 
-                # Write the updated JSON back to the file
-                with open(file_path, "w", encoding="utf-8") as f:
-                    json.dump(sorted_json_data, f, indent=2, ensure_ascii=False)
-                    f.write("\n")  # Add an empty line at the end
+            log(f"{json_data["Nickname"]}: Embedded GMNotes")
 
-                log(f"{json_data["Nickname"]}: Embedded GMNotes")
+    # Write the updated JSON files
+    tree.save()
 
     log("\nScript finished.")
 
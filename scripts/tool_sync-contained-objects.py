@@ -2,6 +2,7 @@ import json
 from pathlib import Path
 from typing import List, Any
 from tool_gui import ToolGUI
+from modules.json_writer import write_json_if_changed
 
 # Setup for the GUI
 OPTIONS = {
@@ -39,7 +40,8 @@ def process_json_contained_objects(log, main_json_path: Path) -> bool:
     """
     Parses the main JSON file, determines the associated folder, lists and sorts
     the contained files, updates the 'ContainedObjects_order' key, and saves the
-    updated JSON file with alphabetically sorted keys and a trailing newline.
+    updated JSON file with alphabetically sorted keys and a trailing newline
+    (only if the content changed).
     """
     # Check if the main JSON file exists
     if not main_json_path.is_file():
@@ -68,11 +70,10 @@ def process_json_contained_objects(log, main_json_path: Path) -> bool:
     data["ContainedObjects_order"] = contained_objects_list
 
     # Save the file: keys sorted alphabetically and ending with a newline
-    with open(main_json_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False, sort_keys=True)
-        f.write("\n")
-
-    log(f"Successfully updated 'ContainedObjects_order'")
+    if write_json_if_changed(main_json_path, data, sort_keys=True):
+        log("Successfully updated 'ContainedObjects_order'")
+    else:
+        log("'ContainedObjects_order' is already up to date")
     return True
 
 
@@ -2,6 +2,8 @@ import json
 import re
 from pathlib import Path
 from metadata_sorter import sortJSONKeys
+from modules.json_stream import iter_objects
+from modules.json_writer import write_json_if_changed
 
 # Paths config
 CONTENT_PATH = Path(
@@ -44,13 +46,10 @@ def should_skip_by_tag(obj):
 
 
 def build_metadata_map(obj, metadata_map):
-    """Recursively crawls the saved object to map Nickname -> GMNotes string."""
+    """Adds a single object of the saved object to the map of Nickname -> GMNotes string."""
 
-    # Skip objects with "Minicard" tag
+    # Skip objects with "Minicard" tag (their contained objects are still visited by the stream)
     if should_skip_by_tag(obj):
-        # Still recurse into its children just in case it's a container tagged Minicard
-        for child in obj.get("ContainedObjects", []):
-            build_metadata_map(child, metadata_map)
         return
 
     # If the object has a Nickname and GMNotes, map it to its GMNotes string if not already mapped
@@ -89,10 +88,6 @@ def build_metadata_map(obj, metadata_map):
             except json.JSONDecodeError:
                 print(f"Error decoding GMNotes for: {nickname}")
 
-    # Recurse deep into nested ContainedObjects (bags inside bags, decks, etc.)
-    for child in obj.get("ContainedObjects", []):
-        build_metadata_map(child, metadata_map)
-
 
 def fill_no_level(metadata_map):
     current_nicknames = list(metadata_map.keys())
@@ -111,9 +106,7 @@ def update_metadata_target(json_file, file_data, new_gmnotes):
     # Check if it uses an external .gmnotes path
     if "GMNotes_path" in file_data:
         gmnotes_file = json_file.with_suffix(".gmnotes")
-        with open(gmnotes_file, "w", encoding="utf-8") as f:
-            json.dump(new_gmnotes, f, indent=2, ensure_ascii=False)
-            f.write("\n")
+        write_json_if_changed(gmnotes_file, new_gmnotes)
 
         return False
     else:
@@ -127,14 +120,11 @@ def main():
         print(f"Error: Saved object not found at {SAVED_OBJECT_PATH}")
         return
 
-    # 1. Load the Saved Object
-    with open(SAVED_OBJECT_PATH, "r", encoding="utf-8") as f:
-        saved_data = json.load(f)
-
-    # 2. Build the map (Nickname -> Raw GMNotes String)
+    # 1. + 2. Stream the Saved Object and build the map (Nickname -> Raw GMNotes String)
+    # Objects are visited one at a time (bags inside bags, decks, etc. included)
     metadata_map = {}
-    root_obj = saved_data.get("ObjectStates", [saved_data])[0]
-    build_metadata_map(root_obj, metadata_map)
+    for obj in iter_objects(SAVED_OBJECT_PATH):
+        build_metadata_map(obj, metadata_map)
     fill_no_level(metadata_map)
 
     print(f"Mapped {len(metadata_map)} unique Nicknames from Saved Object.")
@@ -175,9 +165,7 @@ def main():
 
             # Resave the core content JSON file to reflect internal changes (if needed)
             if needs_rewrite:
-                with open(json_file, "w", encoding="utf-8") as f:
-                    json.dump(file_data, f, indent=2, ensure_ascii=False)
-                    f.write("\n")
+                write_json_if_changed(json_file, file_data)
 
             update_count += 1
         else:
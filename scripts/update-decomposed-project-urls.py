@@ -1,5 +1,7 @@
 from pathlib import Path
 import json
+from modules.json_writer import write_json_if_changed
+from modules.metadata_access import get_metadata_id, load_metadata
 
 PROJECT_PATH = Path(
     r"C:\git\SCED-downloads\decomposed\campaign\Rise, Rapture, Rise\RiseRaptureRise.412e0a"
@@ -9,41 +11,16 @@ SAVED_OBJECT_PATH = Path(
 )
 
 
-def get_id(metadata):
-    if not isinstance(metadata, dict):
-        return None
-    return metadata.get("id") or metadata.get("TtsZoopGuid")
-
-
 def parse_gmnotes(raw_notes):
     if not isinstance(raw_notes, str):
         return None
 
     try:
-        return get_id(json.loads(raw_notes.strip()))
+        return get_metadata_id(json.loads(raw_notes.strip()))
     except json.JSONDecodeError:
         return None
 
 
-def get_metadata(file_path, file_data):
-    """
-    Checks the .gmnotes file first. If not found, uses the
-    already-loaded file_data dictionary.
-    """
-    gmnotes_file = file_path.with_suffix(".gmnotes")
-
-    # Try separate file first
-    if gmnotes_file.exists():
-        try:
-            with open(gmnotes_file, "r", encoding="utf-8") as f:
-                return get_id(json.load(f))
-        except json.JSONDecodeError:
-            pass
-
-    # Fallback to the already-parsed in-memory internal data
-    return parse_gmnotes(file_data.get("GMNotes"))
-
-
 def build_update_map(obj, update_map):
     """Recursively crawls the saved object to map IDs to URLs."""
     if obj.get("Name") in ["Card", "CardCustom"]:
@@ -91,7 +68,8 @@ def main():
             file_data = json.load(f)
 
         if file_data.get("Name") in ["Card", "CardCustom"]:
-            file_id = get_metadata(json_file, file_data)
+            # The .gmnotes file takes priority, the already loaded data is used if it is missing or invalid
+            file_id = get_metadata_id(load_metadata(json_file, file_data, fallback_on_invalid=True))
             custom_deck = file_data.get("CustomDeck")
 
             if file_id in update_map and custom_deck:
@@ -101,9 +79,7 @@ def main():
                 file_data["CustomDeck"] = {deck_id: update_map[file_id]}
 
                 # Write back to the project folder
-                with open(json_file, "w", encoding="utf-8") as f:
-                    json.dump(file_data, f, indent=2, ensure_ascii=False)
-                    f.write("\n")
+                write_json_if_changed(json_file, file_data)
 
                 update_count += 1
 
@@ -1,5 +1,6 @@
 import os
 import json
+from modules.json_writer import write_json_if_changed
 
 # --- CONFIGURATION ---
 TARGET_DIRECTORY = r"C:\git\SCED-downloads\decomposed"
@@ -121,9 +122,7 @@ def process_json_files():
             updated_data = update_json_data(data, current_index)
 
             # Save the file back
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(updated_data, f, indent=2, ensure_ascii=False)
-                f.write("\n")
+            write_json_if_changed(file_path, updated_data)
             # print(f"Successfully updated: {file} (ID: {id})")
 
     print(f"Done! Scanned {processed_count} files, updated {match_count} files.")
@@ -1,7 +1,7 @@
 # This script will take a folder of images and update the accompanying card objects with the local file path
 
-import json
 import os
+from modules.decomposed_tree import DecomposedTree
 
 # --- Configuration ---
 IMAGE_FOLDER = r"C:\Path\To\Your\Images"
@@ -24,25 +24,13 @@ def get_image_map(folder):
     return image_map
 
 
-def extract_arkham_id_from_gmnotes_file(json_data, file_path):
-    """Uses the GMNotes_path field to find and read the associated .gmnotes file."""
-    if "GMNotes_path" not in json_data:
+def extract_arkham_id_from_gmnotes_file(tree_obj):
+    """Uses the GMNotes_path field to find the metadata from the associated .gmnotes file."""
+    if "GMNotes_path" not in tree_obj.data or not isinstance(tree_obj.gmnotes, dict):
         return None
 
-    # Split the path into (root, ext)
-    root, ext = os.path.splitext(file_path)
-
-    # Add the new extension
-    gm_path = root + ".gmnotes"
-
-    if os.path.exists(gm_path):
-        try:
-            with open(gm_path, "r", encoding="utf-8") as f:
-                val = json.load(f).get("id")
-                return str(val) if val is not None else None
-        except (json.JSONDecodeError, IOError):
-            pass
-    return None
+    val = tree_obj.gmnotes.get("id")
+    return str(val) if val is not None else None
 
 
 def main():
@@ -52,35 +40,30 @@ def main():
         return
 
     updated_count = 0
+    tree = DecomposedTree(DATA_FOLDER).scan()
+    for path, error in tree.errors.items():
+        print(f"Warning: Could not load {path}: {error}")
 
-    for root, _, files in os.walk(DATA_FOLDER):
-        for file_name in files:
-            if not file_name.endswith(".json"):
-                continue
-
-            json_path = os.path.join(root, file_name)
-
-            with open(json_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+    for tree_obj in tree:
+        data = tree_obj.data
 
-            # Get the ID using the GMNotes_path logic
-            arkham_id = extract_arkham_id_from_gmnotes_file(data, json_path)
+        # Get the ID using the GMNotes_path logic
+        arkham_id = extract_arkham_id_from_gmnotes_file(tree_obj)
 
-            if arkham_id and arkham_id in image_map:
-                # Update FaceURL in all CustomDeck entries
-                if "CustomDeck" not in data:
-                    continue
+        if arkham_id and arkham_id in image_map:
+            # Update FaceURL in all CustomDeck entries
+            if "CustomDeck" not in data:
+                continue
 
-                for deck_id in data["CustomDeck"]:
-                    data["CustomDeck"][deck_id]["FaceURL"] = image_map[arkham_id]
+            for deck_id in data["CustomDeck"]:
+                data["CustomDeck"][deck_id]["FaceURL"] = image_map[arkham_id]
 
-                # Save changes back to the JSON
-                with open(json_path, "w", encoding="utf-8") as f:
-                    json.dump(data, f, indent=2, ensure_ascii=False)
-                    f.write("\n")
+            tree_obj.mark_modified()
+            updated_count += 1
+            print(f"Updated {tree_obj.path.name} (Arkham ID: {arkham_id})")
 
-                updated_count += 1
-                print(f"Updated {file_name} (Arkham ID: {arkham_id})")
+    # Save changes back to the JSON files
+    tree.save()
 
     print("-" * 30)
     print(f"Done! Updated {updated_count} files.")